@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""Measure the memory footprint per parameter object.
+
+Run with::
+
+    $ python benchmarks/memory.py
+
+To measure another revision, e.g. before a change, check it out in a separate worktree
+and put it first on the path. Classes missing in that revision are skipped::
+
+    $ git worktree add /tmp/before <revision>
+    $ PYTHONPATH=/tmp/before python benchmarks/memory.py
+"""
+
+import gc
+import tracemalloc
+
+import owslib_esgfwps
+
+N = 10000
+RUNS = 5
+
+
+def _dimension(i):
+    return owslib_esgfwps.Dimension(i, i + 1, crs='indices')
+
+
+FACTORIES = [
+    ('Dimension', _dimension),
+    ('Domain', lambda i: owslib_esgfwps.Domain(dict(time=_dimension(i)))),
+    ('FrozenDomain', lambda i: owslib_esgfwps.FrozenDomain(dict(time=_dimension(i)))),
+    ('Variable', lambda i: owslib_esgfwps.Variable(uri='http://data.test.org/tas.nc', var_name='tas')),
+    ('Output', lambda i: owslib_esgfwps.Output(uri='http://data.test.org/output.nc')),
+    ('Operation', lambda i: owslib_esgfwps.Operation('subset', domain='d0', input=['tas'])),
+]
+
+
+def footprint(factory, n=N):
+    """Return the average number of bytes allocated per object."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # do not count the list holding the objects
+    size = after - before - objects.__sizeof__()
+    return size / float(n)
+
+
+def main():
+    print('{:<12}{:>16}'.format('class', 'bytes/object'))
+    for name, factory in FACTORIES:
+        if not hasattr(owslib_esgfwps, name):
+            continue
+        # the median of several runs
+        size = sorted(footprint(factory) for _ in range(RUNS))[RUNS // 2]
+        print('{:<12}{:>16.0f}'.format(name, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""Benchmarks of the serialization and parsing hot paths in `owslib_esgfwps.cwt`.
+
+Run with `make bench`. Save a baseline with `make bench-save` and compare against
+it with `make bench-check`, which fails on a regression of the mean time.
+The 100k element cases are marked `slow`.
+"""
+
+import json
+
+import pytest
+
+from owslib_esgfwps import (
+    Domain,
+    Domains,
+    Dimension,
+    Operation,
+    Operations,
+    Output,
+    Outputs,
+    Variable,
+    Variables,
+)
+
+pytest.importorskip('pytest_benchmark')
+
+SIZES = [1, 100, 10000, pytest.param(100000, marks=pytest.mark.slow)]
+
+
+def make_domains(n):
+    return Domains([Domain(dict(
+        time=Dimension(i, i + 1, crs='indices'),
+        lat=Dimension(-90, 90, 0.5),
+        lon=Dimension(0, 360, 0.5))) for i in range(n)])
+
+
+def make_variables(n):
+    return Variables([Variable(uri='http://data.test.org/tas_{}.nc'.format(i), var_name='tas') for i in range(n)])
+
+
+def make_operations(n):
+    return Operations([Operation('CDAT.subset', domain='d{}'.format(i), input=['v{}'.format(i)]) for i in range(n)])
+
+
+def make_outputs(n):
+    return Outputs([Output(uri='http://test.org/output_{}.nc'.format(i), mimetype='application/x-netcdf')
+                    for i in range(n)])
+
+
+class ProcessOutput(object):
+    identifier = 'output'
+
+    def __init__(self, outputs):
+        self.data = [json.dumps(outputs.json)]
+
+
+def test_dimension_json(benchmark):
+    dim = Dimension(0, 90, 1, crs='indices')
+    benchmark(lambda: Dimension.from_json(dim.json))
+
+
+def test_domain_json(benchmark):
+    domain = make_domains(1).domains[0]
+    benchmark(lambda: Domain.from_json(domain.json))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_domains_json(benchmark, size):
+    data = make_domains(size).json
+    benchmark(lambda: Domains.from_json(data).json)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_variables_json(benchmark, size):
+    data = make_variables(size).json
+    benchmark(lambda: Variables.from_json(data).json)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_operations_json(benchmark, size):
+    data = make_operations(size).json
+    benchmark(lambda: Operations.from_json(data).json)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_value_get(benchmark, size):
+    domains = make_domains(size)
+
+    def encode():
+        # invalidate the cached value to measure the encoding
+        domains._changed()
+        return domains.value
+
+    benchmark(encode)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_value_get_cached(benchmark, size):
+    domains = make_domains(size)
+    benchmark(lambda: domains.value)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_value_set(benchmark, size):
+    value = make_domains(size).value
+    domains = Domains()
+
+    def decode():
+        domains.value = value
+
+    benchmark(decode)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_outputs_from_owslib(benchmark, size):
+    process_outputs = [ProcessOutput(make_outputs(size))]
+    benchmark(lambda: Outputs.from_owslib(process_outputs))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_repr(benchmark, size):
+    domains = make_domains(size)
+    benchmark(lambda: repr(domains))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_array_domains_value(benchmark, size):
+    np = pytest.importorskip('numpy')
+    from owslib_esgfwps.arrays import ArrayDomains
+    time = np.arange(size)
+    domains = ArrayDomains(dict(time=(time, time + 1), lat=(-90, 90, 0.5), lon=(0, 360, 0.5)),
+                           crs=dict(time='indices'))
+
+    def encode():
+        domains._changed()
+        return domains.value
+
+    benchmark(encode)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_schema_load(benchmark, size):
+    from owslib_esgfwps import schema
+    data = make_domains(size).json
+    benchmark(lambda: schema.load('domains', data))
+
+
+def make_request(size):
+    return dict(domain=make_domains(size).value, variable=make_variables(size).value)
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_server_decode_from_json(benchmark, size):
+    request = make_request(size)
+    benchmark(lambda: (Domains.from_json(json.loads(request['domain'])),
+                       Variables.from_json(json.loads(request['variable']))))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_server_decode(benchmark, size):
+    from owslib_esgfwps.server import RequestDecoder
+    request = make_request(size)
+    decode = RequestDecoder(maxsize=0)
+    benchmark(lambda: decode(request))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_server_decode_cached(benchmark, size):
+    from owslib_esgfwps.server import RequestDecoder
+    request = make_request(size)
+    decode = RequestDecoder()
+    benchmark(lambda: decode(request))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_domain_index_covering(benchmark, size):
+    from owslib_esgfwps.algebra import DomainIndex
+    index = DomainIndex()
+    for domain in make_domains(size):
+        index.add('http://data.test.org/tas.nc', domain)
+    query = Domain(dict(time=Dimension(size // 2, size // 2, crs='indices'), lat=Dimension(-10, 10, 0.5)))
+    benchmark(lambda: index.covering('http://data.test.org/tas.nc', query))
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_bulk_summarize(benchmark, size):
+    from owslib_esgfwps import bulk
+    lines = [json.dumps(dict(domain=[domain.json], variable=[variable.json]))
+             for domain, variable in zip(make_domains(size), make_variables(size))]
+    benchmark(lambda: bulk.summarize(lines))
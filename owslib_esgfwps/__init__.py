@@ -6,12 +6,17 @@ from .__version__ import __author__, __email__, __version__
 
 from .cwt import (
     ParameterError,
+    cache_info,
+    reset_cache_info,
     Output,
     Outputs,
+    LazyOutputs,
     Variable,
     Variables,
     Dimension,
+    FrozenDimension,
     Domain,
+    FrozenDomain,
     Domains,
     Operation,
     Operations
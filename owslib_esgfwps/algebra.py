@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+
+"""
+Intersection, containment and difference of `Dimension` and `Domain` objects.
+
+A dimension with `crs='indices'` is the set of indices `start, start + step, ...` up to
+and including `end`. A dimension with `crs='values'` is the closed interval of coordinate
+values `[start, end]`; its `step` is a stride over the grid points inside, so it is only
+compared for equality. A missing `start` or `end` is unbounded, a dimension missing in a
+domain covers the whole axis. Dimensions are only compared when they have the same
+`crs`; use `owslib_esgfwps.coords` to convert values to indices::
+
+    >>> from owslib_esgfwps import Domain, Dimension
+    >>> from owslib_esgfwps.algebra import contains, difference, intersection
+    >>> d0 = Domain(dict(time=Dimension(0, 99, crs='indices')))
+    >>> d1 = Domain(dict(time=Dimension(50, 149, crs='indices')))
+    >>> intersection(d0, d1).dimensions['time'].json
+    {'start': 50, 'end': 99, 'step': 1, 'crs': 'indices'}
+    >>> contains(d0, d1)
+    False
+    >>> [d.dimensions['time'].end for d in difference(d0, d1)]
+    [49]
+
+`DomainIndex` finds the stored domains of a dataset which cover or overlap a domain
+with interval trees, without scanning all domains.
+"""
+
+import bisect
+import math
+from fractions import Fraction
+
+from .cwt import Dimension, Domain, ParameterError
+
+INF = float('inf')
+
+# maximum number of pieces of the difference of two index dimensions
+MAX_PIECES = 10000
+
+
+def _exact(value):
+    # integers are exact already and faster than fractions
+    return Fraction(value).limit_denominator(10 ** 9) if isinstance(value, float) else value
+
+
+class _Lattice(object):
+    """Points `anchor + k * step` between `low` and `high` as integers or exact fractions."""
+
+    __slots__ = ('anchor', 'step', 'low', 'high')
+
+    def __init__(self, anchor, step, low, high):
+        self.anchor = anchor
+        self.step = step
+        self.low = low
+        self.high = high
+
+    @classmethod
+    def of(cls, dimension):
+        _numbers(dimension)
+        step = _exact(dimension.step or 1)
+        if step <= 0:
+            raise ParameterError('Dimension step must be positive.')
+        low = _exact(dimension.start) if dimension.start is not None else -INF
+        high = _exact(dimension.end) if dimension.end is not None else INF
+        anchor = low if low != -INF else high if high != INF else 0
+        return cls(anchor, step, low, high).normalized()
+
+    def first(self, low):
+        """First point `>= low`."""
+        return self.anchor - ((self.anchor - low) // self.step) * self.step
+
+    def last(self, high):
+        """Last point `<= high`."""
+        return self.anchor + ((high - self.anchor) // self.step) * self.step
+
+    def normalized(self):
+        """Return the lattice with finite bounds on points, or `None` if it is empty."""
+        low = self.first(self.low) if self.low != -INF else -INF
+        high = self.last(self.high) if self.high != INF else INF
+        if low > high:
+            return None
+        return _Lattice(low if low != -INF else high if high != INF else self.anchor, self.step, low, high)
+
+    def key(self):
+        # points are equal if the bounds are equal and, for more than one point, the step is equal
+        return (self.low, self.high, self.step if self.low != self.high else None,
+                self.anchor % self.step if self.low == -INF and self.high == INF else None)
+
+    def residue(self, point):
+        return (point - self.anchor) % self.step == 0
+
+    def dimension(self, crs, floats):
+        def number(value):
+            if value in (INF, -INF):
+                return None
+            if not floats and value.denominator == 1:
+                return int(value)
+            return float(value)
+        step = self.step
+        step = int(step) if step.denominator == 1 and not floats else float(step)
+        return Dimension(number(self.low), number(self.high), step, crs)
+
+
+def _inverse(value, modulus):
+    # modular inverse by the extended Euclidean algorithm, pow(value, -1, modulus) needs Python 3.8
+    x0, x1, a, b = 1, 0, value % modulus, modulus
+    while b:
+        q = a // b
+        x0, x1, a, b = x1, x0 - q * x1, b, a - q * b
+    return x0 % modulus
+
+
+def _crt(a, b):
+    """Return the lattice of the points in both lattices (ignoring the bounds) as `(anchor, step)` or `None`."""
+    denominator = a.step.denominator * b.step.denominator * a.anchor.denominator * b.anchor.denominator
+    s, t = int(a.step * denominator), int(b.step * denominator)
+    a0, b0 = int(a.anchor * denominator), int(b.anchor * denominator)
+    g = math.gcd(s, t)
+    if (b0 - a0) % g:
+        return None
+    lcm = s // g * t
+    k = ((b0 - a0) // g * _inverse(s // g, t // g)) % (t // g) if t // g > 1 else 0
+    if denominator == 1:
+        return a0 + s * k, lcm
+    return Fraction(a0 + s * k, denominator), Fraction(lcm, denominator)
+
+
+def _floats(*dimensions):
+    return any(isinstance(value, float) for dimension in dimensions
+               for value in (dimension.start, dimension.end, dimension.step))
+
+
+def _check_crs(a, b):
+    if a.crs != b.crs:
+        raise ParameterError('Cannot compare dimensions with crs {} and {}.'.format(a.crs, b.crs))
+
+
+def _intersect(a, b):
+    solution = _crt(a, b)
+    if solution is None:
+        return None
+    return _Lattice(solution[0], solution[1], max(a.low, b.low), min(a.high, b.high)).normalized()
+
+
+def _numbers(dimension):
+    for value in (dimension.start, dimension.end):
+        if value is not None and not isinstance(value, (int, float)):
+            raise ParameterError('Only numeric dimensions are supported, got {!r}.'.format(value))
+
+
+def _interval(dimension):
+    """Return the closed interval `(low, high)` of a value dimension."""
+    _numbers(dimension)
+    low = -INF if dimension.start is None else dimension.start
+    high = INF if dimension.end is None else dimension.end
+    # coordinates may be selected in descending order
+    return (low, high) if low <= high else (high, low)
+
+
+def _stride(dimension):
+    return dimension.step or 1
+
+
+def _takes_all(a, b):
+    """Return `True` if the stride of the value dimension `a` selects every point `b` selects."""
+    return _stride(a) == 1 or (_stride(a) == _stride(b) and a.start == b.start)
+
+
+def _value(value):
+    return None if value in (INF, -INF) else value
+
+
+def intersect_dimensions(a, b):
+    """Return the `Dimension` of the points in both dimensions or `None` if there are none."""
+    _check_crs(a, b)
+    if a.crs == 'indices':
+        la, lb = _Lattice.of(a), _Lattice.of(b)
+        if la is None or lb is None:
+            return None
+        lattice = _intersect(la, lb)
+        return lattice.dimension(a.crs, _floats(a, b)) if lattice else None
+    (low_a, high_a), (low_b, high_b) = _interval(a), _interval(b)
+    low, high = max(low_a, low_b), min(high_a, high_b)
+    if low > high:
+        return None
+    if _stride(a) != _stride(b) and 1 not in (_stride(a), _stride(b)):
+        raise ParameterError('Cannot intersect value dimensions with strides {} and {}.'.format(a.step, b.step))
+    return Dimension(_value(low), _value(high), max(_stride(a), _stride(b)), a.crs)
+
+
+def dimension_contains(a, b):
+    """Return `True` if every point of `b` is a point of `a`."""
+    _check_crs(a, b)
+    if a.crs == 'indices':
+        la, lb = _Lattice.of(a), _Lattice.of(b)
+        if lb is None:
+            return True
+        if la is None:
+            return False
+        lattice = _intersect(la, lb)
+        return lattice is not None and lattice.key() == lb.key()
+    (low_a, high_a), (low_b, high_b) = _interval(a), _interval(b)
+    return low_a <= low_b and high_b <= high_a and _takes_all(a, b)
+
+
+def dimension_difference(a, b):
+    """Return the points of `a` which are not in `b` as a list of disjoint dimensions.
+
+    The pieces of a value dimension are closed intervals, they share their bounds with `b`.
+    """
+    _check_crs(a, b)
+    if a.crs == 'indices':
+        return _lattice_difference(a, b)
+    (low_a, high_a), (low_b, high_b) = _interval(a), _interval(b)
+    if max(low_a, low_b) > min(high_a, high_b):
+        return [Dimension(a.start, a.end, a.step, a.crs)]
+    if not _takes_all(b, a):
+        raise ParameterError('The difference of value dimensions with strides {} and {} is not a range.'.format(
+            a.step, b.step))
+    pieces = []
+    if low_a < low_b:
+        pieces.append(Dimension(_value(low_a), low_b, a.step, a.crs))
+    if high_b < high_a:
+        pieces.append(Dimension(high_b, _value(high_a), a.step, a.crs))
+    return pieces
+
+
+def _lattice_difference(a, b):
+    la, lb = _Lattice.of(a), _Lattice.of(b)
+    if la is None:
+        return []
+    floats = _floats(a, b)
+    if lb is None or _intersect(la, lb) is None:
+        return [la.dimension(a.crs, floats)]
+    pieces = []
+    # points of a before and after the bounds of b
+    if lb.low != -INF:
+        before = la.last(lb.low)
+        before = before - la.step if before == lb.low else before
+        pieces.append(_Lattice(la.anchor, la.step, la.low, before).normalized())
+    if lb.high != INF:
+        after = la.first(lb.high)
+        after = after + la.step if after == lb.high else after
+        pieces.append(_Lattice(la.anchor, la.step, after, la.high).normalized())
+    # points of a within the bounds of b which are not on the lattice of b, one piece per
+    # residue of a modulo the common period, but never more pieces than points of a
+    period = _crt(_Lattice(0, la.step, 0, 0), _Lattice(0, lb.step, 0, 0))[1]
+    low, high = max(la.low, lb.low), min(la.high, lb.high)
+    residues = period // la.step
+    if low != -INF and high != INF:
+        residues = min(residues, (la.last(high) - la.first(low)) // la.step + 1)
+    if residues > MAX_PIECES:
+        raise ParameterError('The difference has more than {} pieces.'.format(MAX_PIECES))
+    for index in range(int(residues)):
+        point = la.first(low) + index * la.step if low != -INF else la.anchor + index * la.step
+        if not lb.residue(point):
+            pieces.append(_Lattice(point, period, low, high).normalized())
+    return sorted((piece.dimension(a.crs, floats) for piece in pieces if piece is not None),
+                  key=lambda dim: (dim.start is not None, dim.start if dim.start is not None else 0))
+
+
+def _masks(a, b):
+    if a.mask != b.mask:
+        raise ParameterError('Cannot compare domains with masks {} and {}.'.format(a.mask, b.mask))
+
+
+def intersection(a, b):
+    """Return the intersection of two dimensions or domains, or `None` if it is empty.
+
+    The intersection of domains has a new id and the mask of both domains.
+    """
+    if isinstance(a, Dimension):
+        return intersect_dimensions(a, b)
+    _masks(a, b)
+    dimensions = {}
+    for name in set(a.dimensions) | set(b.dimensions):
+        if name not in b.dimensions or name not in a.dimensions:
+            dimensions[name] = a.dimensions.get(name) or b.dimensions[name]
+            continue
+        dimensions[name] = intersect_dimensions(a.dimensions[name], b.dimensions[name])
+        if dimensions[name] is None:
+            return None
+    return _domain(dimensions, a.mask)
+
+
+def contains(a, b):
+    """Return `True` if every point of the dimension or domain `b` is in `a`."""
+    if isinstance(a, Dimension):
+        return dimension_contains(a, b)
+    _masks(a, b)
+    for name, dimension in a.dimensions.items():
+        if not dimension_contains(dimension, b.dimensions.get(name) or Dimension(None, None, crs=dimension.crs)):
+            return False
+    return True
+
+
+def difference(a, b):
+    """Return the points of the dimension or domain `a` which are not in `b` as a list of disjoint
+    dimensions or domains."""
+    if isinstance(a, Dimension):
+        return dimension_difference(a, b)
+    _masks(a, b)
+    if intersection(a, b) is None:
+        return [_domain(a.dimensions, a.mask)]
+    # cut off the parts of `a` outside of `b`, one dimension at a time
+    pieces = []
+    current = dict(a.dimensions)
+    for name in sorted(b.dimensions):
+        dimension = current.get(name) or Dimension(None, None, crs=b.dimensions[name].crs)
+        for piece in dimension_difference(dimension, b.dimensions[name]):
+            pieces.append(dict(current, **{name: piece}))
+        current[name] = intersect_dimensions(dimension, b.dimensions[name])
+    return [_domain(dimensions, a.mask) for dimensions in pieces]
+
+
+def _domain(dimensions, mask):
+    # copies, a dimension belongs to a single domain
+    return Domain(dict((name, Dimension(dim.start, dim.end, dim.step, dim.crs)) for name, dim in dimensions.items()),
+                  mask=mask)
+
+
+class _IntervalTree(object):
+    """Static centered interval tree of `(low, high, item)` with stabbing and overlap queries."""
+
+    def __init__(self, intervals):
+        self._lows = sorted(intervals, key=lambda interval: interval[0])
+        self._keys = [interval[0] for interval in self._lows]
+        self._root = self._build(intervals)
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        points = sorted(value for interval in intervals for value in interval[:2] if abs(value) != INF)
+        center = points[len(points) // 2] if points else 0
+        left = [interval for interval in intervals if interval[1] < center]
+        right = [interval for interval in intervals if interval[0] > center]
+        middle = [interval for interval in intervals if interval[0] <= center <= interval[1]]
+        return (center,
+                sorted(middle, key=lambda interval: interval[0]),
+                sorted(middle, key=lambda interval: interval[1], reverse=True),
+                self._build(left), self._build(right))
+
+    def stab(self, point):
+        """Return the items of the intervals which contain `point`."""
+        items = []
+        node = self._root
+        while node is not None:
+            center, by_low, by_high, left, right = node
+            if point < center:
+                for low, high, item in by_low:
+                    if low > point:
+                        break
+                    items.append(item)
+                node = left
+            else:
+                for low, high, item in by_high:
+                    if high < point:
+                        break
+                    items.append(item)
+                node = right
+        return items
+
+    def overlap(self, low, high):
+        """Return the items of the intervals which overlap `[low, high]`."""
+        items = self.stab(low)
+        start = bisect.bisect_right(self._keys, low)
+        end = bisect.bisect_right(self._keys, high)
+        items.extend(interval[2] for interval in self._lows[start:end])
+        return items
+
+
+class DomainIndex(object):
+    """Index of domains (and an associated value, e.g. `Outputs`) per dataset URI.
+
+    The stored domains are found with an interval tree of one dimension and filtered by the
+    bounds of the other dimensions before they are compared exactly. The indexes of a URI are
+    rebuilt on the first query after domains were added.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._indexes = {}
+
+    @staticmethod
+    def _uri(variable):
+        return getattr(variable, 'uri', variable)
+
+    def add(self, variable, domain, value=None):
+        """Add a domain of a `Variable` (or URI) with an optional value."""
+        uri = self._uri(variable)
+        self._entries.setdefault(uri, []).append((domain, value))
+        self._indexes.pop(uri, None)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _index(self, uri, name, crs):
+        """Return `(tree, bounds, distinct)` of a dimension, `bounds[position]` is `(low, high)`."""
+        indexes = self._indexes.setdefault(uri, {})
+        key = (name, crs)
+        if key not in indexes:
+            # the bounds of a stored dimension contain all of its points, the exact check comes last
+            bounds = []
+            for domain, value in self._entries.get(uri, []):
+                dimension = domain.dimensions.get(name)
+                if dimension is None:
+                    bounds.append((-INF, INF))
+                elif dimension.crs != crs or not _numeric(dimension):
+                    bounds.append(None)
+                else:
+                    bounds.append(_interval(dimension))
+            tree = _IntervalTree([bound + (position,) for position, bound in enumerate(bounds) if bound is not None])
+            indexes[key] = (tree, bounds, len(set(bounds)))
+        return indexes[key]
+
+    def _candidates(self, uri, domain, covering):
+        entries = self._entries.get(uri, [])
+        queries = []
+        for name, dimension in domain.dimensions.items():
+            if not _numeric(dimension):
+                continue
+            if dimension.crs == 'indices':
+                lattice = _Lattice.of(dimension)
+                if lattice is None:
+                    continue
+                low, high = lattice.low, lattice.high
+            else:
+                low, high = _interval(dimension)
+            queries.append((self._index(uri, name, dimension.crs), low, high))
+        if not queries:
+            return list(entries)
+        # search the tree of the dimension with the most distinct intervals, filter with the others
+        queries.sort(key=lambda query: query[0][2], reverse=True)
+        (tree, bounds, distinct), low, high = queries[0]
+        positions = tree.stab(low) if covering else tree.overlap(low, high)
+        for (tree, bounds, distinct), low, high in queries:
+            positions = [position for position in positions if _matches(bounds[position], low, high, covering)]
+        return [entries[position] for position in sorted(set(positions))]
+
+    def covering(self, variable, domain):
+        """Return the `(domain, value)` pairs whose domain contains `domain`."""
+        return [(stored, value) for stored, value in self._candidates(self._uri(variable), domain, True)
+                if stored.mask == domain.mask and _safe(contains, stored, domain)]
+
+    def overlapping(self, variable, domain):
+        """Return the `(domain, value)` pairs whose domain intersects `domain`."""
+        return [(stored, value) for stored, value in self._candidates(self._uri(variable), domain, False)
+                if stored.mask == domain.mask and _safe(intersection, stored, domain) is not None]
+
+
+def _matches(bounds, low, high, covering):
+    if bounds is None:
+        return False
+    if covering:
+        return bounds[0] <= low and high <= bounds[1]
+    return bounds[0] <= high and low <= bounds[1]
+
+
+def _numeric(dimension):
+    return all(value is None or isinstance(value, (int, float)) for value in (dimension.start, dimension.end))
+
+
+def _safe(function, a, b):
+    # domains with dimensions in another crs are not comparable
+    try:
+        return function(a, b)
+    except ParameterError:
+        return None
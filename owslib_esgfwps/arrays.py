@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar `Domains` backed by NumPy arrays.
+
+`ArrayDomains` stores the start, end and step of each dimension of many domains as
+arrays. `Domain` objects are only built when an item is accessed, and the JSON value
+is serialized directly from the arrays::
+
+    >>> import numpy as np
+    >>> from owslib_esgfwps.arrays import ArrayDomains
+    >>> lat = np.arange(-90, 90, 10)
+    >>> domains = ArrayDomains(dict(lat=(lat, lat + 9.5, 0.5), time=(0, 11)), crs=dict(time='indices'))
+    >>> len(domains)
+    18
+    >>> domains[0].dimensions['lat'].end
+    -80.5
+
+This module requires `numpy`.
+"""
+
+from uuid import uuid4
+
+import numpy as np
+
+from .cwt import Dimension, Domain, Domains, ParameterError
+
+
+def _column(values, size, default=None):
+    if values is None:
+        values = default
+    array = np.array(values)
+    if array.ndim == 0:
+        array = np.full(size, array.item(), dtype=object if array.dtype.kind in 'OU' else array.dtype)
+    if array.shape != (size,):
+        raise ParameterError('Expected an array of length {}, got shape {}.'.format(size, array.shape))
+    array.flags.writeable = False
+    return array
+
+
+def _item(value):
+    # elements of object columns, e.g. None or dates, are already Python objects
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ArrayDomains(Domains):
+    """Domains stored as one start, end and step array per dimension.
+
+    :param dimensions: dict of dimension name to a tuple `(start, end)` or `(start, end, step)`.
+        Each item is an array with one value per domain or a scalar used for all domains.
+    :param crs: `values` or `indices`, or a dict of dimension name to crs. Default is `values`.
+    :param mask: optional mask of all domains.
+    :param ids: optional domain ids. By default ids are a random prefix and the position.
+
+    The arrays are copied and read-only, so the cached JSON value stays valid.
+    """
+
+    def __init__(self, dimensions=None, crs=None, mask=None, ids=None):
+        super(ArrayDomains, self).__init__()
+        dimensions = dimensions or {}
+        size = None
+        for bounds in dimensions.values():
+            for values in bounds:
+                if np.ndim(values) == 1:
+                    size = len(values) if size is None else size
+        if size is None:
+            size = len(ids) if ids is not None else (1 if dimensions else 0)
+        if not isinstance(crs, dict):
+            crs = dict((name, crs) for name in dimensions)
+        self._size = size
+        self._columns = {}
+        for name, bounds in dimensions.items():
+            if len(bounds) not in (2, 3):
+                raise ParameterError('Dimension {} needs (start, end) or (start, end, step).'.format(name))
+            step = bounds[2] if len(bounds) == 3 else 1
+            self._columns[name] = (
+                _column(bounds[0], size), _column(bounds[1], size), _column(step, size),
+                Dimension(crs=crs.get(name)).crs)
+        self._mask = mask
+        self._ids = _column(ids, size) if ids is not None else None
+        self._prefix = uuid4().hex[:16]
+
+    @classmethod
+    def from_structured(cls, array, crs=None, mask=None, ids=None):
+        """Build from a structured array with fields `<dim>_start`, `<dim>_end` and optional `<dim>_step`."""
+        dimensions = {}
+        for field in array.dtype.names:
+            if field.endswith('_start'):
+                name = field[:-len('_start')]
+                bounds = [array[field], array[name + '_end']]
+                if name + '_step' in array.dtype.names:
+                    bounds.append(array[name + '_step'])
+                dimensions[name] = tuple(bounds)
+        return cls(dimensions, crs=crs, mask=mask, ids=ids)
+
+    @classmethod
+    def from_json(cls, data):
+        domains = [Domain.from_json(domain) for domain in data]
+        names = list(domains[0].dimensions) if domains else []
+        if any(set(domain.dimensions) != set(names) for domain in domains):
+            raise ParameterError('All domains must have the same dimensions.')
+        dimensions = dict(
+            (name, tuple([getattr(d.dimensions[name], attr) for d in domains] for attr in ('start', 'end', 'step')))
+            for name in names)
+        crs = dict((name, domains[0].dimensions[name].crs) for name in names)
+        return cls(dimensions, crs=crs, mask=domains[0].mask if domains else None, ids=[d.id for d in domains])
+
+    def _id(self, index):
+        if self._ids is not None:
+            return _item(self._ids[index])
+        return '{}-{}'.format(self._prefix, index)
+
+    def column(self, name):
+        """Return the read-only `(start, end, step)` arrays of a dimension."""
+        return self._columns[name][:3]
+
+    @property
+    def dimension_names(self):
+        return list(self._columns)
+
+    @property
+    def domains(self):
+        return [self[index] for index in range(len(self))]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = range(self._size)[index]
+            return ArrayDomains(
+                dict((name, (start[index], end[index], step[index])) for name, (start, end, step, crs)
+                     in self._columns.items()),
+                crs=dict((name, column[3]) for name, column in self._columns.items()),
+                mask=self._mask, ids=[self._id(i) for i in indices])
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('ArrayDomains index out of range')
+        dimensions = dict(
+            (name, Dimension(_item(start[index]), _item(end[index]), _item(step[index]), crs))
+            for name, (start, end, step, crs) in self._columns.items())
+        return Domain(dimensions, mask=self._mask, id=self._id(index))
+
+    @property
+    def json(self):
+        ids = self._ids.tolist() if self._ids is not None else [self._id(i) for i in range(self._size)]
+        columns = [(name, start.tolist(), end.tolist(), step.tolist(), crs)
+                   for name, (start, end, step, crs) in self._columns.items()]
+        data = []
+        for index, id in enumerate(ids):
+            item = dict(id=id)
+            if self._mask:
+                item['mask'] = self._mask
+            for name, start, end, step, crs in columns:
+                item[name] = dict(start=start[index], end=end[index], step=step[index], crs=crs)
+            data.append(item)
+        return data
+
+    @property
+    def params(self):
+        return dict(domains=[self._id(i) for i in range(self._size)])
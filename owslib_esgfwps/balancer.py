@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""
+Client-side load balancing of Execute requests over several WPS compute nodes.
+
+`LoadBalancer` sends each Execute request to the healthy endpoint with the fewest jobs
+in flight, preferring endpoints with lower latency and fewer errors. A request which
+fails with an exception (e.g. a connection error or HTTP 500) or is answered with an
+`ExceptionReport` is sent to the next endpoint. An endpoint with `max_failures`
+failures in a row is left out for `cooldown` seconds, `NoEndpointAvailable` is raised
+while all endpoints are left out::
+
+    >>> from owslib_esgfwps.balancer import LoadBalancer
+    >>> balancer = LoadBalancer(['http://node1.test.org/wps', 'http://node2.test.org/wps'], token='TOKEN')
+    >>> execution = balancer.submit('pelican_subset', variables=variables, domains=domains)
+    >>> [(stats.url, stats.in_flight, stats.latency) for stats in balancer.stats()]
+
+`LoadBalancer` has the `execute` method of `WebProcessingService`, so it can be used
+with `BatchSubmitter`. Jobs submitted in ASYNC mode count as in flight until their
+execution is complete, e.g. polled by an `ExecutionMonitor`.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from owslib.wps import ASYNC
+
+from .client import Client
+from .cwt import Domains, Operations, Variables
+
+LOGGER = logging.getLogger(__name__)
+
+EndpointStats = namedtuple('EndpointStats', ['url', 'in_flight', 'latency', 'error_rate', 'requests', 'errors',
+                                             'healthy'])
+
+
+class NoEndpointAvailable(Exception):
+    """All endpoints are left out after failures."""
+
+
+def _exception_report(execution):
+    """Return the errors of an execution answered with an `ExceptionReport`, or `None`."""
+    if getattr(execution, 'status', None) == 'Exception' or getattr(execution, 'errors', None):
+        return '; '.join('{}: {}'.format(error.code, error.text) for error in getattr(execution, 'errors', ())) \
+            or 'ExceptionReport'
+    return None
+
+
+def _complete(execution):
+    try:
+        return execution.isComplete()
+    except Exception:
+        # unknown status, e.g. no status document read yet
+        return False
+
+
+class Endpoint(object):
+    """A WPS endpoint with its load and health.
+
+    :param wps: object with `url` and `execute`, e.g. a `Client` or `WebProcessingService`.
+    :param alpha: weight of the latest observation in the moving averages of latency and errors.
+    """
+
+    def __init__(self, wps, alpha=0.2):
+        self.wps = wps
+        self.url = wps.url
+        self.alpha = alpha
+        self.active = 0
+        self.executions = []
+        self.latency = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0
+        self.down_until = 0
+        self.used = 0
+
+    @property
+    def in_flight(self):
+        """Running Execute requests and ASYNC executions which are not complete."""
+        self.executions = [execution for execution in self.executions if not _complete(execution)]
+        return self.active + len(self.executions)
+
+    def healthy(self, now):
+        return self.down_until <= now
+
+    def cost(self):
+        """Expected seconds of a request, penalized by the error rate."""
+        return (self.latency or 0.0) * (1 + 10 * self.error_rate)
+
+    def observe(self, seconds, error):
+        self.requests += 1
+        self.error_rate += self.alpha * (float(error) - self.error_rate)
+        if error:
+            self.errors += 1
+            self.failures += 1
+        else:
+            self.failures = 0
+            self.latency = seconds if self.latency is None else self.latency + self.alpha * (seconds - self.latency)
+
+    def stats(self, now):
+        return EndpointStats(self.url, self.in_flight, self.latency, self.error_rate, self.requests, self.errors,
+                             self.healthy(now))
+
+
+class LoadBalancer(object):
+    """Dispatch Execute requests to the least loaded of several WPS endpoints.
+
+    :param endpoints: URLs, `Client` or `WebProcessingService` objects of nodes serving the same processes.
+    :param max_failures: failures in a row after which an endpoint is left out.
+    :param cooldown: seconds an endpoint is left out before it is tried again.
+    :param alpha: weight of the latest request in the moving averages of latency and error rate.
+    :param failover: send a failed request to the other endpoints before raising the error.
+
+    Further keyword arguments (e.g. `token`) are passed to the `Client` created for URLs.
+    """
+
+    def __init__(self, endpoints, max_failures=3, cooldown=30.0, alpha=0.2, failover=True, **kwargs):
+        if not endpoints:
+            raise ValueError('At least one endpoint is required.')
+        self._clients = [Client(endpoint, **kwargs) for endpoint in endpoints if isinstance(endpoint, str)]
+        clients = iter(self._clients)
+        self.endpoints = [Endpoint(next(clients) if isinstance(endpoint, str) else endpoint, alpha)
+                          for endpoint in endpoints]
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failover = failover
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def stats(self):
+        """Return the `EndpointStats` of all endpoints."""
+        now = time.monotonic()
+        with self._lock:
+            return [endpoint.stats(now) for endpoint in self.endpoints]
+
+    def _acquire(self, excluded):
+        """Choose an endpoint and count the request as in flight."""
+        now = time.monotonic()
+        with self._lock:
+            healthy = [endpoint for endpoint in self.endpoints if endpoint not in excluded and endpoint.healthy(now)]
+            if not healthy:
+                return None
+            endpoint = min(healthy, key=lambda endpoint: (endpoint.in_flight, endpoint.cost(), endpoint.used))
+            endpoint.active += 1
+            endpoint.used = next(self._sequence)
+            return endpoint
+
+    def _release(self, endpoint, seconds, execution=None, error=None):
+        with self._lock:
+            endpoint.active -= 1
+            endpoint.observe(seconds, error is not None)
+            if error is not None and endpoint.failures >= self.max_failures:
+                endpoint.down_until = time.monotonic() + self.cooldown
+                LOGGER.warning('Endpoint %s failed %s times, left out for %s seconds.',
+                               endpoint.url, endpoint.failures, self.cooldown)
+            if execution is not None and not _complete(execution):
+                endpoint.executions.append(execution)
+
+    def execute(self, identifier, inputs, output=None, mode=ASYNC, **kwargs):
+        """Execute a process on the least loaded endpoint, see `WebProcessingService.execute`.
+
+        An execution answered with an `ExceptionReport` counts as failed and is sent to the next
+        endpoint. It is returned if it was the last try.
+
+        :raises NoEndpointAvailable: if all endpoints are cooling down.
+        :raises Exception: the error of the last endpoint if the request failed on all tried endpoints.
+        """
+        tried = []
+        failed = None
+        while True:
+            endpoint = self._acquire(tried)
+            if endpoint is None:
+                if isinstance(failed, Exception):
+                    raise failed
+                if failed is not None:
+                    return failed
+                raise NoEndpointAvailable('No endpoint is available.')
+            tried.append(endpoint)
+            started = time.perf_counter()
+            try:
+                execution = endpoint.wps.execute(identifier, inputs=inputs, output=output, mode=mode, **kwargs)
+            except Exception as e:
+                failed = e
+                self._release(endpoint, time.perf_counter() - started, error=e)
+                LOGGER.warning('Execute of %s failed on %s: %s', identifier, endpoint.url, e)
+                if not self.failover:
+                    raise
+                continue
+            report = _exception_report(execution)
+            if report is not None:
+                failed = execution
+                self._release(endpoint, time.perf_counter() - started, error=report)
+                LOGGER.warning('Execute of %s failed on %s: %s', identifier, endpoint.url, report)
+                if not self.failover:
+                    return execution
+                continue
+            self._release(endpoint, time.perf_counter() - started, execution=execution)
+            return execution
+
+    def submit(self, identifier, variables=None, domains=None, operations=None, mode=ASYNC, **kwargs):
+        """Execute a process with `Variables`, `Domains` and `Operations` as inputs."""
+        inputs = []
+        for name, values, cls in (('domain', domains, Domains), ('variable', variables, Variables),
+                                  ('operation', operations, Operations)):
+            if values is not None:
+                inputs.append((name, values if isinstance(values, cls) else cls(list(values))))
+        return self.execute(identifier, inputs, mode=mode, **kwargs)
+
+    def close(self):
+        """Close the `Client` objects created for URLs."""
+        for client in self._clients:
+            client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+Batch submission of ESGF WPS Execute requests.
+
+A batch applies a process to every combination of the given variables and domains.
+The Execute requests are submitted concurrently with a bounded thread pool.
+
+Example::
+
+    >>> from owslib.wps import WebProcessingService
+    >>> from owslib_esgfwps import Domain, Dimension, Variable
+    >>> from owslib_esgfwps.batch import BatchSubmitter
+    >>> wps = WebProcessingService(url='http://localhost:5000/wps')
+    >>> domains = [Domain(dict(time=Dimension(i, i + 1, crs='indices'))) for i in range(10)]
+    >>> variables = [Variable(uri='http://nowhere/tas.nc', var_name='tas')]
+    >>> jobs = BatchSubmitter(wps, max_workers=4, rate=2).submit('pelican_subset', variables, domains)
+    >>> outputs = [job.outputs for job in jobs if job.succeeded]
+"""
+
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from owslib.wps import SYNC
+
+from . import hooks
+from .cwt import Domains, Operation, Operations, Outputs, Variables
+from .memo import request_key
+
+LOGGER = logging.getLogger(__name__)
+
+
+class Job(object):
+    """A single Execute request of a batch and its result."""
+
+    def __init__(self, index, variable, domain, operation=None):
+        self.index = index
+        self.variable = variable
+        self.domain = domain
+        self.operation = operation
+        self.execution = None
+        self.error = None
+        self.attempts = 0
+        self.cached = None
+
+    def key(self, identifier):
+        """Return the request key of this job used by the result caches of `owslib_esgfwps.memo`."""
+        return request_key(identifier, [self.variable], [self.domain], [self.operation] if self.operation else [])
+
+    @property
+    def inputs(self):
+        inputs = [('domain', Domains([self.domain])), ('variable', Variables([self.variable]))]
+        if self.operation:
+            inputs.append(('operation', Operations([self.operation])))
+        return inputs
+
+    @property
+    def succeeded(self):
+        if self.cached is not None:
+            return True
+        return self.error is None and self.execution is not None and self.execution.status != 'ProcessFailed' \
+            and self.execution.status != 'Exception'
+
+    @property
+    def outputs(self):
+        if self.cached is not None:
+            return self.cached
+        if self.execution is None:
+            return Outputs()
+        return Outputs.from_owslib(self.execution.processOutputs)
+
+    def __repr__(self):
+        status = self.execution.status if self.execution else self.error
+        return "Job(index='{}',variable='{}',domain='{}',status='{}')".format(
+            self.index, self.variable.id, self.domain.id, status)
+
+
+class RateLimiter(object):
+    """Allow at most `rate` calls per second across threads."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def fan_out(variables, domains, operations=None):
+    """Return a `Job` for every combination of variable, domain and operation.
+
+    The operations are used as templates: each job gets a copy of the operation
+    which references the variable and the domain of that job.
+    """
+    jobs = []
+    combinations = itertools.product(variables, domains, operations or [None])
+    for index, (variable, domain, operation) in enumerate(combinations):
+        if operation is not None:
+            # a generated name of the template is not given to the copy, so it is not part of the key
+            operation = Operation(
+                name=operation._name if operation._named else None, domain=domain, input=[variable],
+                axes=operation.axes, bins=operation.bins)
+        jobs.append(Job(index, variable, domain, operation))
+    return jobs
+
+
+class BatchSubmitter(object):
+    """Submit Execute requests for a batch of jobs concurrently.
+
+    :param wps: an OWSLib `WebProcessingService`.
+    :param max_workers: maximum number of concurrent Execute requests.
+    :param retries: number of retries of a request which failed with an exception.
+    :param backoff: seconds to wait before the first retry, doubled for each further retry.
+    :param rate: maximum number of Execute requests per second (including retries).
+    :param mode: execution mode passed to `execute`, SYNC or ASYNC.
+    :param results: optional result cache of `owslib_esgfwps.memo`. Jobs with a cached result
+        are not submitted, successful SYNC jobs are added to the cache.
+    """
+
+    def __init__(self, wps, max_workers=4, retries=2, backoff=1.0, rate=None, mode=SYNC, results=None):
+        self.wps = wps
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.limiter = RateLimiter(rate)
+        self.mode = mode
+        self.results = results
+
+    def submit(self, identifier, variables, domains, operations=None):
+        """Execute the process `identifier` for all combinations and return the list of jobs."""
+        return self.submit_jobs(identifier, fan_out(variables, domains, operations))
+
+    def submit_jobs(self, identifier, jobs):
+        """Execute the process `identifier` for the given jobs and return them in the same order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(lambda job: self._run(identifier, job), jobs))
+
+    def _run(self, identifier, job):
+        key = job.key(identifier) if self.results is not None else None
+        if key is not None:
+            job.cached = self.results.get(key)
+            if job.cached is not None:
+                return job
+        started = time.perf_counter()
+        self._execute(identifier, job)
+        hooks.emit('submit', time.perf_counter() - started, identifier=identifier,
+                   endpoint=hooks.endpoint(getattr(self.wps, 'url', None)), retries=job.attempts - 1,
+                   status=job.execution.status if job.execution else type(job.error).__name__)
+        if key is not None and self.mode == SYNC and job.execution is not None and job.execution.isSucceeded():
+            self.results.set(key, job.outputs)
+        return job
+
+    def _execute(self, identifier, job):
+        inputs = job.inputs
+        while True:
+            self.limiter.wait()
+            job.attempts += 1
+            try:
+                job.execution = self.wps.execute(identifier, inputs=inputs, mode=self.mode)
+                job.error = None
+                return
+            except Exception as e:
+                job.error = e
+                if job.attempts > self.retries:
+                    LOGGER.warning('Job %s failed after %s attempts: %s', job.index, job.attempts, e)
+                    return
+                time.sleep(self.backoff * 2 ** (job.attempts - 1))
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parallel parsing of archives of ESGF WPS requests and outputs stored as JSON lines.
+
+Each line of an archive is a JSON object with the documents of one request, any of
+`domain`, `variable`, `operation` and `outputs`. A document is a list of items, a single
+item or the JSON string sent as WPS input. The file is split into byte ranges which are
+read and parsed by a pool of processes with `Domains.from_json`, `Variables.from_json`,
+`Operations.from_json` and `Outputs.from_json`. Instead of the parameter objects, a
+`Summary` of columns is returned::
+
+    >>> from owslib_esgfwps import bulk
+    >>> summary = bulk.load('requests.jsonl', processes=8)
+    >>> summary.records
+    2000000
+    >>> summary.variables['uri'][:2], summary.variables['var_name'][:2]
+    (['http://data.test.org/tas.nc', 'http://data.test.org/pr.nc'], ['tas', 'pr'])
+    >>> list(summary.dimensions.columns)
+    ['record', 'domain', 'name', 'start', 'end', 'step', 'crs', 'start_text', 'end_text']
+    >>> summary.variables['uri'].values
+    ['http://data.test.org/tas.nc', 'http://data.test.org/pr.nc']
+
+The `record` column of each table is the number of the line (counting non-empty lines
+from 0) the row comes from. Lines which cannot be parsed are listed in `Summary.errors`.
+The bounds `start`, `end` and `step` of dimensions are arrays of floats, `NaN` if a bound is
+missing or not a number, e.g. a date kept in `start_text` and `end_text`. Repeated strings
+like URIs, variable names, crs and operation names are stored as `Codes`.
+"""
+
+import math
+import os
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from . import decoder
+from .cwt import Domains, Operations, Outputs, Variables
+
+DOCUMENTS = OrderedDict([('domain', Domains), ('variable', Variables), ('operation', Operations),
+                         ('outputs', Outputs)])
+
+CHUNK_SIZE = 16 * 1024 * 1024
+
+
+class Codes(object):
+    """Dictionary encoded column of repeated values, an `array` of `codes` indexing the list of `values`."""
+
+    def __init__(self, values=()):
+        self.codes = array('l')
+        self.values = []
+        self._index = {}
+        for value in values:
+            self.append(value)
+
+    def _code(self, value):
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self._code(value))
+
+    def extend(self, other):
+        if not isinstance(other, Codes):
+            other = Codes(other)
+        codes = [self._code(value) for value in other.values]
+        self.codes.extend(codes[code] for code in other.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.values[code] for code in self.codes[index]]
+        return self.values[self.codes[index]]
+
+    def __eq__(self, other):
+        return isinstance(other, (Codes, list)) and list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'Codes({!r})'.format(list(self))
+
+    def __getstate__(self):
+        # the index is rebuilt from the values
+        return self.codes, self.values
+
+    def __setstate__(self, state):
+        self.codes, self.values = state
+        self._index = dict((value, code) for code, value in enumerate(self.values))
+
+
+class Table(object):
+    """Columns of the same length.
+
+    The `record` column is an `array` of integers, the columns in `numbers` are arrays of
+    floats, the columns in `codes` are `Codes` and the others are lists.
+    """
+
+    def __init__(self, names, numbers=(), codes=()):
+        self.columns = OrderedDict(
+            (name, array('q') if name == 'record' else array('d') if name in numbers else
+             Codes() if name in codes else []) for name in names)
+
+    def __len__(self):
+        return len(self.columns['record'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def append(self, *values):
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+
+    def extend(self, other, offset=0):
+        """Append the rows of another table, adding `offset` to its record numbers."""
+        for name, column in self.columns.items():
+            if name == 'record' and offset:
+                column.extend(record + offset for record in other.columns[name])
+            else:
+                column.extend(other.columns[name])
+
+    def rows(self):
+        """Iterate over the rows as tuples."""
+        return zip(*self.columns.values())
+
+
+class Summary(object):
+    """Columns of the variables, domains, dimensions, operations and outputs of an archive."""
+
+    def __init__(self):
+        self.records = 0
+        self.variables = Table(['record', 'uri', 'var_name'], codes=['uri', 'var_name'])
+        self.domains = Table(['record', 'id', 'mask'])
+        self.dimensions = Table(['record', 'domain', 'name', 'start', 'end', 'step', 'crs', 'start_text', 'end_text'],
+                                numbers=['start', 'end', 'step'], codes=['name', 'crs', 'start_text', 'end_text'])
+        self.operations = Table(['record', 'name', 'domain'], codes=['name'])
+        self.outputs = Table(['record', 'uri', 'mimetype'], codes=['mimetype'])
+        self.errors = []
+
+    @property
+    def tables(self):
+        return OrderedDict([('variables', self.variables), ('domains', self.domains),
+                            ('dimensions', self.dimensions), ('operations', self.operations),
+                            ('outputs', self.outputs)])
+
+    def extend(self, other):
+        """Append the records of another summary."""
+        for name, table in self.tables.items():
+            table.extend(getattr(other, name), self.records)
+        self.errors.extend(other.errors)
+        self.records += other.records
+
+    def add(self, data, position=None):
+        """Parse and add one record given as decoded JSON object.
+
+        :param position: position of the record in the file, used in `errors`.
+        """
+        record = self.records
+        self.records += 1
+        try:
+            documents = dict((key, cls.from_json(_items(data[key])))
+                             for key, cls in DOCUMENTS.items() if data.get(key) is not None)
+        except Exception as e:
+            self.errors.append((position if position is not None else record, '{}: {}'.format(type(e).__name__, e)))
+            return
+        for variable in documents.get('variable', ()):
+            self.variables.append(record, variable.uri, variable.var_name)
+        for domain in documents.get('domain', ()):
+            self.domains.append(record, domain.id, domain.mask)
+            for name, dimension in domain.dimensions.items():
+                start, end = _number(dimension.start), _number(dimension.end)
+                self.dimensions.append(record, domain.id, name, start, end, _number(dimension.step), dimension.crs,
+                                       _text(dimension.start, start), _text(dimension.end, end))
+        for operation in documents.get('operation', ()):
+            self.operations.append(record, operation.name, operation.domain)
+        for output in documents.get('outputs', Outputs()).outputs:
+            self.outputs.append(record, output.uri, output.mimetype)
+
+
+def _number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return math.nan
+
+
+def _text(value, number):
+    # bounds which are not numbers, e.g. dates
+    return None if value is None or number == number else str(value)
+
+
+def _items(value):
+    if isinstance(value, (str, bytes)):
+        value = decoder.loads(value)
+    return [value] if isinstance(value, dict) else value
+
+
+def summarize(lines, start=0):
+    """Return the `Summary` of an iterable of JSON lines (`str` or `bytes`).
+
+    :param start: position of the first line in the file, errors are reported with the
+        byte offset (for `bytes`) or character offset (for `str`) of the line.
+    """
+    summary = Summary()
+    position = start
+    for line in lines:
+        if line.strip():
+            try:
+                data = decoder.loads(line)
+                if not isinstance(data, dict):
+                    raise ValueError('expected a JSON object')
+            except Exception as e:
+                summary.records += 1
+                summary.errors.append((position, '{}: {}'.format(type(e).__name__, e)))
+            else:
+                summary.add(data, position)
+        position += len(line)
+    return summary
+
+
+def _lines(f, start, end):
+    """Iterate over the lines of an open binary file from `start`, which start before `end`."""
+    position = start
+    while position < end:
+        line = f.readline()
+        if not line:
+            break
+        position += len(line)
+        yield line
+
+
+def summarize_range(path, start, end):
+    """Return the `Summary` of the lines of a file which start in the byte range `[start, end)`."""
+    with open(path, 'rb') as f:
+        if start > 0:
+            # skip the line started in the previous range
+            f.seek(start - 1)
+            start += len(f.readline()) - 1
+        return summarize(_lines(f, start, end), start)
+
+
+def ranges(path, chunk_size=CHUNK_SIZE):
+    """Split a file into byte ranges `(start, end)` of about `chunk_size` bytes."""
+    size = os.path.getsize(path)
+    return [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+
+def load(path, processes=None, chunk_size=CHUNK_SIZE):
+    """Parse a JSON lines archive in parallel and return its `Summary`.
+
+    :param path: path of the file.
+    :param processes: number of worker processes, default the number of CPUs. With 1 the
+        file is parsed in this process.
+    :param chunk_size: bytes of the file parsed by a worker at a time.
+    """
+    path = os.path.expanduser(path)
+    chunks = ranges(path, chunk_size)
+    summary = Summary()
+    if processes == 1 or len(chunks) < 2:
+        for start, end in chunks:
+            summary.extend(summarize_range(path, start, end))
+        return summary
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # map returns the summaries in the order of the chunks
+        for chunk in executor.map(summarize_range, *zip(*[(path, start, end) for start, end in chunks])):
+            summary.extend(chunk)
+    return summary
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cache for GetCapabilities and DescribeProcess documents.
+
+Documents are kept in an in-memory LRU cache and optionally in a directory on disk,
+so that short-lived worker processes can skip these requests entirely. Expired
+documents are revalidated with their `ETag`::
+
+    >>> from owslib.wps import WebProcessingService
+    >>> from owslib_esgfwps.cache import DocumentCache
+    >>> cache = DocumentCache(ttl=3600, path='~/.cache/owslib-esgfwps')
+    >>> wps = WebProcessingService(url='http://localhost:5000/wps', skip_caps=True)
+    >>> cache.capabilities(wps)
+    >>> process = cache.describeprocess(wps, 'pelican_subset')
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import requests
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'revalidated', 'currsize'])
+
+
+class _Entry(object):
+    __slots__ = ('content', 'etag', 'expires')
+
+    def __init__(self, content, etag=None, expires=0):
+        self.content = content
+        self.etag = etag
+        self.expires = expires
+
+
+class DocumentCache(object):
+    """Cache of WPS documents keyed by endpoint URL and process identifier.
+
+    :param maxsize: maximum number of documents kept in memory.
+    :param ttl: seconds a document is used without revalidation.
+    :param path: optional directory to persist documents.
+    :param session: `requests.Session` used to fetch documents. A `Client` sets its own session.
+    :param timeout: timeout of the HTTP requests in seconds.
+    """
+
+    def __init__(self, maxsize=128, ttl=3600, path=None, session=None, timeout=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = os.path.expanduser(path) if path else None
+        self.session = session
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidated = 0
+        if self.path and not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, self._revalidated, len(self._entries))
+
+    def clear(self):
+        """Remove all documents from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.path, name))
+
+    def capabilities(self, wps):
+        """Populate the `WebProcessingService` with the cached capabilities document."""
+        params = dict(service='WPS', request='GetCapabilities', version=wps.version)
+        wps.getcapabilities(xml=self.get(wps.url, params, headers=wps.headers))
+        return wps
+
+    def describeprocess(self, wps, identifier):
+        """Return the process description from the cached DescribeProcess document."""
+        params = dict(service='WPS', request='DescribeProcess', version=wps.version, identifier=identifier)
+        return wps.describeprocess(identifier, xml=self.get(wps.url, params, headers=wps.headers))
+
+    def get(self, url, params, headers=None):
+        """Return the document for the request `url` with query `params`."""
+        key = self._key(url, params)
+        now = time.time()
+        entry = self._lookup(key)
+        if entry is not None and entry.expires > now:
+            self._hits += 1
+            return entry.content
+        request_headers = dict(headers or {})
+        if entry is not None and entry.etag:
+            request_headers['If-None-Match'] = entry.etag
+        response = (self.session or requests).get(url, params=params, headers=request_headers, timeout=self.timeout)
+        if entry is not None and response.status_code == 304:
+            self._revalidated += 1
+            entry.expires = now + self.ttl
+        else:
+            self._misses += 1
+            response.raise_for_status()
+            entry = _Entry(response.content, response.headers.get('ETag'), now + self.ttl)
+        self._store(key, entry)
+        return entry.content
+
+    @staticmethod
+    def _key(url, params):
+        query = '&'.join('{}={}'.format(k.lower(), v) for k, v in sorted(params.items()))
+        return hashlib.sha1('{}?{}'.format(url, query).encode('utf-8')).hexdigest()
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        if self.path:
+            filename = os.path.join(self.path, key + '.json')
+            try:
+                with open(filename) as f:
+                    data = json.load(f)
+                entry = _Entry(data['content'].encode('utf-8'), data.get('etag'), data.get('expires', 0))
+            except (IOError, ValueError, KeyError, TypeError, AttributeError):
+                # missing, partly written or foreign file
+                return None
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, key, entry):
+        self._remember(key, entry)
+        if self.path:
+            data = dict(content=entry.content.decode('utf-8'), etag=entry.etag, expires=entry.expires)
+            filename = os.path.join(self.path, key + '.json')
+            tmp = '{}.{}.{}.tmp'.format(filename, os.getpid(), threading.get_ident())
+            with open(tmp, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, filename)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+WPS client which sends all HTTP requests to a compute node through a pooled session.
+
+OWSLib opens a new HTTP connection for every GetCapabilities, Execute, status and
+output request. The `Client` owns a `requests.Session` with a connection pool and
+keep-alive, which is used for the OWSLib requests of its `wps` and of the executions it
+returns to the host of the WPS. Other `WebProcessingService` objects are not affected::
+
+    >>> from owslib_esgfwps.client import Client
+    >>> with Client('http://localhost:5000/wps', token='TOKEN', pool_maxsize=20) as client:
+    ...     execution = client.execute('pelican_subset', inputs=[('domain', domains), ('variable', variables)])
+
+The token is sent as `COMPUTE-TOKEN` header. HTTP/2 is not available because
+OWSLib is built on `requests`, which only speaks HTTP/1.1.
+"""
+
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import owslib.util
+import requests
+from owslib.wps import WebProcessingService, WPSExecution, ASYNC
+from requests.adapters import HTTPAdapter
+
+from . import hooks
+
+TOKEN_HEADER = 'COMPUTE-TOKEN'
+
+
+def _host(url):
+    parts = urlsplit(url)
+    return '{}://{}'.format(parts.scheme, parts.netloc).lower()
+
+
+class _SessionRouter(object):
+    """Replaces the `requests` module in `owslib.util`.
+
+    Requests made in a `using` block of the current thread to the host of that block are
+    sent through its session, all other requests are passed to the `requests` module.
+    """
+
+    def __init__(self, module):
+        self._module = module
+        self._local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    @contextmanager
+    def using(self, url, session):
+        """Send the requests of this thread to the host of `url` through `session`."""
+        previous = getattr(self._local, 'route', None)
+        self._local.route = (_host(url), session)
+        try:
+            yield
+        finally:
+            self._local.route = previous
+
+    def session(self, url):
+        route = getattr(self._local, 'route', None)
+        if route is not None and route[0] == _host(url):
+            return route[1]
+        return None
+
+    def request(self, method, url, **kwargs):
+        session = self.session(url)
+        if session is None:
+            return self._module.request(method, url, **kwargs)
+        return session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, data=None, json=None, **kwargs):
+        return self.request('POST', url, data=data, json=json, **kwargs)
+
+    def put(self, url, data=None, **kwargs):
+        return self.request('PUT', url, data=data, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+def _router():
+    if not isinstance(owslib.util.requests, _SessionRouter):
+        owslib.util.requests = _SessionRouter(owslib.util.requests)
+    return owslib.util.requests
+
+
+class _ClientExecution(WPSExecution):
+    """`WPSExecution` which reads status documents and outputs through the session of its `Client`."""
+
+    def checkStatus(self, *args, **kwargs):
+        with _router().using(self.url, self._session):
+            return super(_ClientExecution, self).checkStatus(*args, **kwargs)
+
+    def getOutput(self, *args, **kwargs):
+        with _router().using(self.url, self._session):
+            return super(_ClientExecution, self).getOutput(*args, **kwargs)
+
+
+class _ClientWPS(WebProcessingService):
+    """`WebProcessingService` which sends its requests through the session of its `Client`."""
+
+    def __init__(self, url, session, **kwargs):
+        self._session = session
+        with _router().using(url, session):
+            super(_ClientWPS, self).__init__(url, **kwargs)
+
+    def getcapabilities(self, *args, **kwargs):
+        with _router().using(self.url, self._session):
+            return super(_ClientWPS, self).getcapabilities(*args, **kwargs)
+
+    def describeprocess(self, *args, **kwargs):
+        with _router().using(self.url, self._session):
+            return super(_ClientWPS, self).describeprocess(*args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        with _router().using(self.url, self._session):
+            execution = super(_ClientWPS, self).execute(*args, **kwargs)
+        execution.__class__ = _ClientExecution
+        execution._session = self._session
+        return execution
+
+
+class Client(object):
+    """OWSLib `WebProcessingService` using a pooled keep-alive session.
+
+    :param url: URL of the WPS service.
+    :param token: compute token sent as `COMPUTE-TOKEN` header.
+    :param headers: additional HTTP headers.
+    :param pool_connections: number of connection pools to cache.
+    :param pool_maxsize: maximum number of connections kept per pool. Use at least the number
+        of concurrent requests, e.g. `max_workers` of a `BatchSubmitter`.
+    :param max_retries: retries of failed connections done by `urllib3`.
+    :param skip_caps: do not fetch the capabilities document on initialization.
+    :param session: use this `requests.Session` instead of creating a new one.
+    :param cache: optional `DocumentCache` for the capabilities and process descriptions.
+
+    Further keyword arguments are passed to `WebProcessingService`.
+    """
+
+    def __init__(self, url, token=None, headers=None, pool_connections=10, pool_maxsize=10, max_retries=0,
+                 skip_caps=True, session=None, cache=None, **kwargs):
+        self.url = url
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=max_retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        headers = dict(headers or {})
+        if token:
+            headers[TOKEN_HEADER] = token
+        self.session.headers.update(headers)
+        self.cache = cache
+        if cache is not None and cache.session is None:
+            cache.session = self.session
+        self.wps = _ClientWPS(url, self.session, headers=headers, skip_caps=skip_caps or cache is not None, **kwargs)
+        if cache is not None and not skip_caps:
+            self.getcapabilities()
+
+    def execute(self, identifier, inputs, output=None, mode=ASYNC, **kwargs):
+        with hooks.timed('execute', identifier=identifier, endpoint=hooks.endpoint(self.url), mode=mode) as event:
+            execution = self.wps.execute(identifier, inputs=inputs, output=output, mode=mode, **kwargs)
+            event.tags['status'] = execution.status
+        return execution
+
+    def describeprocess(self, identifier):
+        if self.cache is not None:
+            return self.cache.describeprocess(self.wps, identifier)
+        return self.wps.describeprocess(identifier)
+
+    def getcapabilities(self):
+        if self.cache is not None:
+            return self.cache.capabilities(self.wps)
+        return self.wps.getcapabilities()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
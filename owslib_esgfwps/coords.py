@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Convert value domains to index domains with a local coordinate index.
+
+A `CoordinateIndex` holds the sorted coordinate values of one dimension of a dataset.
+`Dimension` objects with `crs='values'` are converted to `crs='indices'` with a binary
+search, so index domains can be tiled and their size estimated before submission.
+Indexes are cached per `Variable.uri` and dimension name::
+
+    >>> import numpy as np
+    >>> from owslib_esgfwps import Domain, Dimension, Variable
+    >>> from owslib_esgfwps.coords import register, to_indices
+    >>> tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    >>> register(tas.uri, 'lat', np.arange(-89.75, 90, 0.5))
+    >>> d0 = to_indices(tas, Domain(dict(lat=Dimension(0, 45))))
+    >>> d0.dimensions['lat'].json
+    {'start': 180, 'end': 269, 'step': 1, 'crs': 'indices'}
+
+Indexes which are not registered are read from the dataset with `netCDF4`, which
+also opens OPeNDAP URLs. The `step` of a dimension is kept as a stride of points.
+"""
+
+import threading
+
+import numpy as np
+
+from .cwt import Dimension, Domain, ParameterError
+
+EPSILON = 1e-9
+
+
+class CoordinateIndex(object):
+    """Sorted coordinate values of a dimension.
+
+    :param values: 1-d array of monotonic coordinate values, ascending or descending.
+    """
+
+    def __init__(self, values):
+        values = np.array(values)
+        if values.ndim != 1 or not len(values):
+            raise ParameterError('Coordinate values must be a non-empty 1-d array.')
+        self.descending = len(values) > 1 and values[0] > values[-1]
+        self._values = values[::-1] if self.descending else values
+        if np.any(np.diff(self._values) <= 0):
+            raise ParameterError('Coordinate values must be strictly monotonic.')
+        self._values.flags.writeable = False
+        spacing = np.median(np.diff(self._values)) if len(values) > 1 else 1
+        self._tolerance = abs(float(spacing)) * EPSILON
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def values(self):
+        """Coordinate values in the order of the dataset."""
+        return self._values[::-1] if self.descending else self._values
+
+    def _position(self, position):
+        # position in the dataset order of a position in the sorted values
+        return len(self._values) - 1 - position if self.descending else position
+
+    def locate(self, start=None, end=None):
+        """Return the first and last index of the coordinates within `start` and `end`.
+
+        `None` means the first or last coordinate. Raises `ParameterError` if no
+        coordinate is within the range.
+        """
+        low, high = start, end
+        if low is not None and high is not None and low > high:
+            low, high = high, low
+        first = 0 if low is None else int(np.searchsorted(self._values, low - self._tolerance, side='left'))
+        last = len(self._values) - 1 if high is None else \
+            int(np.searchsorted(self._values, high + self._tolerance, side='right')) - 1
+        if first > last:
+            raise ParameterError('No coordinate between {} and {}.'.format(start, end))
+        first, last = sorted((self._position(first), self._position(last)))
+        return first, last
+
+    def to_indices(self, dimension):
+        """Return a copy of a `crs='values'` dimension with `crs='indices'`."""
+        if dimension.crs == 'indices':
+            return Dimension(dimension.start, dimension.end, dimension.step, dimension.crs)
+        first, last = self.locate(dimension.start, dimension.end)
+        return Dimension(first, last, dimension.step, crs='indices')
+
+    def to_values(self, dimension):
+        """Return a copy of a `crs='indices'` dimension with `crs='values'`."""
+        if dimension.crs == 'values':
+            return Dimension(dimension.start, dimension.end, dimension.step, dimension.crs)
+        values = self.values
+        start = 0 if dimension.start is None else dimension.start
+        end = len(values) - 1 if dimension.end is None else dimension.end
+        if not 0 <= start <= end < len(values):
+            raise ParameterError('Indices {} to {} are out of range.'.format(start, end))
+        return Dimension(values[start].item(), values[end].item(), dimension.step, crs='values')
+
+
+def load_netcdf(uri, name):
+    """Read the coordinate variable `name` of a NetCDF file or OPeNDAP URL with `netCDF4`."""
+    try:
+        import netCDF4
+    except ImportError:
+        raise ImportError('netCDF4 is required to read coordinates of {}.'.format(uri))
+    with netCDF4.Dataset(uri) as dataset:
+        if name not in dataset.variables:
+            raise ParameterError('Dataset {} has no coordinate {}.'.format(uri, name))
+        return np.asarray(dataset.variables[name][:])
+
+
+class IndexCache(object):
+    """Coordinate indexes keyed by dataset URI and dimension name.
+
+    :param loader: function `loader(uri, name)` returning the coordinate values of an index
+        which was not registered. Default is `load_netcdf`.
+    """
+
+    def __init__(self, loader=None):
+        self.loader = loader or load_netcdf
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def register(self, uri, name, values):
+        """Add the coordinate values of dimension `name` of the dataset `uri`."""
+        index = values if isinstance(values, CoordinateIndex) else CoordinateIndex(values)
+        with self._lock:
+            self._indexes[(uri, name)] = index
+        return index
+
+    def get(self, uri, name):
+        """Return the index of dimension `name` of `uri`, loading it on first use."""
+        with self._lock:
+            index = self._indexes.get((uri, name))
+        if index is None:
+            index = self.register(uri, name, self.loader(uri, name))
+        return index
+
+    def __contains__(self, key):
+        return key in self._indexes
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+    def to_indices(self, variable, domain=None):
+        """Return a copy of `domain` with all dimensions in `crs='indices'`.
+
+        :param variable: the `Variable` whose coordinates are used.
+        :param domain: a `Domain`, default is the domain of the variable.
+        :return: a new `Domain` with a new id and the mask of `domain`.
+        """
+        domain = domain if domain is not None else variable.domain
+        if not isinstance(domain, Domain):
+            raise ParameterError('Variable {} has no Domain object.'.format(variable.id))
+        dimensions = dict(
+            (name, self.get(variable.uri, name).to_indices(dimension) if dimension.crs == 'values'
+             else Dimension(dimension.start, dimension.end, dimension.step, dimension.crs))
+            for name, dimension in domain.dimensions.items())
+        return Domain(dimensions, mask=domain.mask)
+
+
+_cache = IndexCache()
+
+
+def register(uri, name, values):
+    """Add coordinate values to the default `IndexCache`."""
+    return _cache.register(uri, name, values)
+
+
+def coordinate_index(uri, name):
+    """Return an index of the default `IndexCache`."""
+    return _cache.get(uri, name)
+
+
+def to_indices(variable, domain=None):
+    """Convert `domain` to indices with the default `IndexCache`."""
+    return _cache.to_indices(variable, domain)
+
+
+def clear():
+    """Remove all indexes of the default `IndexCache`."""
+    _cache.clear()
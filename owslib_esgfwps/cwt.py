@@ -22,19 +22,258 @@ Use the `owslib-esgfwps` extension to execute the `pelican_subset` WPS process::
 """
 
 import json
-import yaml
-from uuid import uuid4
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from weakref import WeakSet, ref
 
 from owslib.wps import ComplexDataInput
 
+from . import decoder, hooks, ids
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses'])
+
+_cache_stats = dict(hits=0, misses=0)
+
+# generated ids are set once, also when objects are shared between threads
+_id_lock = threading.RLock()
+
+
+def cache_info():
+    """Return the hit/miss counters of the serialization cache of all `WPSParameter` objects."""
+    return CacheInfo(**_cache_stats)
+
+
+def reset_cache_info():
+    """Reset the global serialization cache counters."""
+    _cache_stats.update(hits=0, misses=0)
+
 
 class ParameterError(Exception):
     pass
 
 
+def _no_owner():
+    return None
+
+
+def _unowned(cls, items):
+    """Rebuild a pickled tracked container, its owner is set by `Parameter.__setstate__`."""
+    container = cls.__new__(cls)
+    super(cls, container).__init__(items)
+    container._owner = _no_owner
+    return container
+
+
+class _TrackedList(list):
+    """List which notifies its owner parameter when it is modified."""
+
+    __slots__ = ('_owner',)
+
+    def __init__(self, owner, items=()):
+        super(_TrackedList, self).__init__(items)
+        self._own(owner)
+
+    def _own(self, owner):
+        self._owner = ref(owner)
+        for item in self:
+            _adopt(owner, item)
+
+    def __reduce__(self):
+        # the weak reference to the owner cannot be pickled
+        return _unowned, (type(self), list(self))
+
+    def _changed(self, items=()):
+        owner = self._owner()
+        if owner is not None:
+            for item in items:
+                _adopt(owner, item)
+            owner._changed()
+
+    def __setitem__(self, index, value):
+        super(_TrackedList, self).__setitem__(index, value)
+        self._changed(value if isinstance(index, slice) else [value])
+
+    def __delitem__(self, index):
+        super(_TrackedList, self).__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, items):
+        items = list(items)
+        result = super(_TrackedList, self).__iadd__(items)
+        self._changed(items)
+        return result
+
+    def __imul__(self, count):
+        result = super(_TrackedList, self).__imul__(count)
+        self._changed()
+        return result
+
+    def append(self, item):
+        super(_TrackedList, self).append(item)
+        self._changed([item])
+
+    def extend(self, items):
+        items = list(items)
+        super(_TrackedList, self).extend(items)
+        self._changed(items)
+
+    def insert(self, index, item):
+        super(_TrackedList, self).insert(index, item)
+        self._changed([item])
+
+    def pop(self, *args):
+        item = super(_TrackedList, self).pop(*args)
+        self._changed()
+        return item
+
+    def remove(self, item):
+        super(_TrackedList, self).remove(item)
+        self._changed()
+
+    def clear(self):
+        super(_TrackedList, self).clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super(_TrackedList, self).sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super(_TrackedList, self).reverse()
+        self._changed()
+
+
+class _TrackedDict(dict):
+    """Dict which notifies its owner parameter when it is modified."""
+
+    __slots__ = ('_owner',)
+
+    def __init__(self, owner, items=()):
+        super(_TrackedDict, self).__init__(items)
+        self._own(owner)
+
+    def _own(self, owner):
+        self._owner = ref(owner)
+        for item in self.values():
+            _adopt(owner, item)
+
+    def __reduce__(self):
+        return _unowned, (type(self), dict(self))
+
+    def _changed(self, items=()):
+        owner = self._owner()
+        if owner is not None:
+            for item in items:
+                _adopt(owner, item)
+            owner._changed()
+
+    def __setitem__(self, key, value):
+        super(_TrackedDict, self).__setitem__(key, value)
+        self._changed([value])
+
+    def __delitem__(self, key):
+        super(_TrackedDict, self).__delitem__(key)
+        self._changed()
+
+    def update(self, *args, **kwargs):
+        super(_TrackedDict, self).update(*args, **kwargs)
+        self._changed(list(self.values()))
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def pop(self, *args):
+        item = super(_TrackedDict, self).pop(*args)
+        self._changed()
+        return item
+
+    def popitem(self):
+        item = super(_TrackedDict, self).popitem()
+        self._changed()
+        return item
+
+    def clear(self):
+        super(_TrackedDict, self).clear()
+        self._changed()
+
+
+def _adopt(parent, child):
+    if isinstance(child, Parameter):
+        child._add_parent(parent)
+
+
 class Parameter(object):
+    __slots__ = ('_parents', '__weakref__')
+
     def __init__(self):
-        pass
+        self._parents = None
+
+    def _add_parent(self, parent):
+        # a single parent is kept as plain weak reference, a WeakSet is only used when shared.
+        if self._parents is None:
+            self._parents = ref(parent)
+        elif isinstance(self._parents, ref):
+            first = self._parents()
+            if first is parent:
+                return
+            self._parents = WeakSet([parent])
+            if first is not None:
+                self._parents.add(first)
+        else:
+            self._parents.add(parent)
+
+    def __getstate__(self):
+        # the weak references to the containers are rebuilt when the containers are loaded
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if name not in ('_parents', '__weakref__') and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state):
+        self._parents = None
+        for name, value in state.items():
+            if isinstance(value, (_TrackedList, _TrackedDict)) and value._owner() is None:
+                value._own(self)
+            setattr(self, name, value)
+
+    def _new_id(self):
+        # the id generator of the collection of this parameter or the global generator
+        parent = self._parents() if isinstance(self._parents, ref) else None
+        generate = getattr(parent, '_id_generator', None)
+        return (generate or ids.generate)(self)
+
+    def _lazy_id(self, attr):
+        """Return the id stored in the slot `attr`, generated on first access."""
+        value = getattr(self, attr)
+        if value is None:
+            with _id_lock:
+                value = getattr(self, attr)
+                if value is None:
+                    value = self._new_id()
+                    setattr(self, attr, value)
+        return value
+
+    def _changed(self):
+        """Notify all containers of this parameter that its content has changed."""
+        if self._parents is None:
+            return
+        if isinstance(self._parents, ref):
+            parents = [self._parents()]
+        else:
+            parents = list(self._parents)
+        for parent in parents:
+            if parent is not None:
+                parent._changed()
 
     @property
     def json(self):
@@ -56,27 +295,105 @@ class Parameter(object):
 
 
 class WPSParameter(ComplexDataInput, Parameter):
+    """Complex input with a cached JSON serialization.
+
+    The serialized form is kept until the collection or one of its members changes.
+    """
+
     def __init__(self):
+        self._parents = None
+        self._value = None
+        self._encoded = None
+        self._hits = 0
+        self._misses = 0
         super(WPSParameter, self).__init__(
             value=None,
             mimeType="application/json",
             encoding=None,
             schema=None)
 
+    def _changed(self):
+        self._value = None
+        self._encoded = None
+        super(WPSParameter, self)._changed()
+
+    def _hit(self):
+        self._hits += 1
+        _cache_stats['hits'] += 1
+
+    def _miss(self):
+        self._misses += 1
+        _cache_stats['misses'] += 1
+
+    def cache_info(self):
+        """Return the hit/miss counters of the serialization cache of this parameter."""
+        return CacheInfo(hits=self._hits, misses=self._misses)
+
     @property
     def value(self):
-        return json.dumps(self.json)
+        if self._value is None:
+            self._miss()
+            started = time.perf_counter()
+            self._value = json.dumps(self.json)
+            hooks.emit('encode', time.perf_counter() - started, len(self._value), parameter=type(self).__name__)
+        else:
+            self._hit()
+        return self._value
+
+    @property
+    def encoded(self):
+        """The serialized JSON value as UTF-8 encoded bytes."""
+        if self._encoded is None:
+            self._encoded = self.value.encode('utf-8')
+        else:
+            self._hit()
+        return self._encoded
+
+    def iterencode(self, chunk_size=65536):
+        """Yield the serialized JSON value as UTF-8 encoded chunks of about `chunk_size` bytes.
+
+        The members are encoded one at a time, so the whole document is never held in memory
+        unless it is already cached. The result is identical to `encoded`.
+        """
+        if self._encoded is not None or self._value is not None:
+            self._hit()
+            encoded = self._encoded or self._value.encode('utf-8')
+            for start in range(0, len(encoded), chunk_size):
+                yield encoded[start:start + chunk_size]
+            return
+        self._miss()
+        buffer = [b'[']
+        size = 1
+        for index, member in enumerate(self):
+            data = json.dumps(member.json).encode('utf-8')
+            if index:
+                buffer.append(b', ')
+                size += 2
+            buffer.append(data)
+            size += len(data)
+            if size >= chunk_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        buffer.append(b']')
+        yield b''.join(buffer)
+
+    def dump(self, fp, chunk_size=65536):
+        """Write the serialized JSON value to the binary file-like object `fp`."""
+        for chunk in self.iterencode(chunk_size=chunk_size):
+            fp.write(chunk)
 
     @value.setter
     def value(self, value):
         if value:
-            self.from_json(yaml.safe_load(value))
+            self.from_json(decoder.loads(value))
 
 
 class Output(Parameter):
+    __slots__ = ('_id', '_uri', '_domain', '_mimetype')
+
     def __init__(self, id=None, uri=None, domain=None, mimetype=None):
         super(Output, self).__init__()
-        self._id = id or uuid4().hex
+        self._id = id
         self._uri = uri
         self._domain = domain
         self._mimetype = mimetype
@@ -86,7 +403,7 @@ class Output(Parameter):
 
     @property
     def id(self):
-        return self._id
+        return self._lazy_id('_id')
 
     @property
     def uri(self):
@@ -96,6 +413,9 @@ class Output(Parameter):
     def domain(self):
         return self._domain
 
+    def _content(self):
+        return dict(uri=self.uri, domain=self.domain, mimetype=self.mimetype)
+
     @property
     def mimetype(self):
         return self._mimetype
@@ -124,6 +444,11 @@ class Output(Parameter):
     def params(self):
         return self.json
 
+    def fetch(self, directory='.', path=None, **kwargs):
+        """Download the output file. See `owslib_esgfwps.download.fetch` for the options."""
+        from .download import fetch
+        return fetch(self.uri, path=path, directory=directory, **kwargs)
+
 
 class Outputs(Parameter):
     def __init__(self, outputs=None):
@@ -144,21 +469,123 @@ class Outputs(Parameter):
         return cls(outputs=outputs)
 
     @classmethod
-    def from_owslib(cls, process_outputs):
+    def from_owslib(cls, process_outputs, lazy=False):
+        """Parse the `output` of an OWSLib execution. Use `lazy=True` to get a `LazyOutputs`."""
+        if lazy:
+            cls = LazyOutputs
         for output in process_outputs:
             if output.identifier == 'output':
-                return cls.from_json(data=yaml.safe_load(output.data[0]))
+                started = time.perf_counter()
+                outputs = cls.from_json(data=decoder.loads(output.data[0]))
+                hooks.emit('parse', time.perf_counter() - started, len(output.data[0]), parameter=cls.__name__)
+                return outputs
         return cls(outputs=[])
 
+    def __len__(self):
+        return len(self.outputs)
+
+    def __iter__(self):
+        return iter(self.outputs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.__class__(outputs=self.outputs[index])
+        return self.outputs[index]
+
+    def filter(self, mimetype=None, domain=None):
+        """Return the outputs with the given mime-type and/or domain id."""
+        return self.__class__(outputs=[
+            output for output in self.outputs
+            if _matches(output.mimetype, output.domain, mimetype, domain)])
+
     @property
     def params(self):
         return dict(outputs=[output.id for output in self.outputs])
 
+    def fetch_all(self, directory='.', max_workers=4, **kwargs):
+        """Download all output files concurrently and return the list of `FetchResult`.
+
+        Outputs with the same file name are saved with a number, e.g. `tas-1.nc`.
+        """
+        from .download import unique_filenames
+        outputs = self.outputs
+        paths = [os.path.join(directory, name) for name in unique_filenames(output.uri for output in outputs)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda output, path: output.fetch(directory, path=path, **kwargs),
+                                     outputs, paths))
+
+
+def _matches(output_mimetype, output_domain, mimetype, domain):
+    if mimetype is not None and output_mimetype != mimetype:
+        return False
+    if domain is not None:
+        if isinstance(output_domain, dict):
+            output_domain = output_domain.get('id')
+        if getattr(output_domain, 'id', output_domain) != getattr(domain, 'id', domain):
+            return False
+    return True
+
+
+class LazyOutputs(Outputs):
+    """Outputs which keep the decoded JSON and build `Output` objects only when accessed.
+
+    `len()`, slicing and `filter` work on the JSON data without building `Output` objects.
+    Slices and filtered views share the built objects with the outputs they come from.
+    """
+
+    def __init__(self, outputs=None, data=None):
+        super(LazyOutputs, self).__init__(outputs=outputs)
+        if data is None:
+            self._data = [output.json for output in self._outputs]
+            self._items = list(self._outputs)
+        else:
+            self._data = list(data)
+            self._items = [None] * len(self._data)
+        self._indices = range(len(self._data))
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data=data)
+
+    def _view(self, indices):
+        view = LazyOutputs()
+        view._data = self._data
+        view._items = self._items
+        view._indices = indices
+        return view
+
+    @property
+    def outputs(self):
+        return list(self)
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._view(self._indices[index])
+        index = self._indices[index]
+        output = self._items[index]
+        if output is None:
+            output = self._items[index] = Output.from_json(self._data[index])
+        return output
+
+    def filter(self, mimetype=None, domain=None):
+        return self._view([
+            index for index in self._indices
+            if _matches(self._data[index].get('mime-type'), self._data[index].get('domain'), mimetype, domain)])
+
 
 class Variable(Parameter):
+    __slots__ = ('_name', '_uri', '_id', '_domain', '_var_name')
+
     def __init__(self, uri, var_name=None, id=None, domain=None):
         super(Variable, self).__init__()
-        self._name = uuid4().hex
+        self._name = None
         self._uri = uri
         self._id = None
         self._domain = domain
@@ -169,20 +596,19 @@ class Variable(Parameter):
                 var_name, self._name = id.split('|')
             else:
                 raise ParameterError('Variable id must contain a variable name and id.')
-        if var_name:
-            self._var_name = var_name
-            if not id:
-                self._id = '{}|{}'.format(var_name, self._name)
-
-        if not self._id:
+        if not var_name:
             raise ParameterError('Variable must have an id.')
+        self._var_name = var_name
 
     @property
     def name(self):
-        return self._name
+        return self._lazy_id('_name')
 
     @property
     def id(self):
+        if self._id is None:
+            # derived from the name, concurrent reads compute the same value
+            self._id = '{}|{}'.format(self._var_name, self.name)
         return self._id
 
     @property
@@ -197,6 +623,17 @@ class Variable(Parameter):
     def domain(self):
         return self._domain
 
+    def _content(self):
+        return dict(uri=self.uri, var_name=self.var_name, domain=getattr(self.domain, 'id', self.domain))
+
+    def metadata(self, cache=None):
+        """Return the `VariableMetadata` read from the DDS and DAS of the OPeNDAP `uri`.
+
+        See `owslib_esgfwps.metadata`. The shared cache is used if `cache` is not given.
+        """
+        from .metadata import default_cache
+        return (cache or default_cache()).variable(self)
+
     @property
     def json(self):
         data = dict(uri=self.uri, id=self.id)
@@ -210,14 +647,21 @@ class Variable(Parameter):
 
 
 class Variables(WPSParameter):
-    def __init__(self, variables=None):
+    def __init__(self, variables=None, id_generator=None):
         super(Variables, self).__init__()
-        self._variables = variables or []
+        self._id_generator = id_generator
+        self._variables = _TrackedList(self, variables or [])
 
     @property
     def variables(self):
         return self._variables
 
+    def __len__(self):
+        return len(self._variables)
+
+    def __iter__(self):
+        return iter(self._variables)
+
     @property
     def json(self):
         return [var.json for var in self.variables]
@@ -227,17 +671,25 @@ class Variables(WPSParameter):
         variables = [Variable.from_json(var) for var in data]
         return cls(variables=variables)
 
+    def prefetch(self, max_workers=8, cache=None):
+        """Read the metadata of all variables concurrently. Returns a dict of URI to `DatasetMetadata`."""
+        from .metadata import default_cache
+        return (cache or default_cache()).prefetch(self.variables, max_workers=max_workers)
+
     @property
     def params(self):
         return dict(variables=[var.id for var in self.variables])
 
 
 class Dimension(Parameter):
+    __slots__ = ('_start', '_end', '_step', '_crs')
+
     def __init__(self, start=None, end=None, step=1, crs=None):
         super(Dimension, self).__init__()
         self._start = start
         self._end = end
         self._step = step
+        self._crs = None
         self.crs = crs or "values"
 
     @property
@@ -259,7 +711,9 @@ class Dimension(Parameter):
     @crs.setter
     def crs(self, value):
         if value in ["values", "indices"]:
-            self._crs = value
+            if value != self._crs:
+                self._crs = value
+                self._changed()
         else:
             raise ValueError
 
@@ -271,22 +725,77 @@ class Dimension(Parameter):
     def params(self):
         return self.json
 
+    def freeze(self):
+        """Return an immutable and hashable copy of this dimension."""
+        return FrozenDimension(self.start, self.end, self.step, self.crs)
+
+    def intersection(self, other):
+        """Return the `Dimension` of the points in both or `None`. See `owslib_esgfwps.algebra`."""
+        from .algebra import intersection
+        return intersection(self, other)
+
+    def contains(self, other):
+        """Return `True` if every point of `other` is in this dimension."""
+        from .algebra import contains
+        return contains(self, other)
+
+    def difference(self, other):
+        """Return the points of this dimension which are not in `other` as a list of disjoint dimensions."""
+        from .algebra import difference
+        return difference(self, other)
+
+
+class FrozenDimension(Dimension):
+    """Immutable and hashable `Dimension`."""
+
+    __slots__ = ()
+
+    @property
+    def crs(self):
+        return self._crs
+
+    @crs.setter
+    def crs(self, value):
+        if self._crs is not None:
+            raise AttributeError('FrozenDimension is immutable.')
+        Dimension.crs.fset(self, value)
+
+    def _key(self):
+        return (self.start, self.end, self.step, self.crs)
+
+    def __eq__(self, other):
+        return isinstance(other, FrozenDimension) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def freeze(self):
+        return self
+
 
 class Domain(Parameter):
+    __slots__ = ('_id', '_dimensions', '_mask')
+
     def __init__(self, dimensions=None, mask=None, id=None):
         super(Domain, self).__init__()
-        self._id = id or uuid4().hex
-        self._dimensions = dimensions or {}
+        self._id = id
+        self._dimensions = _TrackedDict(self, dimensions or {})
         self._mask = mask
 
     @property
     def id(self):
-        return self._id
+        return self._lazy_id('_id')
 
     @property
     def dimensions(self):
         return self._dimensions
 
+    def _content(self):
+        return dict(mask=self.mask, dimensions=dict((key, dim.json) for key, dim in self.dimensions.items()))
+
     @property
     def mask(self):
         return self._mask
@@ -315,16 +824,80 @@ class Domain(Parameter):
     def params(self):
         return dict(id=self.id)
 
+    def freeze(self):
+        """Return an immutable and hashable copy of this domain."""
+        return FrozenDomain(dimensions=self.dimensions, mask=self.mask, id=self.id)
+
+    def intersection(self, other):
+        """Return the `Domain` of the points in both or `None`. See `owslib_esgfwps.algebra`."""
+        from .algebra import intersection
+        return intersection(self, other)
+
+    def contains(self, other):
+        """Return `True` if every point of `other` is in this domain."""
+        from .algebra import contains
+        return contains(self, other)
+
+    def difference(self, other):
+        """Return the points of this domain which are not in `other` as a list of disjoint domains."""
+        from .algebra import difference
+        return difference(self, other)
+
+
+class FrozenDomain(Domain):
+    """Immutable and hashable `Domain`. The dimensions are stored as `FrozenDimension`."""
+
+    __slots__ = ()
+
+    def __init__(self, dimensions=None, mask=None, id=None):
+        Parameter.__init__(self)
+        self._id = id
+        self._dimensions = MappingProxyType(
+            dict((key, dim.freeze()) for key, dim in (dimensions or {}).items()))
+        self._mask = mask
+
+    def __getstate__(self):
+        state = super(FrozenDomain, self).__getstate__()
+        state['_dimensions'] = dict(self._dimensions)
+        return state
+
+    def __setstate__(self, state):
+        super(FrozenDomain, self).__setstate__(state)
+        self._dimensions = MappingProxyType(self._dimensions)
+
+    def _key(self):
+        # an object mask of the ESGF CWT API is a dict
+        return (self.id, json.dumps(self.mask, sort_keys=True), frozenset(self.dimensions.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, FrozenDomain) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def freeze(self):
+        return self
+
 
 class Domains(WPSParameter):
-    def __init__(self, domains=None):
+    def __init__(self, domains=None, id_generator=None):
         super(Domains, self).__init__()
-        self._domains = domains or []
+        self._id_generator = id_generator
+        self._domains = _TrackedList(self, domains or [])
 
     @property
     def domains(self):
         return self._domains
 
+    def __len__(self):
+        return len(self._domains)
+
+    def __iter__(self):
+        return iter(self._domains)
+
     @property
     def json(self):
         return [domain.json for domain in self.domains]
@@ -340,18 +913,22 @@ class Domains(WPSParameter):
 
 
 class Operation(Parameter):
+    __slots__ = ('_name', '_named', '_domain', '_input', '_result', '_axes', '_bins')
+
     def __init__(self, name=None, domain=None, input=None, result=None, axes=None, bins=None):
         super(Operation, self).__init__()
-        self._name = name or uuid4().hex
+        self._name = name
+        # False if the name is generated
+        self._named = name is not None
         self._domain = domain
         self._input = input
-        self._result = result or uuid4().hex
+        self._result = result
         self._axes = axes
         self._bins = bins
 
     @property
     def name(self):
-        return self._name
+        return self._lazy_id('_name')
 
     @property
     def domain(self):
@@ -362,7 +939,7 @@ class Operation(Parameter):
     @property
     def input(self):
         names = []
-        for inpt in self._input:
+        for inpt in self._input or []:
             if hasattr(inpt, 'name'):
                 names.append(inpt.name)
             else:
@@ -371,7 +948,14 @@ class Operation(Parameter):
 
     @property
     def result(self):
-        return self._result
+        if self._result is None:
+            # a generated name is part of the content, generate it first so the result
+            # does not depend on which of both is read first
+            self.name
+        return self._lazy_id('_result')
+
+    def _content(self):
+        return dict(name=self._name, domain=self.domain, input=self.input, axes=self.axes, bins=self.bins)
 
     @property
     def axes(self):
@@ -400,14 +984,21 @@ class Operation(Parameter):
 
 
 class Operations(WPSParameter):
-    def __init__(self, operations=None):
+    def __init__(self, operations=None, id_generator=None):
         super(Operations, self).__init__()
-        self._operations = operations or []
+        self._id_generator = id_generator
+        self._operations = _TrackedList(self, operations or [])
 
     @property
     def operations(self):
         return self._operations
 
+    def __len__(self):
+        return len(self._operations)
+
+    def __iter__(self):
+        return iter(self._operations)
+
     @property
     def json(self):
         return [op.json for op in self.operations]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Decoder for ESGF WPS JSON documents.
+
+The ESGF profile sends `application/json` documents, so payloads are parsed with
+a JSON parser first. The fastest available parser is used (`orjson`, `ujson` or
+the standard library `json` module). Documents which are not valid JSON are
+parsed with `yaml.safe_load` as fallback.
+
+Example::
+
+    >>> from owslib_esgfwps import decoder
+    >>> decoder.loads('[{"id": "d0"}]')
+    [{'id': 'd0'}]
+    >>> decoder.loads("- id: d0")
+    [{'id': 'd0'}]
+"""
+
+import json
+import yaml
+from collections import OrderedDict, namedtuple
+
+DecodeInfo = namedtuple('DecodeInfo', ['backend', 'json', 'yaml'])
+
+BACKENDS = OrderedDict()
+
+try:
+    import orjson
+    BACKENDS['orjson'] = orjson.loads
+except ImportError:
+    pass
+
+try:
+    import ujson
+    BACKENDS['ujson'] = ujson.loads
+except ImportError:
+    pass
+
+BACKENDS['json'] = json.loads
+
+_config = dict(backend=None, loads=None, fallback=True)
+_stats = dict(json=0, yaml=0)
+
+
+def use_backend(name=None, fallback=True):
+    """Select the JSON parser used by :func:`loads`.
+
+    :param name: one of `orjson`, `ujson` or `json`. Use `None` for the fastest available parser.
+    :param fallback: parse non-JSON documents with YAML.
+    """
+    if name is None:
+        name = next(iter(BACKENDS))
+    if name not in BACKENDS:
+        raise ValueError('JSON backend {} is not available. Choose one of {}.'.format(name, list(BACKENDS)))
+    _config.update(backend=name, loads=BACKENDS[name], fallback=fallback)
+
+
+def backend():
+    """Return the name of the JSON parser in use."""
+    return _config['backend']
+
+
+def decode_info():
+    """Return the number of documents decoded with the JSON parser and with the YAML fallback."""
+    return DecodeInfo(backend=_config['backend'], **_stats)
+
+
+def reset_decode_info():
+    """Reset the decode counters."""
+    _stats.update(json=0, yaml=0)
+
+
+def loads(data):
+    """Decode a JSON (or YAML) document given as `str` or `bytes`."""
+    try:
+        result = _config['loads'](data)
+    except ValueError:
+        if not _config['fallback']:
+            raise
+        _stats['yaml'] += 1
+        return yaml.safe_load(data)
+    _stats['json'] += 1
+    return result
+
+
+use_backend()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""
+Streaming download of WPS outputs.
+
+Files are streamed to disk in chunks. Large files are fetched with concurrent HTTP range
+requests when the server supports them. Interrupted downloads are resumed from the
+`.part` file left behind if the server sends an ETag, unless the size or ETag of the
+file changed since::
+
+    >>> from owslib_esgfwps.download import fetch
+    >>> result = fetch('http://localhost:5000/outputs/tas.nc', directory='/tmp', parallel=4)
+    >>> result.size, result.throughput
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from . import hooks
+
+LOGGER = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+PART_SIZE = 16 * 1024 * 1024
+
+
+class FetchResult(namedtuple('FetchResult', ['path', 'size', 'seconds', 'parts'])):
+    """Result of a download. `size` is the number of bytes transferred by this call."""
+
+    __slots__ = ()
+
+    @property
+    def throughput(self):
+        """Transferred bytes per second."""
+        return self.size / self.seconds if self.seconds else float(self.size)
+
+
+def filename(url):
+    """Return the file name of an URL."""
+    return os.path.basename(urlsplit(url).path) or 'output'
+
+
+def unique_filenames(urls):
+    """Return the file names of URLs, repeated names get a number, e.g. `tas-1.nc`."""
+    names = [filename(url) for url in urls]
+    used = set(names)
+    seen = set()
+    unique = []
+    for name in names:
+        if name in seen:
+            root, ext = os.path.splitext(name)
+            number = 1
+            while '{}-{}{}'.format(root, number, ext) in used:
+                number += 1
+            name = '{}-{}{}'.format(root, number, ext)
+            used.add(name)
+        seen.add(name)
+        unique.append(name)
+    return unique
+
+
+def fetch(url, path=None, directory='.', session=None, headers=None, chunk_size=CHUNK_SIZE,
+          part_size=PART_SIZE, parallel=4, timeout=60, skip_existing=False):
+    """Download `url` to `path` (default: the file name of the URL in `directory`).
+
+    :param session: `requests.Session` to use, e.g. `Client.session`.
+    :param chunk_size: bytes read from the connection and written at a time.
+    :param part_size: size of the byte ranges fetched concurrently.
+    :param parallel: number of concurrent range requests, 1 for a single stream.
+    :param skip_existing: do not download again if `path` exists with the size of the file.
+        Only the size is compared, use it if the outputs do not change.
+    :return: a `FetchResult`.
+    """
+    session = session or requests
+    path = path or os.path.join(directory, filename(url))
+    started = time.monotonic()
+    response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+    response.raise_for_status()
+    length = response.headers.get('Content-Length')
+    length = int(length) if length is not None else None
+    ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes' and length is not None
+    etag = response.headers.get('ETag')
+    if skip_existing and length is not None and os.path.exists(path) and os.path.getsize(path) == length:
+        return FetchResult(path, 0, time.monotonic() - started, 0)
+    if ranges and parallel > 1 and length > part_size:
+        size, parts = _fetch_parts(session, url, path, length, etag, headers, chunk_size, part_size, parallel,
+                                   timeout)
+    else:
+        size, parts = _fetch_stream(session, url, path, length, etag if ranges else None, headers, chunk_size,
+                                    timeout), 1
+    if length is not None and os.path.getsize(path) != length:
+        raise IOError('Downloaded {} bytes of {} from {}.'.format(os.path.getsize(path), length, url))
+    result = FetchResult(path, size, time.monotonic() - started, parts)
+    hooks.emit('fetch', result.seconds, size, endpoint=hooks.endpoint(url), parts=parts)
+    return result
+
+
+def _resume_offset(part, state, length, etag):
+    """Return the size of a `.part` file of a single stream if it is of the same file, else 0."""
+    if etag is None or not (os.path.exists(part) and os.path.exists(state)):
+        return 0
+    try:
+        with open(state) as f:
+            data = json.load(f)
+        # the state of parallel parts has the offsets of the parts done
+        if 'done' in data or (data['size'], data['etag']) != (length, etag):
+            LOGGER.info('Restarting download of %s, the file changed.', part)
+            return 0
+    except (ValueError, TypeError, KeyError):
+        return 0
+    offset = os.path.getsize(part)
+    return offset if offset < length else 0
+
+
+def _fetch_stream(session, url, path, length, etag, headers, chunk_size, timeout):
+    """Download in a single stream. With an `etag` the download can be resumed."""
+    part = path + '.part'
+    state = part + '.json'
+    offset = _resume_offset(part, state, length, etag)
+    request_headers = dict(headers or {})
+    if offset:
+        request_headers['Range'] = 'bytes={}-'.format(offset)
+        # the whole file is sent if it changed since the HEAD request
+        request_headers['If-Range'] = etag
+    response = session.get(url, headers=request_headers, stream=True, timeout=timeout)
+    response.raise_for_status()
+    if offset and response.status_code != 206:
+        offset = 0
+    if etag is not None:
+        with open(state, 'w') as f:
+            json.dump(dict(size=length, etag=etag), f)
+    size = 0
+    with open(part, 'ab' if offset else 'wb') as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            f.write(chunk)
+            size += len(chunk)
+    os.replace(part, path)
+    if os.path.exists(state):
+        os.remove(state)
+    return size
+
+
+def _resume_state(part, state, length, etag, part_size):
+    """Return the offsets of the parts already written, if they are of the same file and part size."""
+    if not (os.path.exists(part) and os.path.exists(state)) or os.path.getsize(part) != length:
+        return None
+    try:
+        with open(state) as f:
+            data = json.load(f)
+        if (data['size'], data['part_size'], data['etag']) != (length, part_size, etag):
+            LOGGER.info('Restarting download of %s, the file or part size changed.', part)
+            return None
+        return set(data['done'])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+def _fetch_parts(session, url, path, length, etag, headers, chunk_size, part_size, parallel, timeout):
+    part = path + '.part'
+    state = part + '.json'
+    done = _resume_state(part, state, length, etag, part_size)
+    if done is None:
+        done = set()
+        with open(part, 'wb') as f:
+            f.truncate(length)
+    lock = threading.Lock()
+    offsets = [offset for offset in range(0, length, part_size) if offset not in done]
+
+    def _fetch(offset):
+        end = min(offset + part_size, length) - 1
+        request_headers = dict(headers or {})
+        request_headers['Range'] = 'bytes={}-{}'.format(offset, end)
+        response = session.get(url, headers=request_headers, stream=True, timeout=timeout)
+        response.raise_for_status()
+        if response.status_code != 206:
+            raise IOError('Server ignored range request for {}.'.format(url))
+        size = 0
+        with open(part, 'r+b') as f:
+            f.seek(offset)
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                size += len(chunk)
+        if size != end - offset + 1:
+            raise IOError('Got {} bytes of range {}-{} from {}.'.format(size, offset, end, url))
+        with lock:
+            done.add(offset)
+            with open(state, 'w') as f:
+                json.dump(dict(size=length, part_size=part_size, etag=etag, done=sorted(done)), f)
+        return size
+
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        size = sum(executor.map(_fetch, offsets))
+    os.replace(part, path)
+    os.remove(state)
+    return size, len(offsets)
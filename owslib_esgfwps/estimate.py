@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+Estimate the size of an Execute request before it is submitted.
+
+The estimate needs the shape and data type of the variable. Dimensions with
+`crs='values'` are converted with the coordinate indexes of `owslib_esgfwps.coords`::
+
+    >>> from owslib_esgfwps import Domain, Dimension, Operation, Variable
+    >>> from owslib_esgfwps.estimate import Estimator
+    >>> tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    >>> d0 = Domain(dict(time=Dimension(0, 364, crs='indices')))
+    >>> estimator = Estimator(shapes={tas.uri: dict(time=3650, lat=192, lon=288)})
+    >>> estimator.estimate(tas, d0, Operation('CDAT.average', axes='time')).output_bytes
+    221184
+    >>> estimator.mode(tas, d0, sync_bytes=10 * 1024 ** 2)
+    'async'
+
+Operations reduce the dimensions listed in `axes` (separated by `|`) to one point,
+or to `len(bins)` points if `bins` is a list.
+"""
+
+from collections import OrderedDict, namedtuple
+
+from owslib.wps import ASYNC, SYNC
+
+from .cwt import Dimension, Domain, ParameterError
+from .tiling import points, tile_domain
+
+
+class Estimate(namedtuple('Estimate', ['shape', 'input_elements', 'input_bytes', 'output_shape',
+                                       'output_elements', 'output_bytes'])):
+    """Estimated number of elements and bytes read and returned by a request."""
+
+    __slots__ = ()
+
+
+def _product(values):
+    result = 1
+    for value in values:
+        result *= value
+    return result
+
+
+def _axes(operation):
+    if operation is None or not operation.axes:
+        return []
+    axes = operation.axes
+    if isinstance(axes, str):
+        axes = axes.split('|')
+    return list(axes)
+
+
+class Estimator(object):
+    """Estimate request sizes from the shape and data type of variables.
+
+    :param shapes: dict of `Variable.uri` to an (ordered) dict of dimension name to length.
+    :param dtypes: dict of `Variable.uri` to the bytes per element, default `itemsize`.
+    :param itemsize: bytes per element of variables without an entry in `dtypes`.
+    :param indexes: `owslib_esgfwps.coords.IndexCache` used for `crs='values'` dimensions,
+        default is the shared cache of that module.
+    """
+
+    def __init__(self, shapes=None, dtypes=None, itemsize=4, indexes=None):
+        self.shapes = dict(shapes or {})
+        self.dtypes = dict(dtypes or {})
+        self.itemsize = itemsize
+        self._indexes = indexes
+
+    @property
+    def indexes(self):
+        if self._indexes is None:
+            from . import coords
+            self._indexes = coords._cache
+        return self._indexes
+
+    def add(self, uri, shape, itemsize=None):
+        """Add the shape (dict of dimension name to length) and bytes per element of a dataset."""
+        self.shapes[uri] = OrderedDict(shape)
+        if itemsize is not None:
+            self.dtypes[uri] = itemsize
+
+    def _shape(self, variable):
+        if variable.uri not in self.shapes:
+            raise ParameterError('Shape of {} is unknown.'.format(variable.uri))
+        return self.shapes[variable.uri]
+
+    def _bounded(self, variable, name, length, dimension):
+        # dimension in indices, clipped to the length of the dataset
+        if dimension is None:
+            return Dimension(0, length - 1, crs='indices')
+        if dimension.crs == 'values':
+            dimension = self.indexes.get(variable.uri, name).to_indices(dimension)
+        start = 0 if dimension.start is None else max(dimension.start, 0)
+        end = length - 1 if dimension.end is None else min(dimension.end, length - 1)
+        return Dimension(start, end, dimension.step, crs='indices')
+
+    def estimate(self, variable, domain=None, operation=None):
+        """Return the `Estimate` of `operation` over `domain` (default: the domain of the variable).
+
+        Raises `ParameterError` if the shape of the variable is unknown.
+        """
+        domain = domain if domain is not None else variable.domain
+        dimensions = domain.dimensions if isinstance(domain, Domain) else {}
+        itemsize = self.dtypes.get(variable.uri, self.itemsize)
+        shape = OrderedDict(
+            (name, points(self._bounded(variable, name, length, dimensions.get(name))) or 0)
+            for name, length in self._shape(variable).items())
+        output_shape = OrderedDict(shape)
+        bins = operation.bins if operation is not None else None
+        for axis in _axes(operation):
+            if axis not in shape:
+                raise ParameterError('Variable {} has no dimension {}.'.format(variable.id, axis))
+            output_shape[axis] = len(bins) if isinstance(bins, (list, tuple)) else 1
+        elements = _product(shape.values())
+        output_elements = _product(output_shape.values())
+        return Estimate(shape, elements, elements * itemsize, output_shape, output_elements,
+                        output_elements * itemsize)
+
+    def mode(self, variable, domain=None, operation=None, sync_bytes=None):
+        """Return `ASYNC` if the request reads more than `sync_bytes`, otherwise `SYNC`."""
+        estimate = self.estimate(variable, domain, operation)
+        return ASYNC if sync_bytes is not None and estimate.input_bytes > sync_bytes else SYNC
+
+    def check(self, variable, domain=None, operation=None, max_bytes=None):
+        """Return the `Estimate`, raising `ParameterError` if it reads more than `max_bytes`."""
+        estimate = self.estimate(variable, domain, operation)
+        if max_bytes is not None and estimate.input_bytes > max_bytes:
+            raise ParameterError('Request for {} reads {} bytes, more than {}.'.format(
+                variable.id, estimate.input_bytes, max_bytes))
+        return estimate
+
+    def split(self, variable, domain=None, max_bytes=None):
+        """Return tiles of the domain which each read at most `max_bytes`.
+
+        The domain is converted to indices and all dimensions of the variable are bounded,
+        so the tiles are accurate.
+        """
+        domain = domain if domain is not None else variable.domain
+        dimensions = domain.dimensions if isinstance(domain, Domain) else {}
+        bounded = dict((name, self._bounded(variable, name, length, dimensions.get(name)))
+                       for name, length in self._shape(variable).items())
+        itemsize = self.dtypes.get(variable.uri, self.itemsize)
+        mask = domain.mask if isinstance(domain, Domain) else None
+        return tile_domain(Domain(bounded, mask=mask), max_bytes=max_bytes, itemsize=itemsize)
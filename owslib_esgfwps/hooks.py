@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+"""
+Instrumentation hooks for the phases of a request.
+
+The library emits an `Event` with the duration of each phase to the subscribed callbacks:
+
+* `encode`: serialization of a `WPSParameter` value (tag `parameter`).
+* `parse`: parsing of the `Outputs` of an execution (tag `parameter`).
+* `execute`: Execute round trip of a `Client` (tags `identifier`, `endpoint`, `mode`).
+* `submit`: a job of a `BatchSubmitter` including retries (tags `identifier`, `endpoint`,
+  `retries`, `status`).
+* `poll`: a status request of an `ExecutionMonitor` (tags `endpoint`, `status`).
+* `fetch`: the download of an output file (tags `endpoint`, `parts`).
+
+`size` is the number of bytes encoded, parsed or downloaded. `Metrics` collects the
+events and renders them in the Prometheus text format, without a server::
+
+    >>> from owslib_esgfwps import hooks
+    >>> metrics = hooks.subscribe(hooks.Metrics())
+    >>> hooks.subscribe(lambda event: print(event.phase, event.seconds))
+    >>> metrics.write('/var/lib/node_exporter/esgfwps.prom')
+
+Without subscribers an event costs one check of the subscriber list.
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+
+class Event(namedtuple('Event', ['phase', 'seconds', 'size', 'tags'])):
+    """Duration in seconds and size in bytes (or `None`) of a phase, with a dict of tags."""
+
+    __slots__ = ()
+
+
+_subscribers = []
+_lock = threading.Lock()
+
+
+def subscribe(callback):
+    """Call `callback(event)` for every event. Returns the callback."""
+    global _subscribers
+    with _lock:
+        _subscribers = _subscribers + [callback]
+    return callback
+
+
+def unsubscribe(callback):
+    global _subscribers
+    with _lock:
+        _subscribers = [subscriber for subscriber in _subscribers if subscriber is not callback]
+
+
+def emit(phase, seconds, size=None, **tags):
+    """Send an event to all subscribers. Exceptions of subscribers are not propagated."""
+    subscribers = _subscribers
+    if not subscribers:
+        return
+    event = Event(phase, seconds, size, tags)
+    for callback in subscribers:
+        try:
+            callback(event)
+        except Exception:
+            pass
+
+
+def endpoint(url):
+    """Return the `scheme://host:port` of an URL used as `endpoint` tag."""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    return '{}://{}'.format(parts.scheme, parts.netloc)
+
+
+class timed(object):
+    """Context manager which emits an event with the duration of its block.
+
+    Tags and `size` can be set inside the block. An exception adds the tag `error`::
+
+        >>> with timed('execute', identifier='subset') as event:
+        ...     event.size = 10
+    """
+
+    def __init__(self, phase, **tags):
+        self.phase = phase
+        self.tags = tags
+        self.size = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.tags['error'] = exc_type.__name__
+        emit(self.phase, time.perf_counter() - self._started, self.size, **self.tags)
+        return False
+
+
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, 300)
+
+
+class Metrics(object):
+    """Event subscriber aggregating durations, sizes and retries per phase and tags.
+
+    :param prefix: prefix of the metric names.
+    :param buckets: upper bounds in seconds of the duration histogram.
+    """
+
+    def __init__(self, prefix='esgfwps', buckets=BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        tags = dict((key, value) for key, value in event.tags.items() if key != 'retries' and value is not None)
+        key = (event.phase, tuple(sorted(tags.items())))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = dict(count=0, seconds=0.0, bytes=0, retries=0,
+                                                  buckets=[0] * len(self.buckets))
+            series['count'] += 1
+            series['seconds'] += event.seconds
+            series['bytes'] += event.size or 0
+            series['retries'] += event.tags.get('retries') or 0
+            for index, bound in enumerate(self.buckets):
+                if event.seconds <= bound:
+                    series['buckets'][index] += 1
+
+    def count(self, phase, **tags):
+        """Return the number of events of `phase` with at least the given tags."""
+        return self._total(phase, 'count', tags)
+
+    def seconds(self, phase, **tags):
+        """Return the total duration of the events of `phase` with at least the given tags."""
+        return self._total(phase, 'seconds', tags)
+
+    def _total(self, phase, field, tags):
+        with self._lock:
+            return sum(series[field] for (name, labels), series in self._series.items()
+                       if name == phase and set(tags.items()) <= set(labels))
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    @staticmethod
+    def _labels(labels, **extra):
+        labels = list(labels) + sorted(extra.items())
+        return '{' + ','.join('{}="{}"'.format(
+            key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for key, value in labels) + '}'
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        name = self.prefix + '_phase'
+        lines = ['# TYPE {}_seconds histogram'.format(name)]
+        with self._lock:
+            series = sorted(self._series.items())
+            for (phase, labels), values in series:
+                labels = (('phase', phase),) + labels
+                for bound, count in zip(self.buckets, values['buckets']):
+                    lines.append('{}_seconds_bucket{} {}'.format(name, self._labels(labels, le=bound), count))
+                lines.append('{}_seconds_bucket{} {}'.format(name, self._labels(labels, le='+Inf'), values['count']))
+                lines.append('{}_seconds_sum{} {}'.format(name, self._labels(labels), values['seconds']))
+                lines.append('{}_seconds_count{} {}'.format(name, self._labels(labels), values['count']))
+            lines.append('# TYPE {}_bytes_total counter'.format(name))
+            for (phase, labels), values in series:
+                lines.append('{}_bytes_total{} {}'.format(name, self._labels((('phase', phase),) + labels),
+                                                          values['bytes']))
+            lines.append('# TYPE {}_retries_total counter'.format(name))
+            for (phase, labels), values in series:
+                lines.append('{}_retries_total{} {}'.format(name, self._labels((('phase', phase),) + labels),
+                                                            values['retries']))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the metrics to `path` atomically, e.g. for the textfile collector of node_exporter."""
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+Generators of the ids of `Variable`, `Domain`, `Output` and `Operation` objects.
+
+Ids which are not given to the constructor are generated when they are read for the
+first time, so objects whose id is never used (or set by `from_json`) cost nothing.
+The generator is set globally or per `Variables`, `Domains` or `Operations` collection::
+
+    >>> from owslib_esgfwps import Domain, Domains, ids
+    >>> ids.use('counter')
+    >>> Domain().id
+    '3f2a9c1e-0'
+    >>> domains = Domains([Domain(), Domain()], id_generator=ids.CounterIds(prefix='run1-'))
+    >>> [domain.id for domain in domains]
+    ['run1-0', 'run1-1']
+
+Available generators:
+
+* `uuid4`: random UUIDs, the default.
+* `counter`: a random prefix per generator and a sequence number. Use `CounterIds(prefix)`
+  for a fixed prefix.
+* `hash`: a hash of the content, equal objects get the same id.
+"""
+
+import hashlib
+import itertools
+import json
+from uuid import uuid4
+
+
+class UUIDIds(object):
+    """Random UUID4 ids."""
+
+    def __call__(self, obj):
+        return uuid4().hex
+
+
+class CounterIds(object):
+    """Ids made of a prefix and a sequence number.
+
+    :param prefix: prefix of all ids, default a random prefix of this generator.
+    """
+
+    def __init__(self, prefix=None):
+        self.prefix = prefix if prefix is not None else uuid4().hex[:8] + '-'
+        self._counter = itertools.count()
+
+    def __call__(self, obj):
+        # next() of itertools.count is atomic, no lock needed
+        return '{}{}'.format(self.prefix, next(self._counter))
+
+
+class HashIds(object):
+    """Ids derived from the content of an object.
+
+    :param length: number of hex digits of the SHA-1 hash.
+    """
+
+    def __init__(self, length=32):
+        self.length = length
+
+    def __call__(self, obj):
+        content = json.dumps([type(obj).__name__, obj._content()], sort_keys=True, default=str)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()[:self.length]
+
+
+GENERATORS = dict(uuid4=UUIDIds, counter=CounterIds, hash=HashIds)
+
+_config = dict(generator=UUIDIds())
+
+
+def use(generator=None):
+    """Set the global id generator.
+
+    :param generator: a name of `GENERATORS`, a callable `generator(obj)` returning a string,
+        or `None` for `uuid4`.
+    """
+    if generator is None:
+        generator = 'uuid4'
+    if not callable(generator):
+        if generator not in GENERATORS:
+            raise ValueError('Unknown id generator {}. Choose one of {}.'.format(generator, sorted(GENERATORS)))
+        generator = GENERATORS[generator]()
+    _config['generator'] = generator
+
+
+def generator():
+    """Return the global id generator."""
+    return _config['generator']
+
+
+def generate(obj):
+    """Return a new id for `obj` with the global generator."""
+    return _config['generator'](obj)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""
+Memoization of WPS results keyed on the semantic content of a request.
+
+`Variable`, `Domain` and `Operation` get random ids, so equal requests never have equal
+JSON documents. `request_key` hashes a canonical form which ignores the generated ids
+(operation references to variables, domains and other operations are replaced by their
+position, generated operation names are left out)::
+
+    >>> from owslib_esgfwps.memo import request_key, MemoryResultCache, SQLiteResultCache
+    >>> key = request_key('pelican_subset', variables=[v0], domains=[d0])
+    >>> cache = SQLiteResultCache('results.sqlite')
+    >>> cache.set(key, outputs)
+    >>> cache.get(key)
+    Outputs(outputs='['...']')
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from numbers import Number
+
+from .cwt import Outputs
+
+
+def _number(value):
+    if isinstance(value, Number) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def _reference(value, index):
+    value = getattr(value, 'id', value)
+    return index.get(value, value)
+
+
+def _dimension(dimension):
+    return [_number(dimension.start), _number(dimension.end), _number(dimension.step), dimension.crs]
+
+
+def canonical(identifier=None, variables=(), domains=(), operations=()):
+    """Return the canonical form of a request without generated ids."""
+    variables, domains = list(variables), list(domains)
+    variable_index = dict((var.name, i) for i, var in enumerate(variables))
+    variable_index.update((var.id, i) for i, var in enumerate(variables))
+    domain_index = dict((domain.id, i) for i, domain in enumerate(domains))
+    operations = list(operations)
+    # the inputs are read first, they generate the names of operations given as input
+    inputs = [op.input for op in operations]
+    # operations are referenced by their result or name, reading them does not generate names
+    result_index = dict((op._name, i) for i, op in enumerate(operations) if op._name is not None)
+    result_index.update((op._result, i) for i, op in enumerate(operations) if op._result is not None)
+    data = dict(
+        identifier=identifier,
+        variables=[dict(uri=var.uri, var_name=var.var_name, domain=_reference(var.domain, domain_index))
+                   for var in variables],
+        domains=[dict(mask=domain.mask,
+                      dimensions=sorted([name, _dimension(dim)] for name, dim in domain.dimensions.items()))
+                 for domain in domains],
+        operations=[])
+    for op, names in zip(operations, inputs):
+        references = []
+        for name in names:
+            if name in variable_index:
+                references.append(['variable', variable_index[name]])
+            elif name in result_index:
+                references.append(['operation', result_index[name]])
+            else:
+                references.append(['name', name])
+        data['operations'].append(dict(
+            name=op._name if op._named else None, axes=op.axes, bins=op.bins, input=references,
+            domain=_reference(op.domain, domain_index)))
+    return data
+
+
+def request_key(identifier=None, variables=(), domains=(), operations=()):
+    """Return a SHA-256 hex digest of the canonical form of a request."""
+    data = canonical(identifier, variables, domains, operations)
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class MemoryResultCache(object):
+    """LRU cache mapping request keys to `Outputs`."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                return None
+            self._entries.move_to_end(key)
+        return Outputs.from_json(data)
+
+    def set(self, key, outputs):
+        with self._lock:
+            self._entries[key] = outputs.json
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+class SQLiteResultCache(object):
+    """Persistent cache mapping request keys to `Outputs` in a SQLite database."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, outputs TEXT NOT NULL)')
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute('SELECT outputs FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return Outputs.from_json(json.loads(row[0]))
+
+    def set(self, key, outputs):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results (key, outputs) VALUES (?, ?)', (key, json.dumps(outputs.json)))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._connection.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is not None
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+"""
+Metadata of OPeNDAP datasets from their DDS and DAS headers.
+
+Only the `.dds` (dimensions and data types) and `.das` (attributes) documents of a
+dataset are read, never its data. The parsed metadata is cached in memory and
+optionally on disk, keyed by the dataset URI::
+
+    >>> from owslib_esgfwps import Variable, Variables
+    >>> from owslib_esgfwps.metadata import MetadataCache
+    >>> cache = MetadataCache(ttl=86400, path='~/.cache/owslib-esgfwps/metadata')
+    >>> tas = Variable(uri='http://test.org/thredds/dodsC/tas.nc', var_name='tas')
+    >>> meta = tas.metadata(cache=cache)
+    >>> meta.dimensions
+    OrderedDict([('time', 3650), ('lat', 192), ('lon', 288)])
+    >>> meta.dtype, meta.itemsize, meta.nbytes
+    ('Float32', 4, 807321600)
+    >>> cache.prefetch(Variables([tas, pr]), max_workers=8)
+
+`Variable.metadata()` and `Variables.prefetch()` use a shared default cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from .cwt import ParameterError
+
+LOGGER = logging.getLogger(__name__)
+
+ITEMSIZE = dict(Byte=1, Int8=1, UInt8=1, Int16=2, UInt16=2, Int32=4, UInt32=4, Int64=8, UInt64=8,
+                Float32=4, Float64=8, String=None, Url=None)
+
+_DECLARATION = re.compile(r'^\s*({})\s+([^\s\[;]+)\s*((?:\[[^\]]*\]\s*)*);'.format('|'.join(ITEMSIZE)))
+_DIMENSION = re.compile(r'\[\s*(?:([^\s=\]]+)\s*=\s*)?(\d+)\s*\]')
+_ATTRIBUTE = re.compile(r'^\s*(\w+)\s+(\S+)\s+(.*);\s*$', re.DOTALL)
+_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+
+
+class VariableMetadata(namedtuple('VariableMetadata', ['name', 'dtype', 'dimensions', 'attributes'])):
+    """Data type, dimensions (ordered dict of name to length) and attributes of a variable."""
+
+    __slots__ = ()
+
+    @property
+    def itemsize(self):
+        return ITEMSIZE.get(self.dtype)
+
+    @property
+    def shape(self):
+        return tuple(self.dimensions.values())
+
+    @property
+    def size(self):
+        """Number of elements."""
+        size = 1
+        for length in self.dimensions.values():
+            size *= length
+        return size
+
+    @property
+    def nbytes(self):
+        return self.size * (self.itemsize or 0)
+
+
+class DatasetMetadata(namedtuple('DatasetMetadata', ['uri', 'variables', 'attributes'])):
+    """Variables (dict of name to `VariableMetadata`) and global attributes of a dataset."""
+
+    __slots__ = ()
+
+    def variable(self, name):
+        if name not in self.variables:
+            raise ParameterError('Dataset {} has no variable {}.'.format(self.uri, name))
+        return self.variables[name]
+
+    def coordinate_range(self, name):
+        """Return `(min, max)` of a coordinate variable from its `actual_range` or `valid_min`/`valid_max`
+        attributes, or `None` if they are missing."""
+        attributes = self.variables[name].attributes if name in self.variables else {}
+        if len(attributes.get('actual_range') or ()) == 2:
+            return tuple(attributes['actual_range'])
+        if 'valid_min' in attributes and 'valid_max' in attributes:
+            return attributes['valid_min'][0], attributes['valid_max'][0]
+        return None
+
+
+def parse_dds(text):
+    """Return an ordered dict of variable name to `(dtype, dimensions)` of a DDS document."""
+    variables = OrderedDict()
+    for line in text.splitlines():
+        match = _DECLARATION.match(line)
+        if match:
+            dtype, name, dims = match.groups()
+            dimensions = OrderedDict()
+            for index, (dim, length) in enumerate(_DIMENSION.findall(dims)):
+                dimensions[dim or 'dim_{}'.format(index)] = int(length)
+            # the map vectors of a grid repeat the coordinate variables
+            variables.setdefault(name, (dtype, dimensions))
+    return variables
+
+
+def _value(dtype, text):
+    if dtype in ('String', 'Url'):
+        return [re.sub(r'\\(.)', r'\1', value) for value in _STRING.findall(text)]
+    values = []
+    for item in text.split(','):
+        item = item.strip()
+        try:
+            values.append(int(item) if dtype not in ('Float32', 'Float64') else float(item))
+        except ValueError:
+            values.append(item)
+    return values
+
+
+def parse_das(text):
+    """Return a dict of container name to dict of attribute name to list of values of a DAS document.
+
+    Nested containers are named with their path separated by dots.
+    """
+    containers = {}
+    stack = []
+    pending = ''
+    for line in text.splitlines():
+        if pending:
+            pending += '\n' + line
+        elif line.strip().endswith('{'):
+            stack.append(line.strip()[:-1].strip())
+            if len(stack) > 1:
+                containers.setdefault('.'.join(stack[1:]), {})
+            continue
+        elif line.strip() == '}':
+            if stack:
+                stack.pop()
+            continue
+        else:
+            pending = line
+        # an attribute ends with a semicolon outside of quotes
+        rest = _STRING.sub('', pending)
+        if '"' not in rest and rest.rstrip().endswith(';'):
+            match = _ATTRIBUTE.match(pending)
+            if match and len(stack) > 1:
+                dtype, name, value = match.groups()
+                containers['.'.join(stack[1:])][name] = _value(dtype, value)
+            pending = ''
+    return containers
+
+
+def parse(uri, dds, das):
+    """Return the `DatasetMetadata` of the DDS and DAS documents of `uri`."""
+    attributes = parse_das(das)
+    variables = OrderedDict(
+        (name, VariableMetadata(name, dtype, dimensions, attributes.get(name, {})))
+        for name, (dtype, dimensions) in parse_dds(dds).items())
+    return DatasetMetadata(uri, variables, attributes.get('NC_GLOBAL', {}))
+
+
+class MetadataCache(object):
+    """Cache of dataset metadata keyed by URI.
+
+    :param ttl: seconds the metadata is used before it is read again.
+    :param path: optional directory to persist the DDS and DAS documents.
+    :param session: `requests.Session` used to read the documents.
+    :param timeout: timeout of the HTTP requests in seconds.
+    :param maxsize: maximum number of datasets kept in memory.
+    """
+
+    def __init__(self, ttl=86400, path=None, session=None, timeout=30, maxsize=1024):
+        self.ttl = ttl
+        self.path = os.path.expanduser(path) if path else None
+        self.session = session
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path and not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def clear(self):
+        """Remove all metadata from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            for name in os.listdir(self.path):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.path, name))
+
+    def __contains__(self, uri):
+        return self._lookup(uri) is not None
+
+    def dataset(self, uri):
+        """Return the `DatasetMetadata` of a dataset, reading its DDS and DAS if needed."""
+        metadata = self._lookup(uri)
+        if metadata is None:
+            session = self.session or requests
+            documents = []
+            for extension in ('.dds', '.das'):
+                response = session.get(uri + extension, timeout=self.timeout)
+                response.raise_for_status()
+                documents.append(response.text)
+            metadata = parse(uri, *documents)
+            self._store(uri, metadata, time.time(), *documents)
+        return metadata
+
+    def variable(self, variable):
+        """Return the `VariableMetadata` of a `Variable`."""
+        return self.dataset(variable.uri).variable(variable.var_name)
+
+    def prefetch(self, variables, max_workers=8):
+        """Read the metadata of the datasets of many variables (or URIs) concurrently.
+
+        :return: dict of URI to `DatasetMetadata`. Datasets which could not be read are logged and left out.
+        """
+        uris = list(OrderedDict.fromkeys(getattr(variable, 'uri', variable) for variable in variables))
+
+        def _dataset(uri):
+            try:
+                return uri, self.dataset(uri)
+            except Exception as e:
+                LOGGER.warning('Could not read metadata of %s: %s', uri, e)
+                return uri, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return OrderedDict((uri, metadata) for uri, metadata in executor.map(_dataset, uris)
+                               if metadata is not None)
+
+    @staticmethod
+    def _filename(path, uri):
+        return os.path.join(path, hashlib.sha1(uri.encode('utf-8')).hexdigest() + '.json')
+
+    def _lookup(self, uri):
+        expired = time.time() - self.ttl
+        with self._lock:
+            entry = self._entries.get(uri)
+            if entry is not None:
+                if entry[0] > expired:
+                    self._entries.move_to_end(uri)
+                    return entry[1]
+                del self._entries[uri]
+        if self.path:
+            try:
+                with open(self._filename(self.path, uri)) as f:
+                    data = json.load(f)
+                fetched, dds, das = data['fetched'], data['dds'], data['das']
+            except (IOError, ValueError, KeyError, TypeError):
+                # missing, partly written or foreign file
+                return None
+            if fetched > expired:
+                metadata = parse(uri, dds, das)
+                self._remember(uri, metadata, fetched)
+                return metadata
+        return None
+
+    def _remember(self, uri, metadata, fetched):
+        with self._lock:
+            self._entries[uri] = (fetched, metadata)
+            self._entries.move_to_end(uri)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, uri, metadata, fetched, dds, das):
+        self._remember(uri, metadata, fetched)
+        if self.path:
+            filename = self._filename(self.path, uri)
+            # unique per process and thread, processes may share the cache directory
+            tmp = '{}.{}.{}.tmp'.format(filename, os.getpid(), threading.get_ident())
+            with open(tmp, 'w') as f:
+                json.dump(dict(uri=uri, dds=dds, das=das, fetched=fetched), f)
+            os.replace(tmp, filename)
+
+
+_cache = MetadataCache()
+
+
+def default_cache():
+    """Return the cache used by `Variable.metadata()` and `Variables.prefetch()`."""
+    return _cache
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+Asynchronous monitoring of ESGF WPS executions submitted in ASYNC mode.
+
+The monitor polls the status documents of many executions with exponential backoff
+and jitter and yields the results as the executions complete::
+
+    >>> import asyncio
+    >>> from owslib_esgfwps.monitor import ExecutionMonitor
+    >>> async def collect(executions):
+    ...     async for result in ExecutionMonitor(executions, initial=2, maximum=60):
+    ...         print(result.execution.status, result.outputs)
+    >>> asyncio.get_event_loop().run_until_complete(collect(executions))
+
+OWSLib reads status documents with blocking HTTP calls, so the polls run in a small
+thread pool bounded by `concurrency` while the scheduling is done by asyncio.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import hooks
+from .cwt import Outputs
+
+LOGGER = logging.getLogger(__name__)
+
+Result = namedtuple('Result', ['execution', 'outputs', 'error'])
+
+
+class Backoff(object):
+    """Polling delays growing exponentially while an execution makes no progress.
+
+    :param initial: first delay in seconds.
+    :param maximum: upper limit of the delay in seconds.
+    :param factor: multiplier applied when the status did not change.
+    :param jitter: relative random variation of each delay, e.g. 0.1 for +/- 10%.
+    """
+
+    def __init__(self, initial=1.0, maximum=60.0, factor=2.0, jitter=0.1):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.delay = initial
+
+    def next(self, progressed=False):
+        if progressed:
+            self.delay = self.initial
+        else:
+            self.delay = min(self.delay * self.factor, self.maximum)
+        return self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class ExecutionMonitor(object):
+    """Track running `WPSExecution` objects and iterate over their results as they complete.
+
+    :param executions: executions returned by `WebProcessingService.execute` in ASYNC mode.
+    :param concurrency: maximum number of status documents fetched at the same time.
+    :param timeout: seconds after which an execution is given up, `None` for no limit.
+
+    The remaining keyword arguments configure the `Backoff` of each execution.
+    """
+
+    def __init__(self, executions=None, concurrency=10, timeout=None,
+                 initial=1.0, maximum=60.0, factor=2.0, jitter=0.1):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._backoff = dict(initial=initial, maximum=maximum, factor=factor, jitter=jitter)
+        self._executions = list(executions or [])
+        self.polls = 0
+
+    def add(self, execution):
+        """Add an execution. Must be called before iterating."""
+        self._executions.append(execution)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        tasks = [asyncio.ensure_future(self._watch(execution, queue, semaphore, executor))
+                 for execution in self._executions]
+        try:
+            for _ in range(len(tasks)):
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # do not block the event loop while polls still running in the threads finish
+            executor.shutdown(wait=False)
+
+    async def _watch(self, execution, queue, semaphore, executor):
+        loop = asyncio.get_event_loop()
+        backoff = Backoff(**self._backoff)
+        started = time.monotonic()
+        delay = 0
+        while not self._complete(execution):
+            if self.timeout is not None and time.monotonic() - started + delay > self.timeout:
+                await queue.put(Result(execution, None, TimeoutError(
+                    'Execution {} did not complete in {} seconds.'.format(execution.statusLocation, self.timeout))))
+                return
+            await asyncio.sleep(delay)
+            before = (execution.status, execution.percentCompleted)
+            async with semaphore:
+                self.polls += 1
+                try:
+                    await loop.run_in_executor(executor, lambda: self._poll(execution))
+                except Exception as e:
+                    LOGGER.warning('Could not check status of %s: %s', execution.statusLocation, e)
+            delay = backoff.next(progressed=(execution.status, execution.percentCompleted) != before)
+        try:
+            outputs = Outputs.from_owslib(execution.processOutputs) if execution.isSucceeded() else None
+        except Exception as e:
+            await queue.put(Result(execution, None, e))
+            return
+        await queue.put(Result(execution, outputs, None))
+
+    @staticmethod
+    def _poll(execution):
+        with hooks.timed('poll', endpoint=hooks.endpoint(execution.statusLocation)) as event:
+            execution.checkStatus(sleepSecs=0)
+            event.tags['status'] = execution.status
+
+    @staticmethod
+    def _complete(execution):
+        try:
+            return execution.isComplete()
+        except Exception:
+            # unknown status, e.g. no status document read yet
+            return False
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+
+"""
+Schema validation of decoded ESGF WPS inputs.
+
+The schemas of the `domain`, `variable`, `operation` and `output` documents are compiled
+once into validator functions. A document is checked in a single pass which reports
+all errors with their JSON path. Valid documents are then built with a fast path which
+skips the checks of the constructors::
+
+    >>> from owslib_esgfwps import schema
+    >>> domains = schema.load('domains', [{'id': 'd0', 'time': {'start': 0, 'end': 1, 'crs': 'indices'}}])
+    >>> schema.load('variables', [{'uri': 'http://data.test.org/tas.nc', 'id': 'tas'}])
+    Traceback (most recent call last):
+    ...
+    ValidationError: $[0].id: does not match 'name|id'
+
+Kinds are `domain`, `variable`, `operation` and `output` and the collections `domains`,
+`variables`, `operations` and `outputs`.
+"""
+
+import re
+from weakref import ref
+
+from .cwt import (
+    Dimension,
+    Domain,
+    Domains,
+    Operation,
+    Operations,
+    Output,
+    Outputs,
+    ParameterError,
+    Variable,
+    Variables,
+    _TrackedDict,
+)
+
+
+class ValidationError(ParameterError):
+    """Invalid document. `errors` is the list of `(path, message)` of all errors."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super(ValidationError, self).__init__('\n'.join('{}: {}'.format(path, message) for path, message in errors))
+
+
+DIMENSION = dict(
+    type='object',
+    properties=dict(
+        start=dict(type=['number', 'string', 'null']),
+        end=dict(type=['number', 'string', 'null']),
+        step=dict(type=['number', 'null'], exclusiveMinimum=0),
+        crs=dict(enum=['values', 'indices'])),
+    additionalProperties=False)
+
+DOMAIN = dict(
+    type='object',
+    # a mask is a name or an object of the ESGF CWT API with uri, var_name and operation
+    properties=dict(id=dict(type='string'), mask=dict(type=['string', 'object', 'null'])),
+    required=['id'],
+    additionalProperties=DIMENSION)
+
+VARIABLE = dict(
+    type='object',
+    properties=dict(
+        uri=dict(type='string'),
+        id=dict(type='string', pattern=r'^[^|]+\|[^|]+$', message="does not match 'name|id'"),
+        var_name=dict(type='string'),
+        domain=dict(type=['string', 'object', 'null'])),
+    required=['uri'],
+    # the id is generated if only the variable name is given
+    anyOf=[dict(required=['id']), dict(required=['var_name'])],
+    message='requires id or var_name',
+    additionalProperties=False)
+
+OPERATION = dict(
+    type='object',
+    properties=dict(
+        name=dict(type=['string', 'null']),
+        domain=dict(type=['string', 'null']),
+        input=dict(type='array', items=dict(type='string')),
+        result=dict(type='string'),
+        axes=dict(type=['string', 'array', 'null']),
+        bins=dict(type=['string', 'array', 'null'])),
+    # the name is generated if it is missing
+    additionalProperties=False)
+
+OUTPUT = dict(
+    type='object',
+    properties={
+        'uri': dict(type='string'),
+        'id': dict(type=['string', 'null']),
+        'domain': dict(type=['string', 'object', 'null']),
+        'mime-type': dict(type='string'),
+        'mimetype': dict(type=['string', 'null']),
+    },
+    required=['uri'],
+    additionalProperties=False)
+
+SCHEMAS = dict(domain=DOMAIN, variable=VARIABLE, operation=OPERATION, output=OUTPUT)
+
+_TYPES = dict(object=(dict,), array=(list,), string=(str,), number=(int, float), integer=(int,), null=(type(None),))
+
+
+def _path(path):
+    # paths are built as (parent, key) pairs and only formatted for errors
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    return '$' + ''.join('[{}]'.format(key) if isinstance(key, int) else '.{}'.format(key) for key in reversed(keys))
+
+
+def _ignore(value, path, errors):
+    pass
+
+
+def _not_allowed(value, path, errors):
+    errors.append((_path(path), 'is not allowed'))
+
+
+def _checks(schema):
+    """Return the `(invalid, message)` checks of a value other than its type."""
+    checks = []
+    if 'enum' in schema:
+        allowed = tuple(schema['enum'])
+        message = 'must be one of {}'.format(', '.join(map(str, allowed)))
+        checks.append((lambda value: value not in allowed, message))
+    if 'exclusiveMinimum' in schema:
+        minimum = schema['exclusiveMinimum']
+        checks.append((lambda value: value is not None and value <= minimum, 'must be greater than {}'.format(minimum)))
+    if 'pattern' in schema:
+        match = re.compile(schema['pattern']).match
+        checks.append((lambda value: not match(value),
+                       schema.get('message', 'does not match {}'.format(schema['pattern']))))
+    return checks
+
+
+def _items(schema):
+    validate_item = compile_schema(schema['items'])
+
+    def items(value, path, errors):
+        for index, item in enumerate(value):
+            validate_item(item, (path, index), errors)
+    return items
+
+
+def _properties(schema):
+    required = tuple(schema.get('required', ()))
+    properties = dict((name, compile_schema(subschema)) for name, subschema in schema.get('properties', {}).items())
+    additional = schema.get('additionalProperties', True)
+    if isinstance(additional, dict):
+        additional = compile_schema(additional)
+    else:
+        additional = _ignore if additional else _not_allowed
+    lookup = properties.get
+
+    def properties_(value, path, errors):
+        for key in required:
+            if key not in value:
+                errors.append((_path((path, key)), 'is required'))
+        for key, item in value.items():
+            lookup(key, additional)(item, (path, key), errors)
+    return properties_
+
+
+def _any_of(schema):
+    alternatives = [compile_schema(subschema) for subschema in schema['anyOf']]
+    message = schema.get('message', 'does not match any of the alternatives')
+
+    def any_of(value, path, errors):
+        for alternative in alternatives:
+            failed = []
+            alternative(value, path, failed)
+            if not failed:
+                return
+        errors.append((_path(path), message))
+    return any_of
+
+
+def compile_schema(schema):
+    """Compile a schema into a function `validate(value, path, errors)` which appends `(path, message)` errors.
+
+    Each check assumes the previous checks passed, e.g. the properties are only checked if the
+    value is an object.
+    """
+    checks = _checks(schema)
+    steps = []
+    if 'items' in schema:
+        steps.append(_items(schema))
+    if 'properties' in schema or 'required' in schema or 'additionalProperties' in schema:
+        steps.append(_properties(schema))
+    if 'anyOf' in schema:
+        steps.append(_any_of(schema))
+
+    def check(value, path, errors):
+        for invalid, message in checks:
+            if invalid(value):
+                errors.append((_path(path), message))
+                return
+        for step in steps:
+            step(value, path, errors)
+
+    if not checks:
+        check = steps[0] if len(steps) == 1 else check if steps else None
+    if 'type' not in schema:
+        return check or _ignore
+    names = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+    types = frozenset(t for name in names for t in _TYPES[name])
+    expected = 'expected {}, got '.format(' or '.join(names))
+
+    # type() excludes bool, which is a subclass of int but not a JSON number
+    if check is None:
+        def validate(value, path, errors):
+            if type(value) not in types:
+                errors.append((_path(path), expected + type(value).__name__))
+    else:
+        def validate(value, path, errors):
+            if type(value) not in types:
+                errors.append((_path(path), expected + type(value).__name__))
+            else:
+                check(value, path, errors)
+    return validate
+
+
+_validators = {}
+
+
+def validator(kind):
+    """Return the compiled validator of a document kind."""
+    if kind not in _validators:
+        if kind in SCHEMAS:
+            _validators[kind] = compile_schema(SCHEMAS[kind])
+        elif kind[:-1] in SCHEMAS and kind.endswith('s'):
+            _validators[kind] = compile_schema(dict(type='array', items=SCHEMAS[kind[:-1]]))
+        else:
+            raise ValueError('Unknown document kind {}.'.format(kind))
+    return _validators[kind]
+
+
+def validate(kind, data):
+    """Return the list of `(path, message)` errors of a decoded document."""
+    errors = []
+    validator(kind)(data, None, errors)
+    return errors
+
+
+def check(kind, data):
+    """Raise a `ValidationError` with all errors if the document is invalid."""
+    errors = validate(kind, data)
+    if errors:
+        raise ValidationError(errors)
+
+
+# construction of validated documents without the checks of the constructors
+
+def _new(cls, parent=None):
+    obj = cls.__new__(cls)
+    obj._parents = parent
+    return obj
+
+
+def _dimension(data, parent):
+    dimension = _new(Dimension, parent)
+    dimension._start = data.get('start')
+    dimension._end = data.get('end')
+    dimension._step = data.get('step', 1)
+    dimension._crs = data.get('crs') or 'values'
+    return dimension
+
+
+def _domain(data):
+    domain = _new(Domain)
+    domain._id = data['id']
+    domain._mask = data.get('mask')
+    owner = ref(domain)
+    # the dimensions are adopted directly instead of by _TrackedDict.__init__
+    dimensions = _TrackedDict.__new__(_TrackedDict)
+    dict.__init__(dimensions, (
+        (key, _dimension(value, owner)) for key, value in data.items() if key != 'id' and key != 'mask'))
+    dimensions._owner = owner
+    domain._dimensions = dimensions
+    return domain
+
+
+def _variable(data):
+    variable = _new(Variable)
+    variable._id = data.get('id')
+    if variable._id:
+        variable._var_name, variable._name = variable._id.split('|')
+    else:
+        variable._var_name, variable._name = data['var_name'], None
+    variable._uri = data['uri']
+    variable._domain = data.get('domain')
+    return variable
+
+
+def _operation(data):
+    operation = _new(Operation)
+    operation._name = data.get('name')
+    operation._named = operation._name is not None
+    operation._domain = data.get('domain')
+    operation._input = data.get('input')
+    operation._result = data.get('result')
+    operation._axes = data.get('axes')
+    operation._bins = data.get('bins')
+    return operation
+
+
+def _output(data):
+    output = _new(Output)
+    output._id = data.get('id')
+    output._uri = data['uri']
+    output._domain = data.get('domain')
+    output._mimetype = data['mime-type'] if 'mime-type' in data else data.get('mimetype')
+    return output
+
+
+BUILDERS = dict(
+    domain=_domain,
+    domains=lambda data: Domains([_domain(item) for item in data]),
+    variable=_variable,
+    variables=lambda data: Variables([_variable(item) for item in data]),
+    operation=_operation,
+    operations=lambda data: Operations([_operation(item) for item in data]),
+    output=_output,
+    outputs=lambda data: Outputs([_output(item) for item in data]),
+)
+
+
+def load(kind, data):
+    """Validate a decoded document and return the parameter object.
+
+    :param kind: document kind, e.g. `domains`.
+    :param data: the decoded JSON document.
+    :raises ValidationError: with all errors of the document.
+    """
+    check(kind, data)
+    return BUILDERS[kind](data)
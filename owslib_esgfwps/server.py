@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Decoding of ESGF WPS inputs in a WPS process, e.g. a PyWPS handler.
+
+`RequestDecoder` turns the raw `domain`, `variable` and `operation` inputs of a request into
+`Domains`, `Variables` and `Operations`. The payload bytes are parsed by the fastest
+JSON backend of `owslib_esgfwps.decoder`, validated in one pass and built without the
+checks of the constructors (see `owslib_esgfwps.schema`). The references of the
+operations are resolved to the decoded `Domain` and `Variable` objects::
+
+    >>> from owslib_esgfwps.server import RequestDecoder
+    >>> decode = RequestDecoder()
+    >>> def _handler(request, response):
+    ...     inputs = decode(request.inputs)
+    ...     for operation in inputs.operations:
+    ...         variables = [inputs.variable(name) for name in operation.input]
+
+Decoded documents are cached by their payload, so repeated inputs are parsed once.
+"""
+
+import threading
+from collections import OrderedDict
+
+from . import decoder, schema
+from .cwt import Domains, Operations, Variables
+
+KINDS = OrderedDict([('domain', 'domains'), ('variable', 'variables'), ('operation', 'operations')])
+COLLECTIONS = dict(domains=Domains, variables=Variables, operations=Operations)
+
+
+def payload(value):
+    """Return the raw document of an input: `bytes`, `str` or an object with `data` like a PyWPS input."""
+    if isinstance(value, (bytes, str)):
+        return value
+    data = getattr(value, 'data', None)
+    if data is None:
+        raise ValueError('Input {!r} has no data.'.format(value))
+    return data
+
+
+class DecodedInputs(object):
+    """The decoded `domains`, `variables` and `operations` of a request."""
+
+    def __init__(self, domains, variables, operations):
+        self.domains = domains
+        self.variables = variables
+        self.operations = operations
+        self._domains = dict((domain.id, domain) for domain in domains)
+        self._variables = dict((variable.name, variable) for variable in variables)
+
+    def domain(self, id):
+        """Return the `Domain` with the given id or `None`."""
+        return self._domains.get(id)
+
+    def variable(self, name):
+        """Return the `Variable` with the given name (the part of the id after `|`) or `None`."""
+        return self._variables.get(name)
+
+
+class RequestDecoder(object):
+    """Decoder of the ESGF inputs of WPS requests. Instances are thread-safe.
+
+    :param validate: check the documents and the references of the operations.
+    :param maxsize: number of decoded documents kept in the payload cache, 0 to disable it.
+    """
+
+    def __init__(self, validate=True, maxsize=128):
+        self.validate = validate
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, kind, data):
+        key = (kind, data)
+        with self._lock:
+            document = self._cache.get(key)
+            if document is not None:
+                self._cache.move_to_end(key)
+        if document is None:
+            document = decoder.loads(data)
+            if self.validate:
+                # an input is a list of items or a single item
+                schema.check(kind if isinstance(document, list) else kind[:-1], document)
+            if self.maxsize:
+                with self._lock:
+                    self._cache[key] = document
+                    while len(self._cache) > self.maxsize:
+                        self._cache.popitem(last=False)
+        return document
+
+    def load(self, kind, values):
+        """Decode the documents of one input kind (e.g. `domains`) and return one collection.
+
+        :param values: a payload or an iterable of payloads, e.g. the `deque` of inputs of PyWPS.
+        """
+        if isinstance(values, (bytes, str)) or hasattr(values, 'data') or not hasattr(values, '__iter__'):
+            values = [values]
+        items = []
+        for value in values:
+            document = self._load(kind, payload(value))
+            items.extend(document if isinstance(document, list) else [document])
+        return schema.BUILDERS[kind](items)
+
+    def __call__(self, inputs):
+        """Decode the `domain`, `variable` and `operation` inputs.
+
+        :param inputs: mapping of input identifier to a payload or a list of payloads,
+            like `request.inputs` of PyWPS. Missing inputs give empty collections.
+        :return: `DecodedInputs`
+        :raises owslib_esgfwps.schema.ValidationError: for invalid documents or unknown references.
+        """
+        collections = dict(
+            (kind, self.load(kind, inputs[name]) if inputs.get(name) else COLLECTIONS[kind]())
+            for name, kind in KINDS.items())
+        decoded = DecodedInputs(collections['domains'], collections['variables'], collections['operations'])
+        self._link(decoded)
+        return decoded
+
+    def _link(self, decoded):
+        results = set(operation.result for operation in decoded.operations)
+        errors = []
+        for index, operation in enumerate(decoded.operations):
+            if operation._domain is not None:
+                domain = decoded.domain(operation._domain)
+                if domain is not None:
+                    operation._domain = domain
+                elif self.validate:
+                    errors.append(('$.operation[{}].domain'.format(index),
+                                   'unknown domain {}'.format(operation._domain)))
+            inputs = []
+            for position, name in enumerate(operation._input or []):
+                variable = decoded.variable(name)
+                if variable is None and name not in results and self.validate:
+                    errors.append(('$.operation[{}].input[{}]'.format(index, position),
+                                   'unknown variable or result {}'.format(name)))
+                inputs.append(variable if variable is not None else name)
+            if operation._input is not None:
+                operation._input = inputs
+        if errors:
+            raise schema.ValidationError(errors)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Split a `Domain` into non-overlapping tiles which can be submitted concurrently.
+
+A `Dimension` is treated as the points `start, start + step, ...` up to and including
+`end`, both for `crs='indices'` and `crs='values'`. Tiles are cut between these points,
+so every point of the original domain is in exactly one tile. Tiles of a `values`
+dimension are cut halfway between two points. As value subsets include both bounds, a
+tile ends just below the start of the next one, a coordinate on a cut belongs to the
+later tile only::
+
+    >>> from owslib_esgfwps import Domain, Dimension
+    >>> from owslib_esgfwps.tiling import tile_domain
+    >>> d0 = Domain(dict(time=Dimension(0, 99, crs='indices'), lat=Dimension(-90, 90, 0.5)))
+    >>> tiles = tile_domain(d0, chunks=dict(time=10))
+    >>> len(tiles)
+    10
+    >>> tiles = tile_domain(d0, max_bytes=100 * 1024, itemsize=4)
+
+Dimensions without `start` or `end` are not split.
+"""
+
+import itertools
+import math
+
+from .cwt import Dimension, Domain, ParameterError
+
+EPSILON = 1e-9
+
+
+def points(dimension):
+    """Return the number of points of a dimension or `None` if it is unbounded."""
+    if dimension.start is None or dimension.end is None:
+        return None
+    step = dimension.step or 1
+    if step <= 0:
+        raise ParameterError('Dimension step must be positive.')
+    if dimension.end < dimension.start:
+        return 0
+    return int(math.floor((dimension.end - dimension.start) / float(step) + EPSILON)) + 1
+
+
+def split_dimension(dimension, chunk):
+    """Split a dimension into dimensions with at most `chunk` points each.
+
+    A `values` dimension is split into ranges cut halfway between two points, each range
+    ends `EPSILON * step` below the start of the next one.
+    """
+    count = points(dimension)
+    if count is None or chunk is None or count <= chunk:
+        return [Dimension(dimension.start, dimension.end, dimension.step, dimension.crs)]
+    if chunk < 1:
+        raise ParameterError('Chunk size must be at least 1.')
+    step = dimension.step or 1
+    # cut after the last point of a tile or halfway to the next point
+    margin = 0 if dimension.crs == 'indices' else 0.5
+    integral = margin == 0 and all(isinstance(value, int) for value in (dimension.start, step))
+    dimensions = []
+    for first in range(0, count, chunk):
+        last = min(first + chunk, count) - 1
+        start = dimension.start + (first - margin) * step
+        end = dimension.start + (last + margin) * step
+        if not integral:
+            start, end = _round(start, step), _round(end, step)
+        if margin and last < count - 1:
+            end = _below(end, step)
+        dimensions.append(Dimension(start, end, dimension.step, dimension.crs))
+    dimensions[0] = Dimension(dimension.start, dimensions[0].end, dimension.step, dimension.crs)
+    dimensions[-1] = Dimension(dimensions[-1].start, dimension.end, dimension.step, dimension.crs)
+    return dimensions
+
+
+def _round(value, step):
+    # remove floating point noise of start + n * step
+    digits = max(0, -int(math.floor(math.log10(abs(step / 2.0))))) + 9
+    return round(value, digits)
+
+
+def _below(value, step):
+    # a bound below the cut which is still a different float for large values
+    return value - max(abs(step) * EPSILON, abs(value) * 1e-15)
+
+
+def plan_chunks(domain, max_bytes, itemsize=4, chunks=None):
+    """Return chunk sizes per dimension so that a tile has at most `max_bytes`.
+
+    The dimension with the largest chunk is halved until the tile fits in the budget.
+    """
+    chunks = dict(chunks or {})
+    sizes = {}
+    for name, dimension in domain.dimensions.items():
+        count = points(dimension)
+        if count is not None:
+            sizes[name] = min(chunks.get(name) or count, count) or 1
+    budget = max(1, int(max_bytes // itemsize))
+    while _product(sizes.values()) > budget:
+        name = max(sizes, key=lambda key: sizes[key])
+        if sizes[name] == 1:
+            break
+        sizes[name] = int(math.ceil(sizes[name] / 2.0))
+    chunks.update(sizes)
+    return chunks
+
+
+def _product(values):
+    result = 1
+    for value in values:
+        result *= value
+    return result
+
+
+def tile_domain(domain, chunks=None, max_bytes=None, itemsize=4):
+    """Split a domain into tiles which exactly cover it.
+
+    :param domain: the `Domain` to split.
+    :param chunks: dict of dimension name to the maximum number of points per tile.
+    :param max_bytes: maximum size of a tile in bytes, combined with `chunks` if both are given.
+    :param itemsize: bytes per element used with `max_bytes`.
+    :return: list of `Domain` objects with new ids and the mask of the original domain.
+    """
+    if max_bytes is not None:
+        chunks = plan_chunks(domain, max_bytes, itemsize=itemsize, chunks=chunks)
+    chunks = chunks or {}
+    unknown = set(chunks) - set(domain.dimensions)
+    if unknown:
+        raise ParameterError('Domain has no dimension {}.'.format(', '.join(sorted(unknown))))
+    names = list(domain.dimensions)
+    splits = [split_dimension(domain.dimensions[name], chunks.get(name)) for name in names]
+    return [Domain(dict(zip(names, dimensions)), mask=domain.mask)
+            for dimensions in itertools.product(*splits)]
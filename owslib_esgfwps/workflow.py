@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+"""
+Dependency graph of ESGF operations.
+
+An `Operation` refers to its inputs by name: the `name` of a `Variable` or the `result`
+of another operation. An `Operation` object given as input is linked to that operation
+itself. `Workflow` resolves these links, checks them and splits the
+operations into independent sub-workflows which can be submitted concurrently::
+
+    >>> from owslib_esgfwps import Operation
+    >>> from owslib_esgfwps.workflow import Workflow
+    >>> avg = Operation('CDAT.average', domain=d0, input=[v0], axes='time', result='avg')
+    >>> diff = Operation('CDAT.subtract', domain=d0, input=['avg', v1])
+    >>> workflow = Workflow([avg, diff])
+    >>> workflow.layers()
+    [[Operation(name='CDAT.average')], [Operation(name='CDAT.subtract')]]
+    >>> jobs = workflow.submit(BatchSubmitter(wps), 'cdat_workflow')
+"""
+
+from .batch import Job
+from .cwt import Domain, Domains, Operations, ParameterError, Variable, Variables
+from .memo import request_key
+
+
+class WorkflowError(ParameterError):
+    pass
+
+
+class Workflow(object):
+    """Graph of operations linked by their `input` and `result` names.
+
+    :param operations: list of `Operation` objects or an `Operations` collection.
+    :param variables: variables used as inputs. `Variable` objects given directly as
+        operation inputs are added automatically.
+    :param domains: domains used by the operations and variables. `Domain` objects given
+        directly to operations are added automatically.
+    """
+
+    def __init__(self, operations, variables=(), domains=()):
+        self.operations = list(operations)
+        self.variables = list(variables)
+        self.domains = list(domains)
+        for op in self.operations:
+            for inpt in op._input or []:
+                if isinstance(inpt, Variable) and inpt not in self.variables:
+                    self.variables.append(inpt)
+            if isinstance(op._domain, Domain) and op._domain not in self.domains:
+                self.domains.append(op._domain)
+        self._results = {}
+        for op in self.operations:
+            if op.result in self._results:
+                raise WorkflowError('Result name {} is used by more than one operation.'.format(op.result))
+            self._results[op.result] = op
+        self._variables = dict((var.name, var) for var in self.variables)
+        self._ids = set(map(id, self.operations))
+
+    def _links(self, operation):
+        """Return the (input name, operation or `None`) pairs of the inputs of `operation`."""
+        links = []
+        for inpt, name in zip(operation._input or [], operation.input):
+            if id(inpt) in self._ids:
+                links.append((name, inpt))
+            else:
+                links.append((name, self._results.get(name)))
+        return links
+
+    def dependencies(self, operation):
+        """Return the operations whose results are inputs of `operation`."""
+        return [dependency for name, dependency in self._links(operation) if dependency is not None]
+
+    def dangling(self):
+        """Return the (operation, input name) pairs which refer to no variable or result."""
+        return [(op, name) for op in self.operations for name, dependency in self._links(op)
+                if dependency is None and name not in self._variables]
+
+    def validate(self):
+        """Raise a `WorkflowError` for dangling references and cycles."""
+        dangling = self.dangling()
+        if dangling:
+            raise WorkflowError('Unknown inputs: {}.'.format(', '.join(
+                '{} of {}'.format(name, op.name) for op, name in dangling)))
+        self.layers()
+
+    def layers(self):
+        """Return the operations grouped in layers. Operations of a layer only depend on earlier layers."""
+        remaining = dict((id(op), len(set(map(id, self.dependencies(op))))) for op in self.operations)
+        dependents = dict((id(op), []) for op in self.operations)
+        for op in self.operations:
+            for dependency in set(self.dependencies(op)):
+                dependents[id(dependency)].append(op)
+        layer = [op for op in self.operations if remaining[id(op)] == 0]
+        layers = []
+        while layer:
+            layers.append(layer)
+            following = []
+            for op in layer:
+                for dependent in dependents[id(op)]:
+                    remaining[id(dependent)] -= 1
+                    if remaining[id(dependent)] == 0:
+                        following.append(dependent)
+            layer = following
+        if sum(len(layer) for layer in layers) < len(self.operations):
+            cycle = [op.name for op in self.operations if remaining[id(op)] > 0]
+            raise WorkflowError('Operations {} have cyclic dependencies.'.format(', '.join(cycle)))
+        return layers
+
+    def order(self):
+        """Return the operations in topological order."""
+        return [op for layer in self.layers() for op in layer]
+
+    def components(self):
+        """Split the workflow into independent sub-workflows, each in topological order."""
+        parent = dict((id(op), id(op)) for op in self.operations)
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for op in self.operations:
+            for dependency in self.dependencies(op):
+                parent[find(id(op))] = find(id(dependency))
+        groups = {}
+        for op in self.order():
+            groups.setdefault(find(id(op)), []).append(op)
+        return [self._subset(ops) for ops in groups.values()]
+
+    def _subset(self, operations):
+        names = set(name for op in operations for name in op.input)
+        variables = [var for var in self.variables if var.name in names]
+        domain_ids = set(op.domain for op in operations)
+        domain_ids.update(getattr(var.domain, 'id', var.domain) for var in variables)
+        domains = [domain for domain in self.domains if domain.id in domain_ids]
+        return Workflow(operations, variables, domains)
+
+    def inputs(self):
+        """Return the Execute inputs of this workflow."""
+        return [('domain', Domains(self.domains)),
+                ('variable', Variables(self.variables)),
+                ('operation', Operations(self.order()))]
+
+    def submit(self, submitter, identifier):
+        """Validate and submit each independent sub-workflow as one Execute request.
+
+        :param submitter: a `BatchSubmitter` which runs the requests concurrently.
+        :return: list of `WorkflowJob`, one per sub-workflow.
+        """
+        self.validate()
+        jobs = [WorkflowJob(index, workflow) for index, workflow in enumerate(self.components())]
+        return submitter.submit_jobs(identifier, jobs)
+
+
+class WorkflowJob(Job):
+    """Execute request of a (sub-)workflow."""
+
+    def __init__(self, index, workflow):
+        super(WorkflowJob, self).__init__(index, variable=None, domain=None)
+        self.workflow = workflow
+
+    def key(self, identifier):
+        return request_key(identifier, self.workflow.variables, self.workflow.domains, self.workflow.order())
+
+    @property
+    def inputs(self):
+        return self.workflow.inputs()
+
+    def __repr__(self):
+        status = self.execution.status if self.execution else self.error
+        return "WorkflowJob(index='{}',operations='{}',status='{}')".format(
+            self.index, [op.name for op in self.workflow.operations], status)
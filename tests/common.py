@@ -1 +1,227 @@
+import json
+import re
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:  # Python 3.6
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
 TEST_SU_OPENDAP = 'http://opendap.knmi.nl/knmi/thredds/dodsC/CLIPC/gerics/climatesignalmaps/EUR-44/tasmax/su_python-2-7-6_GERICS_ens-multiModel-climatesignalmap-rcp85-EUR-44_yr_20700101-20991231_1971-2000.nc'  # noqa
+
+CAPABILITIES = """<?xml version="1.0" encoding="UTF-8"?>
+<wps:Capabilities service="WPS" version="1.0.0" xml:lang="en-US"
+  xmlns:ows="http://www.opengis.net/ows/1.1" xmlns:wps="http://www.opengis.net/wps/1.0.0"
+  xmlns:xlink="http://www.w3.org/1999/xlink">
+  <ows:ServiceIdentification><ows:Title>Stub</ows:Title></ows:ServiceIdentification>
+  <wps:ProcessOfferings>
+    <wps:Process wps:processVersion="1.0">
+      <ows:Identifier>pelican_subset</ows:Identifier><ows:Title>Subset</ows:Title>
+    </wps:Process>
+  </wps:ProcessOfferings>
+</wps:Capabilities>"""
+
+DESCRIBE_PROCESS = """<?xml version="1.0" encoding="UTF-8"?>
+<wps:ProcessDescriptions service="WPS" version="1.0.0" xml:lang="en-US"
+  xmlns:ows="http://www.opengis.net/ows/1.1" xmlns:wps="http://www.opengis.net/wps/1.0.0">
+  <ProcessDescription wps:processVersion="1.0" storeSupported="true" statusSupported="true">
+    <ows:Identifier>pelican_subset</ows:Identifier><ows:Title>Subset</ows:Title>
+    <DataInputs/>
+    <ProcessOutputs/>
+  </ProcessDescription>
+</wps:ProcessDescriptions>"""
+
+EXECUTE_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<wps:ExecuteResponse service="WPS" version="1.0.0" xml:lang="en-US" serviceInstance="{url}"
+  {status_location} xmlns:ows="http://www.opengis.net/ows/1.1" xmlns:wps="http://www.opengis.net/wps/1.0.0">
+  <wps:Process wps:processVersion="1.0">
+    <ows:Identifier>pelican_subset</ows:Identifier><ows:Title>Subset</ows:Title>
+  </wps:Process>
+  <wps:Status creationTime="2019-07-09T12:00:00Z">{status}</wps:Status>
+  {outputs}
+</wps:ExecuteResponse>"""
+
+PROCESS_OUTPUTS = """<wps:ProcessOutputs><wps:Output>
+    <ows:Identifier>output</ows:Identifier><ows:Title>Output</ows:Title>
+    <wps:Data><wps:ComplexData mimeType="application/json">{}</wps:ComplexData></wps:Data>
+  </wps:Output></wps:ProcessOutputs>"""
+
+EXCEPTION_REPORT = """<?xml version="1.0" encoding="UTF-8"?>
+<ows:ExceptionReport version="1.0.0" xmlns:ows="http://www.opengis.net/ows/1.1">
+  <ows:Exception exceptionCode="ServerBusy"><ows:ExceptionText>busy</ows:ExceptionText></ows:Exception>
+</ows:ExceptionReport>"""
+
+
+class StubWPS(object):
+    """Local stand-in for an ESGF WPS service, used as context manager.
+
+    :param fail: number of Execute requests answered with HTTP 500 before succeeding.
+    :param exception_reports: number of Execute requests answered with an `ExceptionReport`
+        before succeeding, after the failed ones. It is sent with a charset in the content type,
+        so OWSLib returns an execution with status `Exception` instead of raising.
+    :param polls: number of status requests answered with `ProcessStarted` before an
+        asynchronous job succeeds.
+    :param failed_jobs: number of asynchronous jobs which end with `ProcessFailed`.
+    :param delay: seconds to wait before answering a request.
+    :param files: dict of file name to bytes served below `/files/` (supports range requests and If-Range).
+    """
+
+    def __init__(self, fail=0, polls=0, failed_jobs=0, delay=0, files=None, exception_reports=0):
+        self.fail = fail
+        self.exception_reports = exception_reports
+        self.polls = polls
+        self.failed_jobs = failed_jobs
+        self.delay = delay
+        self.files = files or {}
+        self.requests = []
+        self.connections = 0
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}/wps'.format(self._server.server_address[1])
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def executions(self):
+        return [body for method, path, headers, body in self.requests if method == 'POST']
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _handler(self))
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, kwargs=dict(poll_interval=0.05))
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _record(self, method, path, headers, body):
+        with self._lock:
+            self.requests.append((method, path, dict(headers), body))
+
+    def _execute(self, body):
+        with self._lock:
+            if self.fail > 0:
+                self.fail -= 1
+                return None
+            if self.exception_reports > 0:
+                self.exception_reports -= 1
+                return EXCEPTION_REPORT
+            job = len(self.jobs)
+            self.jobs[job] = 0
+        if 'storeExecuteResponse="true"' in body:
+            return self._response(
+                '<wps:ProcessAccepted>accepted</wps:ProcessAccepted>',
+                status_location='statusLocation="{}/status/{}.xml"'.format(self.base_url, job))
+        return self._response('<wps:ProcessSucceeded>done</wps:ProcessSucceeded>', self._outputs(job))
+
+    def _status(self, job):
+        with self._lock:
+            self.jobs[job] += 1
+            polls = self.jobs[job]
+        location = 'statusLocation="{}/status/{}.xml"'.format(self.base_url, job)
+        if polls <= self.polls:
+            return self._response(
+                '<wps:ProcessStarted percentCompleted="{}">running</wps:ProcessStarted>'.format(polls), '',
+                status_location=location)
+        if job < self.failed_jobs:
+            return self._response(
+                '<wps:ProcessFailed><ows:ExceptionReport><ows:Exception exceptionCode="NoApplicableCode">'
+                '<ows:ExceptionText>failed</ows:ExceptionText></ows:Exception></ows:ExceptionReport>'
+                '</wps:ProcessFailed>', '', status_location=location)
+        return self._response(
+            '<wps:ProcessSucceeded>done</wps:ProcessSucceeded>', self._outputs(job), status_location=location)
+
+    def _outputs(self, job):
+        data = [{'uri': '{}/files/output-{}.nc'.format(self.base_url, job),
+                 'id': 'output-{}'.format(job),
+                 'mime-type': 'application/x-netcdf'}]
+        return PROCESS_OUTPUTS.format(json.dumps(data))
+
+    def _response(self, status, outputs='', status_location=''):
+        return EXECUTE_RESPONSE.format(
+            url=self.url, status=status, outputs=outputs, status_location=status_location)
+
+
+def _handler(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            BaseHTTPRequestHandler.setup(self)
+            with stub._lock:
+                stub.connections += 1
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body, status=200, content_type='text/xml', headers=None):
+            if isinstance(body, str):
+                body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def _file(self, name):
+            if name not in stub.files:
+                return self._send('', status=404, content_type='text/plain')
+            content = stub.files[name]
+            headers = {'Accept-Ranges': 'bytes', 'ETag': '"{}"'.format(len(content))}
+            match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+            if match and self.headers.get('If-Range', headers['ETag']) == headers['ETag']:
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else len(content) - 1
+                headers['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, len(content))
+                return self._send(content[start:end + 1], status=206,
+                                  content_type='application/octet-stream', headers=headers)
+            return self._send(content, content_type='application/octet-stream', headers=headers)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            stub._record('GET', self.path, self.headers, '')
+            time.sleep(stub.delay)
+            if self.path.startswith('/files/'):
+                return self._file(self.path[len('/files/'):].split('?')[0])
+            match = re.match(r'/status/(\d+)\.xml', self.path)
+            if match:
+                return self._send(stub._status(int(match.group(1))))
+            if 'describeprocess' in self.path.lower():
+                document, etag = DESCRIBE_PROCESS, '"describe"'
+            else:
+                document, etag = CAPABILITIES, '"capabilities"'
+            if self.headers.get('If-None-Match') == etag:
+                return self._send('', status=304, headers={'ETag': etag})
+            return self._send(document, headers={'ETag': etag})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            body = self.rfile.read(length).decode('utf-8')
+            stub._record('POST', self.path, self.headers, body)
+            time.sleep(stub.delay)
+            response = stub._execute(body)
+            if response is None:
+                return self._send('error', status=500, content_type='text/plain')
+            if response is EXCEPTION_REPORT:
+                return self._send(response, content_type='text/xml; charset=utf-8')
+            return self._send(response)
+
+    return Handler
@@ -0,0 +1,201 @@
+import itertools
+import random
+import time
+
+import pytest
+
+from owslib_esgfwps import Domain, Dimension, ParameterError
+from owslib_esgfwps.algebra import DomainIndex, contains, difference, intersection
+
+
+def point_set(dimension, lower=-100, upper=100):
+    """Return the points of an index dimension, unbounded ends are cut at `lower` and `upper`."""
+    if dimension is None:
+        return set()
+    start = dimension.start if dimension.start is not None else None
+    end = dimension.end if dimension.end is not None else upper
+    if start is None:
+        return set(range(end, lower - 1, -dimension.step))
+    return set(range(start, end + 1, dimension.step))
+
+
+def box_set(domain, names, lower=-100, upper=100):
+    if domain is None:
+        return set()
+    axes = []
+    for name in names:
+        dimension = domain.dimensions.get(name) or Dimension(None, None, crs='indices')
+        axes.append(point_set(dimension, lower, upper) if dimension.start is not None or dimension.end is not None
+                    else set(range(lower, upper + 1)))
+    return set(itertools.product(*axes))
+
+
+def random_dimension(rnd):
+    start = rnd.randint(0, 40)
+    return Dimension(start, start + rnd.randint(0, 30), rnd.randint(1, 4), crs='indices')
+
+
+def random_domain(rnd, names):
+    return Domain(dict((name, random_dimension(rnd)) for name in names if rnd.random() < 0.8))
+
+
+def test_intersection_dimension():
+    assert Dimension(0, 99, crs='indices').intersection(Dimension(50, 149, crs='indices')).json == \
+        dict(start=50, end=99, step=1, crs='indices')
+    assert intersection(Dimension(0, 99, 2, crs='indices'), Dimension(1, 149, 3, crs='indices')).json == \
+        dict(start=4, end=94, step=6, crs='indices')
+    assert intersection(Dimension(0, 99, 2, crs='indices'), Dimension(1, 149, 2, crs='indices')) is None
+    assert intersection(Dimension(0, 10, crs='indices'), Dimension(11, 20, crs='indices')) is None
+
+
+def test_values():
+    # value dimensions are closed intervals, the step is a stride over the grid points
+    assert contains(Dimension(-90.0, 90.0), Dimension(10.5, 20.5))
+    assert not contains(Dimension(-90.0, 90.0), Dimension(10.5, 90.5))
+    assert contains(Dimension(0.0, 360.0), Dimension(0.0, 360.0))
+    assert contains(Dimension(90.0, -90.0), Dimension(-10.25, 10.25))
+    assert intersection(Dimension(0.0, 10.0), Dimension(0.5, 5.5)).json == \
+        dict(start=0.5, end=5.5, step=1, crs='values')
+    assert intersection(Dimension(0.0, 10.0, 2), Dimension(5.5, None)).json == \
+        dict(start=5.5, end=10.0, step=2, crs='values')
+    assert intersection(Dimension(0.0, 10.0), Dimension(10.25, 20.0)) is None
+    assert [d.json for d in difference(Dimension(-90.0, 90.0), Dimension(-45.5, 45.5))] == [
+        dict(start=-90.0, end=-45.5, step=1, crs='values'), dict(start=45.5, end=90.0, step=1, crs='values')]
+    assert difference(Dimension(10.5, 20.5), Dimension(-90.0, 90.0)) == []
+
+
+def test_values_strides():
+    # a stride takes only some of the grid points
+    assert not contains(Dimension(-90.0, 90.0, 2), Dimension(10.5, 20.5))
+    assert contains(Dimension(-90.0, 90.0, 2), Dimension(-90.0, 20.5, 2))
+    with pytest.raises(ParameterError):
+        intersection(Dimension(0.0, 10.0, 2), Dimension(0.0, 10.0, 3))
+    with pytest.raises(ParameterError):
+        difference(Dimension(0.0, 10.0), Dimension(2.5, 5.5, 2))
+
+
+def test_values_index():
+    index = DomainIndex()
+    index.add('uri', Domain(dict(lat=Dimension(-90.0, 90.0), lon=Dimension(0.0, 360.0))), 'global')
+    index.add('uri', Domain(dict(lat=Dimension(30.5, 60.5), lon=Dimension(0.0, 40.0))), 'europe')
+    regional = Domain(dict(lat=Dimension(10.5, 20.5), lon=Dimension(100.25, 120.75),
+                           time=Dimension(0, 9, crs='indices')))
+    assert [value for domain, value in index.covering('uri', regional)] == ['global']
+    assert [value for domain, value in index.overlapping('uri', Domain(dict(lat=Dimension(50.25, 55.75))))] == [
+        'global', 'europe']
+
+
+def test_difference_large_period():
+    # the number of pieces is bounded by the points of the dimension, not by the common period
+    started = time.perf_counter()
+    pieces = difference(Dimension(0, 10, crs='indices'), Dimension(0, 10 ** 7, 10 ** 7, crs='indices'))
+    assert [(d.start, d.end) for d in pieces] == [(i, i) for i in range(1, 11)]
+    with pytest.raises(ParameterError):
+        difference(Dimension(0.0, 10.0, 0.25), Dimension(0.0, 10.0, 0.3333333))
+    with pytest.raises(ParameterError):
+        difference(Dimension(None, None, crs='indices'), Dimension(0, 10 ** 9, 10 ** 6 + 1, crs='indices'))
+    assert time.perf_counter() - started < 1
+
+
+def test_intersection_unbounded():
+    assert intersection(Dimension(None, 10, crs='indices'), Dimension(5, None, crs='indices')).json == \
+        dict(start=5, end=10, step=1, crs='indices')
+    assert intersection(Dimension(crs='indices'), Dimension(5, None, 2, crs='indices')).json == \
+        dict(start=5, end=None, step=2, crs='indices')
+
+
+def test_crs_mismatch():
+    with pytest.raises(ParameterError):
+        intersection(Dimension(0, 10, crs='indices'), Dimension(0, 10, crs='values'))
+    with pytest.raises(ParameterError):
+        contains(Domain(dict(lat=Dimension(0, 10))), Domain(dict(lat=Dimension(0, 10, crs='indices'))))
+
+
+def test_mask_mismatch():
+    with pytest.raises(ParameterError):
+        intersection(Domain(dict(lat=Dimension(0, 10)), mask='land'), Domain(dict(lat=Dimension(0, 10))))
+
+
+def test_contains_dimension():
+    assert contains(Dimension(0, 99, crs='indices'), Dimension(10, 20, 2, crs='indices'))
+    assert not contains(Dimension(0, 99, 2, crs='indices'), Dimension(10, 20, crs='indices'))
+    assert contains(Dimension(0, 99, 2, crs='indices'), Dimension(10, 10, crs='indices'))
+    assert not contains(Dimension(0, 99, 2, crs='indices'), Dimension(11, 11, crs='indices'))
+    assert contains(Dimension(crs='indices'), Dimension(10, 20, crs='indices'))
+    assert not contains(Dimension(0, 99, crs='indices'), Dimension(10, None, crs='indices'))
+    # a step beyond the end does not add points
+    assert contains(Dimension(0, 10, crs='indices'), Dimension(5, 12, 10, crs='indices'))
+
+
+def test_difference_dimension():
+    assert [d.json for d in difference(Dimension(0, 9, crs='indices'), Dimension(3, 7, 2, crs='indices'))] == [
+        dict(start=0, end=2, step=1, crs='indices'),
+        dict(start=4, end=6, step=2, crs='indices'),
+        dict(start=8, end=9, step=1, crs='indices')]
+    assert [d.json for d in difference(Dimension(0, 9, crs='indices'), Dimension(None, 4, crs='indices'))] == [
+        dict(start=5, end=9, step=1, crs='indices')]
+    assert difference(Dimension(0, 9, crs='indices'), Dimension(crs='indices')) == []
+    assert [d.json for d in difference(Dimension(0, 9, crs='indices'), Dimension(20, 30, crs='indices'))] == [
+        dict(start=0, end=9, step=1, crs='indices')]
+
+
+def test_domain():
+    d0 = Domain(dict(time=Dimension(0, 99, crs='indices'), lat=Dimension(-90, 90)), mask='land')
+    d1 = Domain(dict(time=Dimension(50, 149, crs='indices')), mask='land')
+    both = d0.intersection(d1)
+    assert both.mask == 'land'
+    assert both.id not in (d0.id, d1.id)
+    assert both.dimensions['time'].json == dict(start=50, end=99, step=1, crs='indices')
+    assert both.dimensions['lat'].json == dict(start=-90, end=90, step=1, crs='values')
+    assert both.dimensions['lat'] is not d0.dimensions['lat']
+    assert not d0.contains(d1)
+    assert d1.contains(both)
+    assert [d.dimensions['time'].end for d in d0.difference(d1)] == [49]
+    assert d0.intersection(Domain(dict(time=Dimension(200, 300, crs='indices')), mask='land')) is None
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_domains(seed):
+    rnd = random.Random(seed)
+    names = ['time', 'lat']
+    for _ in range(20):
+        d0, d1 = random_domain(rnd, names), random_domain(rnd, names)
+        s0, s1 = box_set(d0, names), box_set(d1, names)
+        assert box_set(intersection(d0, d1), names) == s0 & s1
+        assert contains(d0, d1) == (s1 <= s0)
+        pieces = [box_set(piece, names) for piece in difference(d0, d1)]
+        assert set().union(*pieces) == s0 - s1
+        assert sum(len(piece) for piece in pieces) == len(s0 - s1)
+
+
+def test_domain_index():
+    rnd = random.Random(1)
+    index = DomainIndex()
+    domains = [random_domain(rnd, ['time', 'lat']) for _ in range(300)]
+    for position, domain in enumerate(domains):
+        index.add('http://data.test.org/tas.nc', domain, position)
+    index.add('http://data.test.org/pr.nc', Domain(), 'pr')
+    assert len(index) == 301
+    variable = type('Variable', (object,), dict(uri='http://data.test.org/tas.nc'))()
+    for _ in range(50):
+        query = random_domain(rnd, ['time', 'lat'])
+        covering = [value for domain, value in index.covering(variable, query)]
+        assert covering == [position for position, domain in enumerate(domains) if contains(domain, query)]
+        overlapping = [value for domain, value in index.overlapping(variable, query)]
+        assert overlapping == [position for position, domain in enumerate(domains)
+                               if intersection(domain, query) is not None]
+    assert [value for domain, value in index.covering('http://data.test.org/pr.nc', domains[0])] == ['pr']
+    assert index.covering('http://data.test.org/missing.nc', domains[0]) == []
+
+
+def test_domain_index_add_after_query():
+    index = DomainIndex()
+    query = Domain(dict(time=Dimension(10, 20, crs='indices')))
+    index.add('uri', Domain(dict(time=Dimension(0, 15, crs='indices'))), 'a')
+    assert index.covering('uri', query) == []
+    index.add('uri', Domain(dict(time=Dimension(0, 50, crs='indices'))), 'b')
+    assert [value for domain, value in index.covering('uri', query)] == ['b']
+    # other crs and masks do not match
+    index.add('uri', Domain(dict(time=Dimension(0, 50))), 'c')
+    index.add('uri', Domain(dict(time=Dimension(0, 50, crs='indices')), mask='land'), 'd')
+    assert [value for domain, value in index.covering('uri', query)] == ['b']
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from owslib_esgfwps import Domain, Domains, ParameterError
+
+np = pytest.importorskip('numpy')
+
+from owslib_esgfwps.arrays import ArrayDomains  # noqa: E402
+
+
+def make_domains(n=18):
+    lat = np.arange(-90, -90 + 10 * n, 10)
+    return ArrayDomains(dict(lat=(lat, lat + 9.5, 0.5), time=(0, 11)), crs=dict(time='indices'), mask='land')
+
+
+def test_array_domains():
+    domains = make_domains()
+    assert isinstance(domains, Domains)
+    assert len(domains) == 18
+    d0 = domains[0]
+    assert isinstance(d0, Domain)
+    assert d0.dimensions['lat'].end == -80.5
+    assert isinstance(d0.dimensions['lat'].start, int)
+    assert d0.dimensions['time'].crs == 'indices'
+    assert d0.dimensions['lat'].crs == 'values'
+    assert domains[-1].dimensions['lat'].start == 80
+    assert domains[1].id != d0.id
+    assert d0.mask == 'land'
+    with pytest.raises(IndexError):
+        domains[18]
+
+
+def test_array_domains_json():
+    domains = make_domains()
+    assert domains.json == [domain.json for domain in domains]
+    assert json.loads(domains.value) == Domains(domains.domains).json
+    assert b''.join(domains.iterencode(chunk_size=100)) == domains.encoded
+    copy = ArrayDomains.from_json(domains.json)
+    assert copy.json == domains.json
+    assert Domains.from_json(domains.json).domains[3].id == domains[3].id
+
+
+def test_array_domains_object_columns():
+    data = [{'id': 'd0', 'time': {'start': '2000-01-01', 'end': None, 'crs': 'values'}},
+            {'id': 'd1', 'time': {'start': None, 'end': '2001-01-01', 'crs': 'values'}}]
+    domains = ArrayDomains.from_json(data)
+    assert domains[0].dimensions['time'].start == '2000-01-01'
+    assert domains[1].dimensions['time'].start is None
+    assert [domain.id for domain in domains] == ['d0', 'd1']
+    assert type(domains[0].id) is str
+    assert json.loads(domains.value) == Domains(domains.domains).json
+    assert b''.join(domains.iterencode(chunk_size=10)) == domains.encoded
+
+
+def test_array_domains_slice():
+    domains = make_domains()
+    part = domains[2:5]
+    assert len(part) == 3
+    assert part[0].json == domains[2].json
+
+
+def test_array_domains_read_only():
+    domains = make_domains()
+    start, end, step = domains.column('lat')
+    with pytest.raises(ValueError):
+        start[0] = 0
+
+
+def test_array_domains_structured():
+    array = np.zeros(4, dtype=[('time_start', 'i8'), ('time_end', 'i8'), ('lon_start', 'f8'), ('lon_end', 'f8'),
+                               ('lon_step', 'f8')])
+    array['time_start'] = np.arange(4) * 10
+    array['time_end'] = array['time_start'] + 9
+    array['lon_end'] = 360
+    array['lon_step'] = 2.5
+    domains = ArrayDomains.from_structured(array, crs=dict(time='indices'), ids=['t0', 't1', 't2', 't3'])
+    assert sorted(domains.dimension_names) == ['lon', 'time']
+    assert domains[3].dimensions['time'].start == 30
+    assert domains[3].dimensions['lon'].step == 2.5
+    assert domains[3].id == 't3'
+
+
+def test_array_domains_errors():
+    with pytest.raises(ParameterError):
+        ArrayDomains(dict(time=(np.arange(3), np.arange(4))))
+    with pytest.raises(ValueError):
+        ArrayDomains(dict(time=(0, 1)), crs='degrees')
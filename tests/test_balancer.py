@@ -0,0 +1,124 @@
+import pytest
+from owslib.wps import SYNC, ASYNC, WebProcessingService
+
+from owslib_esgfwps import Domain, Dimension, Variable
+from owslib_esgfwps.balancer import LoadBalancer, NoEndpointAvailable
+from owslib_esgfwps.batch import BatchSubmitter
+
+from .common import StubWPS
+
+
+def make_batch(n=1, m=10):
+    variables = [Variable(uri='http://data.test.org/tas_{}.nc'.format(i), var_name='tas') for i in range(n)]
+    domains = [Domain(dict(time=Dimension(i, i + 1, crs='indices'))) for i in range(m)]
+    return variables, domains
+
+
+def test_balancer_round_robin():
+    variables, domains = make_batch()
+    with StubWPS() as s1, StubWPS() as s2:
+        with LoadBalancer([s1.url, s2.url], token='TOKEN') as balancer:
+            for domain in domains:
+                execution = balancer.submit('pelican_subset', variables=variables, domains=[domain], mode=SYNC)
+                assert execution.isSucceeded()
+            stats = balancer.stats()
+        assert len(s1.executions()) == 5
+        assert len(s2.executions()) == 5
+        assert s1.requests[0][2]['COMPUTE-TOKEN'] == 'TOKEN'
+    assert [(s.requests, s.errors, s.in_flight, s.healthy) for s in stats] == [(5, 0, 0, True), (5, 0, 0, True)]
+    assert all(s.latency > 0 for s in stats)
+
+
+def test_balancer_least_loaded():
+    variables, domains = make_batch(1, 20)
+    with StubWPS(delay=0.2) as slow, StubWPS() as fast:
+        balancer = LoadBalancer([WebProcessingService(slow.url, skip_caps=True),
+                                 WebProcessingService(fast.url, skip_caps=True)])
+        jobs = BatchSubmitter(balancer, max_workers=4).submit('pelican_subset', variables, domains)
+        assert all(job.succeeded for job in jobs)
+        assert len(slow.executions()) < len(fast.executions())
+        assert len(slow.executions()) + len(fast.executions()) == 20
+
+
+def test_balancer_failover():
+    variables, domains = make_batch(1, 6)
+    with StubWPS(fail=100) as broken, StubWPS() as stub:
+        with LoadBalancer([broken.url, stub.url], max_failures=2, cooldown=60) as balancer:
+            for domain in domains:
+                assert balancer.submit('pelican_subset', variables=variables, domains=[domain], mode=SYNC).isSucceeded()
+            stats = balancer.stats()
+        # the broken endpoint is left out after two failures
+        assert len(broken.executions()) == 2
+        assert len(stub.executions()) == 6
+    assert stats[0].errors == 2
+    assert not stats[0].healthy
+    assert stats[0].error_rate > stats[1].error_rate
+    assert stats[1].healthy
+
+
+def test_balancer_exception_report():
+    variables, domains = make_batch(1, 4)
+    with StubWPS(exception_reports=100) as busy, StubWPS() as stub:
+        with LoadBalancer([busy.url, stub.url], max_failures=2, cooldown=60) as balancer:
+            for domain in domains:
+                assert balancer.submit('pelican_subset', variables=variables, domains=[domain], mode=SYNC).isSucceeded()
+            stats = balancer.stats()
+        assert len(busy.executions()) == 2
+        assert len(stub.executions()) == 4
+    assert stats[0].errors == 2
+    assert not stats[0].healthy
+    assert stats[0].in_flight == 0
+
+
+def test_balancer_exception_report_last_try():
+    variables, domains = make_batch(1, 1)
+    with StubWPS(exception_reports=1) as s1, StubWPS(exception_reports=1) as s2:
+        with LoadBalancer([s1.url, s2.url]) as balancer:
+            execution = balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC)
+            assert execution.status == 'Exception'
+            assert execution.errors[0].code == 'ServerBusy'
+            assert [s.errors for s in balancer.stats()] == [1, 1]
+        with LoadBalancer([s1.url], failover=False) as balancer:
+            assert balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC).isSucceeded()
+
+
+def test_balancer_all_failing():
+    variables, domains = make_batch(1, 1)
+    with StubWPS(fail=100) as s1, StubWPS(fail=100) as s2:
+        with LoadBalancer([s1.url, s2.url], max_failures=1, cooldown=60) as balancer:
+            with pytest.raises(Exception) as error:
+                balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC)
+            assert not isinstance(error.value, NoEndpointAvailable)
+            with pytest.raises(NoEndpointAvailable):
+                balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC)
+        assert len(s1.executions()) == 1
+        assert len(s2.executions()) == 1
+
+
+def test_balancer_no_failover():
+    variables, domains = make_batch(1, 1)
+    with StubWPS(fail=1) as s1, StubWPS() as s2:
+        with LoadBalancer([s1.url, s2.url], failover=False) as balancer:
+            with pytest.raises(Exception):
+                balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC)
+            assert balancer.submit('pelican_subset', variables=variables, domains=domains, mode=SYNC).isSucceeded()
+        assert len(s1.executions()) == 1
+        assert len(s2.executions()) == 1
+
+
+def test_balancer_async_in_flight():
+    variables, domains = make_batch(1, 3)
+    with StubWPS(polls=1) as s1, StubWPS(polls=1) as s2:
+        with LoadBalancer([s1.url, s2.url]) as balancer:
+            executions = [balancer.submit('pelican_subset', variables=variables, domains=[domain], mode=ASYNC,
+                                          output=[('output', False, 'application/json')]) for domain in domains]
+            assert sorted(s.in_flight for s in balancer.stats()) == [1, 2]
+            for execution in executions:
+                while not execution.isComplete():
+                    execution.checkStatus(sleepSecs=0)
+            assert [s.in_flight for s in balancer.stats()] == [0, 0]
+
+
+def test_balancer_no_endpoints():
+    with pytest.raises(ValueError):
+        LoadBalancer([])
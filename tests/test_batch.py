@@ -0,0 +1,68 @@
+import time
+
+from owslib.wps import WebProcessingService
+
+from owslib_esgfwps import Domain, Dimension, Variable, Operation
+from owslib_esgfwps.batch import BatchSubmitter, RateLimiter, fan_out
+
+from .common import StubWPS
+
+
+def make_batch(n_vars=2, n_domains=3):
+    variables = [Variable(uri='http://data.test.org/tas{}.nc'.format(i), var_name='tas') for i in range(n_vars)]
+    domains = [Domain(dict(time=Dimension(i, i + 1, crs='indices'))) for i in range(n_domains)]
+    return variables, domains
+
+
+def test_fan_out():
+    variables, domains = make_batch()
+    jobs = fan_out(variables, domains, [Operation('CDAT.subset', axes='time')])
+    assert len(jobs) == 6
+    assert jobs[1].variable is variables[0]
+    assert jobs[1].domain is domains[1]
+    assert jobs[1].operation.domain == domains[1].id
+    assert jobs[1].operation.input == [variables[0].name]
+    assert [key for key, value in jobs[1].inputs] == ['domain', 'variable', 'operation']
+
+
+def test_fan_out_keys():
+    variables, domains = make_batch(1, 2)
+    # the generated names of unnamed templates are not part of the keys
+    keys = [fan_out(variables, domains, [Operation(axes=['time'])])[0].key('p') for _ in range(2)]
+    assert keys[0] == keys[1]
+    jobs = [fan_out(variables, domains, [Operation('CDAT.max', axes=['time'])])[0] for _ in range(2)]
+    assert jobs[0].operation.name == 'CDAT.max'
+    assert jobs[0].key('p') == jobs[1].key('p')
+    assert jobs[0].key('p') != keys[0]
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.09
+
+
+def test_batch_submit():
+    variables, domains = make_batch()
+    with StubWPS() as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        jobs = BatchSubmitter(wps, max_workers=3).submit('pelican_subset', variables, domains)
+        assert len(stub.executions()) == 6
+    assert [job.index for job in jobs] == list(range(6))
+    assert all(job.succeeded for job in jobs)
+    assert jobs[0].outputs.outputs[0].mimetype == 'application/x-netcdf'
+    assert domains[2].id in ''.join(stub.executions())
+
+
+def test_batch_retries():
+    variables, domains = make_batch(1, 2)
+    with StubWPS(fail=3) as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        jobs = BatchSubmitter(wps, max_workers=1, retries=1, backoff=0).submit('pelican_subset', variables, domains)
+    assert not jobs[0].succeeded
+    assert jobs[0].attempts == 2
+    assert jobs[0].error is not None
+    assert jobs[1].succeeded
+    assert jobs[1].attempts == 2
@@ -0,0 +1,107 @@
+import json
+import math
+import pickle
+
+from owslib_esgfwps import Domain, Domains, Dimension, Operation, Operations, Variable, Variables
+from owslib_esgfwps import bulk
+
+
+def make_record(i):
+    domain = Domain(dict(time=Dimension(i, i + 10, crs='indices'), lat=Dimension(-90.0, 90.0, 0.5)), id='d{}'.format(i))
+    variable = Variable(uri='http://data.test.org/tas_{}.nc'.format(i % 3), id='tas|v{}'.format(i))
+    return dict(
+        domain=Domains([domain]).json,
+        # documents may also be stored as the JSON string of the WPS input
+        variable=Variables([variable]).value,
+        operation=Operations([Operation('CDAT.subset', domain=domain, input=[variable])]).json,
+        outputs=[{'uri': 'http://test.org/output_{}.nc'.format(i), 'mime-type': 'application/x-netcdf'}])
+
+
+def write(path, n, extra=()):
+    with open(str(path), 'w') as f:
+        for i in range(n):
+            f.write(json.dumps(make_record(i)) + '\n')
+            if i == 2:
+                f.writelines(extra)
+    return str(path)
+
+
+def test_summarize():
+    summary = bulk.summarize([json.dumps(make_record(i)) for i in range(4)])
+    assert summary.records == 4
+    assert summary.errors == []
+    assert list(summary.variables['record']) == [0, 1, 2, 3]
+    assert summary.variables['uri'][:2] == ['http://data.test.org/tas_0.nc', 'http://data.test.org/tas_1.nc']
+    assert summary.variables['var_name'] == ['tas'] * 4
+    assert summary.domains['id'] == ['d0', 'd1', 'd2', 'd3']
+    assert list(summary.dimensions.rows())[:2] == [
+        (0, 'd0', 'time', 0, 10, 1, 'indices', None, None), (0, 'd0', 'lat', -90.0, 90.0, 0.5, 'values', None, None)]
+    assert summary.dimensions['start'].typecode == 'd'
+    # repeated strings are stored once
+    assert summary.variables['uri'].values == ['http://data.test.org/tas_{}.nc'.format(i) for i in range(3)]
+    assert list(summary.variables['uri'].codes) == [0, 1, 2, 0]
+    assert summary.dimensions['crs'].values == ['indices', 'values']
+    assert list(summary.operations.rows())[3] == (3, 'CDAT.subset', 'd3')
+    assert summary.outputs['mimetype'] == ['application/x-netcdf'] * 4
+    assert len(summary.dimensions) == 8
+
+
+def test_summarize_bounds():
+    domain = {'id': 'd0', 'time': {'start': '2000-01-01', 'end': None, 'crs': 'values'}, 'lat': {'start': 0}}
+    summary = bulk.summarize([json.dumps({'domain': [domain]})])
+    time, lat = list(summary.dimensions.rows())
+    assert math.isnan(time[3]) and math.isnan(time[4])
+    assert time[7:] == ('2000-01-01', None)
+    assert lat[3] == 0 and math.isnan(lat[4]) and lat[7:] == (None, None)
+
+
+def test_codes():
+    codes = bulk.Codes(['a', 'b', 'a'])
+    codes.extend(bulk.Codes(['b', 'c']))
+    assert list(codes.codes) == [0, 1, 0, 1, 2]
+    assert codes == ['a', 'b', 'a', 'b', 'c']
+    assert codes[1:3] == ['b', 'a']
+    loaded = pickle.loads(pickle.dumps(codes))
+    loaded.append('c')
+    assert list(loaded.codes)[-1] == 2
+
+
+def test_summarize_errors():
+    lines = ['{"domain": [{"id": "d0"}]}\n', '\n', 'not json\n', '[1]\n', '{"variable": [{"uri": "x"}]}\n',
+             '{"operation": [{"name": "CDAT.max"}]}\n']
+    summary = bulk.summarize(lines)
+    assert summary.records == 5
+    assert [position for position, message in summary.errors] == [28, 37, 41]
+    assert list(summary.operations['record']) == [4]
+    assert summary.domains['id'] == ['d0']
+
+
+def test_load(tmp_path):
+    path = write(tmp_path / 'archive.jsonl', 50, extra=['\n', '{"domain": 1}\n'])
+    summary = bulk.load(path, processes=1)
+    assert summary.records == 51
+    assert len(summary.variables) == 50
+    assert len(summary.errors) == 1
+    assert list(summary.variables['record'][:4]) == [0, 1, 2, 4]
+
+
+def test_load_chunks(tmp_path):
+    path = write(tmp_path / 'archive.jsonl', 20, extra=['{"domain": 1}\n'])
+    expected = bulk.load(path, processes=1)
+    # ranges which start anywhere in a line give the same summary
+    for chunk_size in [1, 7, 100, 613, 1000, 4096]:
+        summary = bulk.load(path, processes=1, chunk_size=chunk_size)
+        assert summary.records == expected.records
+        assert summary.errors == expected.errors
+        for name, table in expected.tables.items():
+            assert summary.tables[name].columns == table.columns
+
+
+def test_load_processes(tmp_path):
+    path = write(tmp_path / 'archive.jsonl', 200)
+    expected = bulk.load(path, processes=1)
+    summary = bulk.load(path, processes=2, chunk_size=4096)
+    assert len(bulk.ranges(path, 4096)) > 2
+    assert summary.records == 200
+    for name, table in expected.tables.items():
+        assert summary.tables[name].columns == table.columns
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+
+from owslib.wps import WebProcessingService
+
+from owslib_esgfwps.cache import DocumentCache
+from owslib_esgfwps.client import Client
+
+from .common import StubWPS
+
+
+def test_cache_memory():
+    cache = DocumentCache(ttl=60)
+    with StubWPS() as stub:
+        for _ in range(3):
+            wps = cache.capabilities(WebProcessingService(url=stub.url, skip_caps=True))
+            assert wps.processes[0].identifier == 'pelican_subset'
+            process = cache.describeprocess(wps, 'pelican_subset')
+            assert process.identifier == 'pelican_subset'
+        assert len(stub.requests) == 2
+    assert cache.cache_info() == (4, 2, 0, 2)
+
+
+def test_cache_lru():
+    cache = DocumentCache(maxsize=1, ttl=60)
+    with StubWPS() as stub:
+        wps = cache.capabilities(WebProcessingService(url=stub.url, skip_caps=True))
+        cache.describeprocess(wps, 'pelican_subset')
+        cache.capabilities(wps)
+        assert len(stub.requests) == 3
+    assert cache.cache_info().currsize == 1
+
+
+def test_cache_revalidate():
+    cache = DocumentCache(ttl=0.05)
+    with StubWPS() as stub:
+        wps = cache.capabilities(WebProcessingService(url=stub.url, skip_caps=True))
+        time.sleep(0.1)
+        cache.capabilities(wps)
+        assert stub.requests[1][2]['If-None-Match'] == '"capabilities"'
+        assert wps.processes[0].identifier == 'pelican_subset'
+    assert cache.cache_info().revalidated == 1
+
+
+def test_cache_disk(tmpdir):
+    with StubWPS() as stub:
+        Client(stub.url, skip_caps=False, cache=DocumentCache(path=str(tmpdir))).close()
+        # new process
+        with Client(stub.url, skip_caps=False, cache=DocumentCache(path=str(tmpdir))) as client:
+            assert client.wps.processes[0].identifier == 'pelican_subset'
+            assert client.cache.cache_info().hits == 1
+        assert len(stub.requests) == 1
+    cache = DocumentCache(path=str(tmpdir))
+    cache.clear()
+    assert tmpdir.listdir() == []
+
+
+def test_cache_invalid_file(tmpdir, monkeypatch):
+    with StubWPS() as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        cache = DocumentCache(path=str(tmpdir))
+        cache.capabilities(wps)
+        filename, = tmpdir.listdir()
+        # files without the expected keys are misses
+        for data in [{'etag': 'x'}, [1, 2], {'content': 1}]:
+            filename.write(json.dumps(data))
+            DocumentCache(path=str(tmpdir)).capabilities(wps)
+        assert len(stub.requests) == 4
+        assert DocumentCache(path=str(tmpdir)).get(wps.url, dict(service='WPS', request='GetCapabilities',
+                                                                 version=wps.version)).startswith(b'<?xml')
+        replaced = []
+        real_replace = os.replace
+        monkeypatch.setattr(os, 'replace', lambda src, dst: replaced.append(src) or real_replace(src, dst))
+        cache.clear()
+        cache.capabilities(wps)
+    assert '.{}.{}.'.format(os.getpid(), threading.get_ident()) in os.path.basename(replaced[0])
@@ -0,0 +1,65 @@
+from owslib.wps import WebProcessingService, SYNC, ASYNC
+
+from owslib_esgfwps import Domain, Domains, Dimension, Variable, Variables
+from owslib_esgfwps.batch import BatchSubmitter
+from owslib_esgfwps.client import Client
+
+from .common import StubWPS
+
+
+def inputs():
+    d0 = Domain(dict(time=Dimension(0, 1, crs='indices')))
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    return [('domain', Domains([d0])), ('variable', Variables([v0]))]
+
+
+def test_client_keep_alive():
+    with StubWPS() as stub:
+        with Client(stub.url, token='TOKEN', skip_caps=False) as client:
+            assert client.wps.processes[0].identifier == 'pelican_subset'
+            for _ in range(5):
+                assert client.execute('pelican_subset', inputs(), mode=SYNC).isSucceeded()
+        assert stub.connections == 1
+        assert all(headers['COMPUTE-TOKEN'] == 'TOKEN' for method, path, headers, body in stub.requests)
+        # other WPS instances are not affected
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        wps.execute('pelican_subset', inputs(), mode=SYNC)
+        wps.execute('pelican_subset', inputs(), mode=SYNC)
+        assert stub.connections == 3
+
+
+def test_client_batch():
+    variables = [Variable(uri='http://data.test.org/tas.nc', var_name='tas')]
+    domains = [Domain(dict(time=Dimension(i, i + 1, crs='indices'))) for i in range(8)]
+    with StubWPS() as stub:
+        with Client(stub.url, token='TOKEN', pool_maxsize=2) as client:
+            jobs = BatchSubmitter(client.wps, max_workers=2).submit('pelican_subset', variables, domains)
+        assert all(job.succeeded for job in jobs)
+        assert stub.connections <= 2
+
+
+def test_client_other_wps():
+    with StubWPS() as stub:
+        with Client(stub.url, token='TOKEN') as client, Client(stub.url, token='OTHER') as other:
+            assert client.execute('pelican_subset', inputs(), mode=SYNC).isSucceeded()
+            # an open client does not change the requests of other WPS instances to its host
+            wps = WebProcessingService(url=stub.url, skip_caps=True)
+            wps.execute('pelican_subset', inputs(), mode=SYNC)
+            assert other.execute('pelican_subset', inputs(), mode=SYNC).isSucceeded()
+            assert client.execute('pelican_subset', inputs(), mode=SYNC).isSucceeded()
+        tokens = [headers.get('COMPUTE-TOKEN') for method, path, headers, body in stub.requests]
+        assert tokens == ['TOKEN', None, 'OTHER', 'TOKEN']
+        assert stub.connections == 3
+
+
+def test_client_async_status():
+    with StubWPS(polls=2) as stub:
+        with Client(stub.url, token='TOKEN') as client:
+            execution = client.execute('pelican_subset', inputs(), mode=ASYNC,
+                                       output=[('output', False, 'application/json')])
+            while not execution.isComplete():
+                execution.checkStatus(sleepSecs=0)
+            assert execution.isSucceeded()
+        assert len(stub.requests) > 2
+        assert all(headers['COMPUTE-TOKEN'] == 'TOKEN' for method, path, headers, body in stub.requests)
+        assert stub.connections == 1
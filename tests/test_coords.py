@@ -0,0 +1,80 @@
+import pytest
+
+from owslib_esgfwps import Domain, Dimension, ParameterError, Variable
+from owslib_esgfwps.tiling import tile_domain
+
+np = pytest.importorskip('numpy')
+
+from owslib_esgfwps import coords  # noqa: E402
+from owslib_esgfwps.coords import CoordinateIndex, IndexCache  # noqa: E402
+
+LAT = np.arange(-89.75, 90, 0.5)
+
+
+def test_locate():
+    index = CoordinateIndex(LAT)
+    assert index.locate(0, 45) == (180, 269)
+    assert index.locate(-89.75, 89.75) == (0, 359)
+    assert index.locate(-100, 100) == (0, 359)
+    with pytest.raises(ParameterError):
+        index.locate(0.1, 0.2)
+    assert index.locate(None, -89) == (0, 1)
+    assert index.locate(45, 0) == (180, 269)
+
+
+def test_locate_descending():
+    index = CoordinateIndex(LAT[::-1])
+    assert index.descending
+    assert index.locate(0, 45) == (90, 179)
+    assert index.values[0] == 89.75
+
+
+def test_dimension_conversion():
+    index = CoordinateIndex(LAT)
+    dim = index.to_indices(Dimension(-0.25, 0.25, 2))
+    assert dim.json == dict(start=179, end=180, step=2, crs='indices')
+    assert index.to_values(dim).json == dict(start=-0.25, end=0.25, step=2, crs='values')
+    with pytest.raises(ParameterError):
+        index.to_values(Dimension(0, 360, crs='indices'))
+
+
+def test_invalid_coordinates():
+    with pytest.raises(ParameterError):
+        CoordinateIndex([])
+    with pytest.raises(ParameterError):
+        CoordinateIndex([0, 2, 1])
+
+
+def test_index_cache():
+    loaded = []
+
+    def loader(uri, name):
+        loaded.append((uri, name))
+        return np.arange(365)
+
+    cache = IndexCache(loader=loader)
+    tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    cache.register(tas.uri, 'lat', LAT)
+    d0 = Domain(dict(lat=Dimension(0, 45), time=Dimension(31, 58.5), lon=Dimension(0, 10, crs='indices')),
+                mask='land')
+    d1 = cache.to_indices(tas, d0)
+    cache.to_indices(tas, d0)
+    assert loaded == [(tas.uri, 'time')]
+    assert d1.id != d0.id
+    assert d1.mask == 'land'
+    assert d1.dimensions['lat'].json == dict(start=180, end=269, step=1, crs='indices')
+    assert d1.dimensions['time'].json == dict(start=31, end=58, step=1, crs='indices')
+    assert d1.dimensions['lon'].json == d0.dimensions['lon'].json
+    assert len(tile_domain(d1, chunks=dict(lat=30))) == 3
+    with pytest.raises(ParameterError):
+        cache.to_indices(tas)
+
+
+def test_default_cache():
+    tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas', domain=Domain(dict(lat=Dimension(0, 45))))
+    coords.register(tas.uri, 'lat', LAT)
+    try:
+        assert (tas.uri, 'lat') in coords._cache
+        assert coords.to_indices(tas).dimensions['lat'].start == 180
+    finally:
+        coords.clear()
@@ -0,0 +1,34 @@
+import pytest
+
+from owslib_esgfwps import decoder
+
+
+def setup_function(function):
+    decoder.use_backend()
+    decoder.reset_decode_info()
+
+
+def teardown_function(function):
+    decoder.use_backend()
+
+
+@pytest.mark.parametrize('name', list(decoder.BACKENDS))
+def test_loads_json(name):
+    decoder.use_backend(name)
+    assert decoder.backend() == name
+    assert decoder.loads('[{"id": "d0", "time": {"start": 0}}]') == [{'id': 'd0', 'time': {'start': 0}}]
+    assert decoder.loads(b'{"uri": "http://test.org/output.nc"}') == {'uri': 'http://test.org/output.nc'}
+    assert decoder.decode_info() == (name, 2, 0)
+
+
+def test_loads_yaml_fallback():
+    assert decoder.loads("- {id: d0}") == [{'id': 'd0'}]
+    assert decoder.decode_info().yaml == 1
+    decoder.use_backend('json', fallback=False)
+    with pytest.raises(ValueError):
+        decoder.loads("- {id: d0}")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        decoder.use_backend('simplejson-fast')
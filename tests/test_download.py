@@ -0,0 +1,112 @@
+import json
+import os
+
+from owslib_esgfwps import Output, Outputs
+from owslib_esgfwps.download import fetch, filename, unique_filenames
+
+from .common import StubWPS
+
+CONTENT = bytes(bytearray(range(256))) * 400
+
+
+def test_filename():
+    assert filename('http://test.org/outputs/tas.nc?token=1') == 'tas.nc'
+    assert unique_filenames(['http://a.org/tas.nc', 'http://b.org/tas.nc', 'http://a.org/tas-1.nc',
+                             'http://c.org/tas.nc', 'http://a.org/']) == [
+        'tas.nc', 'tas-2.nc', 'tas-1.nc', 'tas-3.nc', 'output']
+
+
+def test_fetch_stream(tmpdir):
+    with StubWPS(files={'tas.nc': CONTENT}) as stub:
+        result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir), chunk_size=1000)
+    assert result.path == str(tmpdir.join('tas.nc'))
+    assert result.size == len(CONTENT)
+    assert result.parts == 1
+    assert result.throughput > 0
+    assert tmpdir.join('tas.nc').read_binary() == CONTENT
+
+
+def test_fetch_parallel(tmpdir):
+    with StubWPS(files={'tas.nc': CONTENT}) as stub:
+        result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir), part_size=10000, parallel=3)
+        ranges = [headers.get('Range') for method, path, headers, body in stub.requests if method == 'GET']
+    assert result.parts == 11
+    assert len([r for r in ranges if r]) == 11
+    assert tmpdir.join('tas.nc').read_binary() == CONTENT
+    assert sorted(os.listdir(str(tmpdir))) == ['tas.nc']
+
+
+def write_stream(tmpdir, etag='"{}"'.format(len(CONTENT))):
+    tmpdir.join('tas.nc.part').write_binary(CONTENT[:5000])
+    tmpdir.join('tas.nc.part.json').write(json.dumps(dict(size=len(CONTENT), etag=etag)))
+
+
+def test_fetch_resume(tmpdir):
+    write_stream(tmpdir)
+    with StubWPS(files={'tas.nc': CONTENT}) as stub:
+        result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir))
+        assert stub.requests[-1][2]['If-Range'] == '"{}"'.format(len(CONTENT))
+        # already complete
+        assert fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir), skip_existing=True).size == 0
+        assert fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir)).size == len(CONTENT)
+    assert result.size == len(CONTENT) - 5000
+    assert tmpdir.join('tas.nc').read_binary() == CONTENT
+    assert sorted(os.listdir(str(tmpdir))) == ['tas.nc']
+
+
+def test_fetch_restart_stream(tmpdir):
+    # a part of another version of the file, or without the ETag it was written with, is not resumed
+    for etag in ['"changed"', None]:
+        write_stream(tmpdir, etag)
+        if etag is None:
+            tmpdir.join('tas.nc.part.json').remove()
+        with StubWPS(files={'tas.nc': CONTENT}) as stub:
+            result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir))
+            assert 'Range' not in stub.requests[-1][2]
+        assert result.size == len(CONTENT)
+        assert tmpdir.join('tas.nc').read_binary() == CONTENT
+
+
+def write_parts(tmpdir, **state):
+    tmpdir.join('tas.nc.part').write_binary(CONTENT[:10000] + b'\0' * (len(CONTENT) - 10000))
+    data = dict(size=len(CONTENT), part_size=10000, etag='"{}"'.format(len(CONTENT)), done=[0])
+    data.update(state)
+    tmpdir.join('tas.nc.part.json').write(json.dumps(data))
+
+
+def test_fetch_resume_parts(tmpdir):
+    write_parts(tmpdir)
+    with StubWPS(files={'tas.nc': CONTENT}) as stub:
+        result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir), part_size=10000)
+    assert result.parts == 10
+    assert tmpdir.join('tas.nc').read_binary() == CONTENT
+
+
+def test_fetch_restart_parts(tmpdir):
+    # the parts written before are not used if the part size or the file changed
+    for state in [dict(part_size=5000), dict(etag='"changed"'), dict(size=1000), dict(done=None)]:
+        write_parts(tmpdir, **state)
+        with StubWPS(files={'tas.nc': CONTENT}) as stub:
+            result = fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir), part_size=10000)
+        assert result.parts == 11
+        assert tmpdir.join('tas.nc').read_binary() == CONTENT
+        tmpdir.join('tas.nc').remove()
+
+
+def test_outputs_fetch_all(tmpdir):
+    files = {'a.nc': CONTENT[:100], 'b.nc': CONTENT[:200]}
+    with StubWPS(files=files) as stub:
+        outputs = Outputs([Output(uri=stub.base_url + '/files/' + name) for name in sorted(files)])
+        results = outputs.fetch_all(str(tmpdir))
+    assert [result.size for result in results] == [100, 200]
+    assert tmpdir.join('b.nc').read_binary() == CONTENT[:200]
+
+
+def test_outputs_fetch_all_same_name(tmpdir):
+    files = {'a.nc': CONTENT[:100], 'b.nc': CONTENT[:200]}
+    with StubWPS(files=files) as stub:
+        outputs = Outputs([Output(uri=stub.base_url + '/files/' + name + '?node=' + str(i))
+                           for i, name in enumerate(['a.nc', 'b.nc', 'a.nc'])])
+        results = outputs.fetch_all(str(tmpdir))
+    assert [os.path.basename(result.path) for result in results] == ['a.nc', 'b.nc', 'a-1.nc']
+    assert tmpdir.join('a-1.nc').read_binary() == CONTENT[:100]
@@ -4,12 +4,21 @@ See compatibility examples:
 https://github.com/ESGF/esgf-compute-api/blob/devel/docs/source/cwt.compat.rst
 """
 
+import io
+import json
+import pickle
+
+import pytest
+
 from owslib_esgfwps import (
     Output,
     Outputs,
+    LazyOutputs,
     Domain,
     Domains,
     Dimension,
+    FrozenDimension,
+    FrozenDomain,
     Variable,
     Variables,
     Operation,
@@ -178,3 +187,147 @@ def test_operations():
     assert Operations.from_json(operations.json).operations[0].name == operation.name
     assert operation.name in str(operations)
     assert 'subset' in operations.value
+
+
+def test_value_cache():
+    dim = Dimension(0, 1, crs='indices')
+    d0 = Domain(dict(time=dim))
+    domains = Domains([d0])
+    value = domains.value
+    assert domains.value is value
+    assert domains.cache_info().hits == 1
+    assert domains.cache_info().misses == 1
+    assert domains.encoded == value.encode('utf-8')
+    # member changed
+    dim.crs = 'values'
+    assert '"crs": "values"' in domains.value
+    d0.dimensions['lat'] = Dimension(40, 60)
+    assert 'lat' in domains.value
+    # collection changed
+    domains.domains.append(Domain(id='d1'))
+    assert 'd1' in domains.value
+    assert domains.cache_info().misses == 4
+
+
+def test_pickle():
+    dim = Dimension(0, 1, crs='indices')
+    shared = Domain(dict(time=dim))
+    domains = Domains([shared, Domain(dict(lat=Dimension(-90, 90)), mask='land')])
+    variables = Variables([Variable(uri='http://data.test.org/tas.nc', var_name='tas', domain=shared)])
+    value, variable_id = domains.value, variables.variables[0].id
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded_domains, loaded_variables = pickle.loads(pickle.dumps((domains, variables), protocol))
+        assert loaded_domains.value == value
+        assert loaded_variables.variables[0].id == variable_id
+        assert loaded_variables.variables[0].domain is loaded_domains.domains[0]
+        # the loaded objects are tracked by their own containers
+        loaded_domains.domains[0].dimensions['time'].crs = 'values'
+        assert loaded_domains.value != value
+        assert dim.crs == 'indices'
+        loaded_domains.domains.append(Domain(id='d1'))
+        assert 'd1' in loaded_domains.value
+    frozen = shared.freeze()
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+def test_collections_copy_items():
+    items = [Domain(id='d0')]
+    domains = Domains(items)
+    items.append(Domain(id='d1'))
+    assert len(domains) == 1
+
+
+def test_outputs_from_owslib():
+    class ProcessOutput(object):
+        identifier = 'output'
+        data = ['[{"uri": "http://test.org/output.nc", "id": "o0", "mime-type": "application/x-netcdf"}]']
+
+    outputs = Outputs.from_owslib([ProcessOutput()])
+    assert outputs.outputs[0].uri == 'http://test.org/output.nc'
+    assert outputs.outputs[0].mimetype == 'application/x-netcdf'
+
+
+def test_slots():
+    dim = Dimension(0, 1, crs='indices')
+    assert not hasattr(dim, '__dict__')
+    assert not hasattr(Domain(), '__dict__')
+    assert not hasattr(Variable(uri='http://data.test.org/tas.nc', var_name='tas'), '__dict__')
+    assert not hasattr(Output(uri='http://test.org/output.nc'), '__dict__')
+    assert not hasattr(Operation('subset'), '__dict__')
+
+
+def test_frozen_domain():
+    d0 = Domain(dict(time=Dimension(0, 1, crs='indices')), id='d0')
+    f0 = d0.freeze()
+    assert isinstance(f0, FrozenDomain)
+    assert isinstance(f0.dimensions['time'], FrozenDimension)
+    assert f0.json == d0.json
+    assert f0 == FrozenDomain.from_json(d0.json)
+    assert len({f0, FrozenDomain.from_json(d0.json)}) == 1
+    with pytest.raises(AttributeError):
+        f0.dimensions['time'].crs = 'values'
+    with pytest.raises(TypeError):
+        f0.dimensions['lat'] = Dimension(40, 60)
+    assert Dimension(0, 1).freeze() == FrozenDimension(0, 1)
+    assert Dimension(0, 1).freeze() != FrozenDimension(0, 2)
+
+
+def test_frozen_domain_object_mask():
+    mask = {'uri': 'http://data.test.org/sftlf.nc', 'var_name': 'sftlf', 'operation': 'var_name>50'}
+    f0 = Domain(dict(time=Dimension(0, 1, crs='indices')), mask=mask, id='d0').freeze()
+    f1 = Domain(dict(time=Dimension(0, 1, crs='indices')), mask=dict(reversed(list(mask.items()))), id='d0').freeze()
+    assert hash(f0) == hash(f1)
+    assert f0 == f1
+    assert f0 != Domain(dict(time=Dimension(0, 1, crs='indices')), mask='land', id='d0').freeze()
+
+
+def test_outputs_sequence():
+    outputs = Outputs([
+        Output(uri='http://test.org/a.nc', mimetype='application/x-netcdf', domain='d0'),
+        Output(uri='http://test.org/b.json', mimetype='application/json')])
+    assert len(outputs) == 2
+    assert outputs[1].uri == 'http://test.org/b.json'
+    assert [output.uri for output in outputs[:1]] == ['http://test.org/a.nc']
+    assert len(outputs.filter(mimetype='application/json')) == 1
+    assert outputs.filter(domain='d0')[0].uri == 'http://test.org/a.nc'
+
+
+def test_lazy_outputs():
+    documents = [{"uri": "http://test.org/output{}.nc".format(i), "id": "o{}".format(i),
+                  "domain": {"id": "d{}".format(i % 2)},
+                  "mime-type": "application/x-netcdf" if i % 3 else "application/json"} for i in range(10)]
+
+    class ProcessOutput(object):
+        identifier = 'output'
+        data = [json.dumps(documents)]
+
+    outputs = Outputs.from_owslib([ProcessOutput()], lazy=True)
+    assert isinstance(outputs, LazyOutputs)
+    assert len(outputs) == 10
+    assert outputs._items.count(None) == 10
+    first = outputs[0]
+    assert first.uri == 'http://test.org/output0.nc'
+    assert outputs._items.count(None) == 9
+    assert outputs[:2][0] is first
+    sub = outputs[2:8:2]
+    assert [output.id for output in sub] == ['o2', 'o4', 'o6']
+    json_outputs = outputs.filter(mimetype='application/json')
+    assert [output.id for output in json_outputs] == ['o0', 'o3', 'o6', 'o9']
+    assert json_outputs.filter(domain='d0')[1].id == 'o6'
+    assert outputs._items.count(None) == 4
+    assert Outputs.from_json(outputs.json).outputs[9].uri == 'http://test.org/output9.nc'
+
+
+def test_iterencode():
+    domains = Domains([Domain(dict(time=Dimension(i, i + 1, crs='indices'))) for i in range(100)])
+    chunks = list(domains.iterencode(chunk_size=1000))
+    assert len(chunks) > 1
+    assert b''.join(chunks) == domains.encoded
+    # served from cache
+    assert b''.join(domains.iterencode(chunk_size=1000)) == domains.encoded
+    assert b''.join(Variables().iterencode()) == b'[]'
+    fp = io.BytesIO()
+    ops = Operations([Operation('subset', domain='d0', input=['tas'])])
+    ops.dump(fp)
+    assert fp.getvalue().decode('utf-8') == ops.value
+    assert len(ops) == 1
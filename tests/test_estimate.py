@@ -0,0 +1,70 @@
+import pytest
+
+from owslib.wps import ASYNC, SYNC
+
+from owslib_esgfwps import Domain, Dimension, Operation, ParameterError, Variable
+from owslib_esgfwps.estimate import Estimator
+
+np = pytest.importorskip('numpy')
+
+from owslib_esgfwps.coords import IndexCache  # noqa: E402
+
+TAS = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+
+
+def make_estimator():
+    indexes = IndexCache(loader=lambda uri, name: np.arange(-89.5, 90, 1.0) if name == 'lat' else np.arange(288))
+    estimator = Estimator(indexes=indexes)
+    estimator.add(TAS.uri, [('time', 3650), ('lat', 180), ('lon', 288)], itemsize=8)
+    return estimator
+
+
+def test_estimate():
+    estimator = make_estimator()
+    d0 = Domain(dict(time=Dimension(0, 364, crs='indices'), lat=Dimension(0, 90)))
+    estimate = estimator.estimate(TAS, d0)
+    assert list(estimate.shape.values()) == [365, 90, 288]
+    assert estimate.input_elements == 365 * 90 * 288
+    assert estimate.input_bytes == estimate.input_elements * 8
+    assert estimate.output_bytes == estimate.input_bytes
+
+    estimate = estimator.estimate(TAS, d0, Operation('CDAT.average', axes='time|lon'))
+    assert list(estimate.output_shape.values()) == [1, 90, 1]
+    assert estimate.output_bytes == 90 * 8
+    estimate = estimator.estimate(TAS, d0, Operation('CDAT.average', axes='time', bins=['a', 'b', 'c']))
+    assert estimate.output_elements == 3 * 90 * 288
+
+
+def test_estimate_clip_and_step():
+    estimator = make_estimator()
+    d0 = Domain(dict(time=Dimension(3000, 5000, 10, crs='indices')))
+    assert estimator.estimate(TAS, d0).shape['time'] == 65
+    assert estimator.estimate(TAS).input_elements == 3650 * 180 * 288
+
+
+def test_estimate_errors():
+    estimator = make_estimator()
+    with pytest.raises(ParameterError):
+        estimator.estimate(Variable(uri='http://data.test.org/pr.nc', var_name='pr'))
+    with pytest.raises(ParameterError):
+        estimator.estimate(TAS, operation=Operation('CDAT.average', axes='height'))
+
+
+def test_mode_and_check():
+    estimator = make_estimator()
+    small = Domain(dict(time=Dimension(0, 0, crs='indices')))
+    assert estimator.mode(TAS, small, sync_bytes=10 ** 6) == SYNC
+    assert estimator.mode(TAS, sync_bytes=10 ** 6) == ASYNC
+    assert estimator.check(TAS, small, max_bytes=10 ** 6).input_bytes == 180 * 288 * 8
+    with pytest.raises(ParameterError):
+        estimator.check(TAS, max_bytes=10 ** 6)
+
+
+def test_split():
+    estimator = make_estimator()
+    d0 = Domain(dict(time=Dimension(0, 99, crs='indices'), lat=Dimension(0, 90)), mask='land')
+    tiles = estimator.split(TAS, d0, max_bytes=10 ** 6)
+    assert all(estimator.estimate(TAS, tile).input_bytes <= 10 ** 6 for tile in tiles)
+    assert sum(estimator.estimate(TAS, tile).input_elements for tile in tiles) == \
+        estimator.estimate(TAS, d0).input_elements
+    assert all(tile.mask == 'land' for tile in tiles)
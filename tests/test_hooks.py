@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from owslib.wps import WebProcessingService, SYNC, ASYNC
+
+from owslib_esgfwps import Domain, Domains, Dimension, Variable, Variables, Outputs, hooks
+from owslib_esgfwps.batch import BatchSubmitter
+from owslib_esgfwps.client import Client
+from owslib_esgfwps.download import fetch
+from owslib_esgfwps.monitor import ExecutionMonitor
+
+from .common import StubWPS
+
+
+@pytest.fixture
+def events():
+    events = []
+    hooks.subscribe(events.append)
+    yield events
+    hooks.unsubscribe(events.append)
+
+
+def inputs(i=0):
+    d0 = Domain(dict(time=Dimension(i, i + 1, crs='indices')))
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    return [('domain', Domains([d0])), ('variable', Variables([v0]))]
+
+
+def phases(events, phase):
+    return [event for event in events if event.phase == phase]
+
+
+def test_encode_event(events):
+    domains = inputs()[0][1]
+    domains.value
+    domains.value
+    encode = phases(events, 'encode')
+    assert len(encode) == 1
+    assert encode[0].tags == dict(parameter='Domains')
+    assert encode[0].size == len(domains.value)
+    assert encode[0].seconds >= 0
+
+
+def test_no_subscribers():
+    hooks.emit('encode', 1.0)
+    with hooks.timed('execute') as event:
+        event.size = 1
+
+
+def test_failing_subscriber(events):
+    def fail(event):
+        raise RuntimeError()
+
+    hooks.subscribe(fail)
+    try:
+        hooks.emit('encode', 1.0)
+    finally:
+        hooks.unsubscribe(fail)
+    assert len(events) == 1
+
+
+def test_timed_error(events):
+    with pytest.raises(KeyError):
+        with hooks.timed('execute', identifier='subset'):
+            raise KeyError()
+    assert events[0].tags == dict(identifier='subset', error='KeyError')
+
+
+def test_request_events(events, tmpdir):
+    with StubWPS(files={'tas.nc': b'x' * 1000}) as stub:
+        with Client(stub.url) as client:
+            execution = client.execute('pelican_subset', inputs(), mode=SYNC)
+            Outputs.from_owslib(execution.processOutputs)
+            jobs = BatchSubmitter(client.wps, mode=SYNC).submit(
+                'pelican_subset', [Variable(uri='http://data.test.org/tas.nc', var_name='tas')],
+                [Domain(dict(time=Dimension(0, 1, crs='indices')))])
+            fetch(stub.base_url + '/files/tas.nc', directory=str(tmpdir))
+    assert jobs[0].succeeded
+    endpoint = stub.base_url
+    execute = phases(events, 'execute')
+    assert execute[0].tags == dict(identifier='pelican_subset', endpoint=endpoint, mode=SYNC,
+                                   status='ProcessSucceeded')
+    assert phases(events, 'parse')[0].tags == dict(parameter='Outputs')
+    submit = phases(events, 'submit')
+    assert len(submit) == 1
+    assert submit[0].tags == dict(identifier='pelican_subset', endpoint=endpoint, retries=0,
+                                  status='ProcessSucceeded')
+    assert phases(events, 'fetch')[0].size == 1000
+
+
+def test_submit_retries(events):
+    with StubWPS(fail=2) as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        jobs = BatchSubmitter(wps, retries=3, backoff=0.01, mode=SYNC).submit(
+            'pelican_subset', [Variable(uri='http://data.test.org/tas.nc', var_name='tas')],
+            [Domain(dict(time=Dimension(0, 1, crs='indices')))])
+    assert jobs[0].succeeded
+    submit = phases(events, 'submit')
+    assert submit[0].tags['retries'] == 2
+    metrics = hooks.Metrics()
+    metrics(submit[0])
+    assert 'esgfwps_phase_retries_total{{phase="submit",endpoint="{}",identifier="pelican_subset",' \
+        'status="ProcessSucceeded"}} 2'.format(stub.base_url) in metrics.render()
+
+
+def test_poll_events(events):
+    with StubWPS(polls=2) as stub:
+        with Client(stub.url) as client:
+            executions = [client.execute('pelican_subset', inputs(), output=[('output', False, 'application/json')],
+                                         mode=ASYNC)]
+
+            async def _collect():
+                return [result async for result in ExecutionMonitor(executions, initial=0.01, maximum=0.01)]
+            asyncio.new_event_loop().run_until_complete(_collect())
+    poll = phases(events, 'poll')
+    assert len(poll) == 3
+    assert poll[-1].tags == dict(endpoint=stub.base_url, status='ProcessSucceeded')
+
+
+def test_metrics():
+    metrics = hooks.Metrics(buckets=(0.1, 1))
+    metrics(hooks.Event('submit', 0.5, None, dict(identifier='subset', retries=2)))
+    metrics(hooks.Event('submit', 2, 100, dict(identifier='subset', retries=0)))
+    metrics(hooks.Event('encode', 0.01, 10, dict(parameter='Domains')))
+    assert metrics.count('submit') == 2
+    assert metrics.count('submit', identifier='other') == 0
+    assert metrics.seconds('submit', identifier='subset') == 2.5
+    text = metrics.render()
+    assert 'esgfwps_phase_seconds_bucket{phase="submit",identifier="subset",le="1"} 1\n' in text
+    assert 'esgfwps_phase_seconds_bucket{phase="submit",identifier="subset",le="+Inf"} 2\n' in text
+    assert 'esgfwps_phase_seconds_count{phase="encode",parameter="Domains"} 1\n' in text
+    assert 'esgfwps_phase_bytes_total{phase="submit",identifier="subset"} 100\n' in text
+    assert 'esgfwps_phase_retries_total{phase="submit",identifier="subset"} 2\n' in text
+    metrics.reset()
+    assert metrics.count('submit') == 0
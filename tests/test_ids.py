@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import pytest
+
+from owslib_esgfwps import Domain, Domains, Dimension, Operation, Operations, Output, Variable, Variables, ids
+
+
+def setup_function(function):
+    ids.use()
+
+
+def teardown_function(function):
+    ids.use()
+
+
+def test_lazy_ids():
+    calls = []
+
+    def generate(obj):
+        calls.append(type(obj).__name__)
+        return 'id{}'.format(len(calls))
+
+    ids.use(generate)
+    d0 = Domain(dict(time=Dimension(0, 1)))
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    assert calls == []
+    assert Domains.from_json([dict(id='d0', time=dict(start=0, end=1))]).domains[0].id == 'd0'
+    assert calls == []
+    assert d0.id == 'id1'
+    assert d0.id == 'id1'
+    assert v0.id == 'tas|id2'
+    assert v0.name == 'id2'
+    assert Output(uri='http://test.org/output.nc').id == 'id3'
+    op = Operation('CDAT.subset', domain=d0, input=[v0])
+    assert op.json == dict(name='CDAT.subset', domain='id1', input=['id2'], result='id4')
+    assert calls == ['Domain', 'Variable', 'Output', 'Operation']
+
+
+def test_counter_ids():
+    ids.use('counter')
+    first, second = Domain().id, Domain().id
+    prefix = first.rsplit('-', 1)[0]
+    assert first == prefix + '-0'
+    assert second == prefix + '-1'
+    generator = ids.CounterIds(prefix='run1-')
+    assert [generator(None) for _ in range(3)] == ['run1-0', 'run1-1', 'run1-2']
+
+
+def test_hash_ids():
+    ids.use('hash')
+    d0 = Domain(dict(time=Dimension(0, 1)))
+    d1 = Domain(dict(time=Dimension(0, 1)))
+    d2 = Domain(dict(time=Dimension(0, 2)))
+    assert d0.id == d1.id
+    assert d0.id != d2.id
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas', domain=d0)
+    v1 = Variable(uri='http://data.test.org/tas.nc', var_name='tas', domain=d0.id)
+    assert v0.id == v1.id
+    assert Operation('CDAT.subset', input=[v0]).result == Operation('CDAT.subset', input=[v1]).result
+    assert Operation('CDAT.subset').result != Operation('CDAT.average').result
+
+
+def test_collection_ids():
+    domains = Domains([Domain(), Domain(id='d0'), Domain()], id_generator=ids.CounterIds(prefix='run1-'))
+    assert [domain.id for domain in domains] == ['run1-0', 'd0', 'run1-1']
+    variables = Variables([Variable(uri='http://data.test.org/tas.nc', var_name='tas')],
+                          id_generator=ids.CounterIds(prefix='v'))
+    assert variables.variables[0].id == 'tas|v0'
+    operations = Operations([Operation('CDAT.subset')], id_generator=ids.CounterIds(prefix='op'))
+    assert operations.operations[0].result == 'op0'
+    # a domain shared by several collections uses the global generator
+    shared = Domain()
+    Domains([shared], id_generator=ids.CounterIds(prefix='a'))
+    Domains([shared], id_generator=ids.CounterIds(prefix='b'))
+    assert len(shared.id) == 32
+
+
+def test_frozen_domain_keeps_id():
+    d0 = Domain(dict(time=Dimension(0, 1)))
+    assert d0.freeze().id == d0.id
+    assert len(Domain(dict(time=Dimension(0, 1))).freeze().id) == 32
+
+
+def test_unknown_generator():
+    with pytest.raises(ValueError):
+        ids.use('snowflake')
+
+
+def test_ids_threads():
+    def slow(obj):
+        # give the other threads the chance to generate an id too
+        time.sleep(0.001)
+        return uuid4().hex
+
+    ids.use(slow)
+    for _ in range(20):
+        variable = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+        barrier = threading.Barrier(4)
+
+        def read():
+            barrier.wait()
+            return variable.name, variable.id
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = set(executor.map(lambda _: read(), range(4)))
+        assert len(results) == 1
+        name, id = results.pop()
+        assert id == 'tas|' + name
+
+
+def test_hash_ids_operation_order():
+    ids.use('hash')
+    o0, o1 = Operation(input=['v0']), Operation(input=['v0'])
+    result, name = o0.result, o0.name
+    assert (o1.name, o1.result) == (name, result)
+    assert name != result
@@ -0,0 +1,84 @@
+from owslib.wps import WebProcessingService
+
+from owslib_esgfwps import Output, Outputs, Domain, Dimension, Variable, Operation
+from owslib_esgfwps.batch import BatchSubmitter
+from owslib_esgfwps.memo import canonical, request_key, MemoryResultCache, SQLiteResultCache
+
+from .common import StubWPS
+
+
+def request():
+    d0 = Domain(dict(time=Dimension(0, 10, crs='indices'), lat=Dimension(-45, 45.0)))
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    op = Operation('CDAT.subset', domain=d0, input=[v0], axes='time')
+    return [v0], [d0], [op]
+
+
+def test_request_key():
+    key = request_key('pelican_subset', *request())
+    assert key == request_key('pelican_subset', *request())
+    assert key != request_key('emu_subset', *request())
+    variables, domains, operations = request()
+    domains[0].dimensions['time'] = Dimension(0, 11, crs='indices')
+    assert key != request_key('pelican_subset', variables, domains, operations)
+
+
+def test_canonical():
+    data = canonical('pelican_subset', *request())
+    assert data['operations'][0]['input'] == [['variable', 0]]
+    assert data['operations'][0]['domain'] == 0
+    assert data['domains'][0]['dimensions'][0] == ['lat', [-45.0, 45.0, 1.0, 'values']]
+    assert 'id' not in data['variables'][0]
+
+
+def test_request_key_unnamed_operations():
+    def unnamed():
+        variables, domains, operations = request()
+        first = Operation(domain=domains[0], input=variables)
+        second = Operation(input=[first], axes='time')
+        return variables, domains, [first, second]
+
+    key = request_key('pelican_subset', *unnamed())
+    variables, domains, operations = unnamed()
+    # generated names are not part of the key, also after they were read
+    assert [op.name for op in operations] and operations[1].input
+    assert request_key('pelican_subset', variables, domains, operations) == key
+    data = canonical('pelican_subset', variables, domains, operations)
+    assert [op['name'] for op in data['operations']] == [None, None]
+    assert data['operations'][1]['input'] == [['operation', 0]]
+    operations[0] = Operation('CDAT.average', domain=domains[0], input=variables)
+    assert request_key('pelican_subset', variables, domains, operations) != key
+
+
+def test_memory_result_cache():
+    cache = MemoryResultCache(maxsize=1)
+    cache.set('a', Outputs([Output(uri='http://test.org/a.nc')]))
+    assert cache.get('a').outputs[0].uri == 'http://test.org/a.nc'
+    cache.set('b', Outputs([Output(uri='http://test.org/b.nc')]))
+    assert cache.get('a') is None
+    assert 'b' in cache
+    assert len(cache) == 1
+
+
+def test_sqlite_result_cache(tmpdir):
+    path = str(tmpdir.join('results.sqlite'))
+    cache = SQLiteResultCache(path)
+    cache.set('a', Outputs([Output(uri='http://test.org/a.nc', mimetype='application/x-netcdf')]))
+    cache.close()
+    cache = SQLiteResultCache(path)
+    assert cache.get('a').outputs[0].mimetype == 'application/x-netcdf'
+    assert cache.get('b') is None
+    assert len(cache) == 1
+
+
+def test_batch_memoized():
+    results = MemoryResultCache()
+    with StubWPS() as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        submitter = BatchSubmitter(wps, results=results)
+        first = submitter.submit('pelican_subset', *request())
+        second = submitter.submit('pelican_subset', *request())
+        assert len(stub.executions()) == 1
+    assert second[0].cached is not None
+    assert second[0].succeeded
+    assert second[0].outputs.outputs[0].uri == first[0].outputs.outputs[0].uri
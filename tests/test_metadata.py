@@ -0,0 +1,162 @@
+import json
+import os
+
+import pytest
+
+from owslib_esgfwps import ParameterError, Variable, Variables
+from owslib_esgfwps.metadata import MetadataCache, default_cache, parse, parse_das, parse_dds
+
+from .common import StubWPS, TEST_SU_OPENDAP
+
+DDS = """Dataset {
+    Float64 lat[lat = 180];
+    Float64 lon[lon = 288];
+    Float64 time[time = 3650];
+    Grid {
+     ARRAY:
+        Float32 tas[time = 3650][lat = 180][lon = 288];
+     MAPS:
+        Float64 time[time = 3650];
+        Float64 lat[lat = 180];
+        Float64 lon[lon = 288];
+    } tas;
+} tas_day.nc;
+"""
+
+DAS = """Attributes {
+    lat {
+        String units "degrees_north";
+        Float64 actual_range -89.5, 89.5;
+    }
+    lon {
+        Float64 valid_min 0.0;
+        Float64 valid_max 358.75;
+    }
+    time {
+        String units "days since 1850-01-01";
+    }
+    tas {
+        String long_name "Near-Surface \\"Air\\" Temperature";
+        Float32 _FillValue 1e+20;
+        Int32 cell_methods_count 2;
+    }
+    NC_GLOBAL {
+        String history "line one;
+line two";
+        String Conventions "CF-1.6";
+        extra {
+            String note "nested";
+        }
+    }
+}
+"""
+
+
+def files(*names):
+    content = {}
+    for name in names:
+        content[name + '.dds'] = DDS.encode('utf-8')
+        content[name + '.das'] = DAS.encode('utf-8')
+    return content
+
+
+def test_parse_dds():
+    variables = parse_dds(DDS)
+    assert list(variables) == ['lat', 'lon', 'time', 'tas']
+    assert variables['tas'] == ('Float32', dict(time=3650, lat=180, lon=288))
+    assert list(variables['tas'][1]) == ['time', 'lat', 'lon']
+    assert parse_dds('Dataset {\n    Int16 x[10][20];\n} x;')['x'] == ('Int16', dict(dim_0=10, dim_1=20))
+
+
+def test_parse_das():
+    attributes = parse_das(DAS)
+    assert attributes['tas']['long_name'] == ['Near-Surface "Air" Temperature']
+    assert attributes['tas']['_FillValue'] == [1e20]
+    assert attributes['tas']['cell_methods_count'] == [2]
+    assert attributes['NC_GLOBAL']['history'] == ['line one;\nline two']
+    assert attributes['NC_GLOBAL']['Conventions'] == ['CF-1.6']
+    assert attributes['NC_GLOBAL.extra']['note'] == ['nested']
+
+
+def test_parse():
+    metadata = parse('http://test.org/tas.nc', DDS, DAS)
+    tas = metadata.variable('tas')
+    assert tas.shape == (3650, 180, 288)
+    assert tas.itemsize == 4
+    assert tas.nbytes == 3650 * 180 * 288 * 4
+    assert tas.attributes['_FillValue'] == [1e20]
+    assert metadata.attributes['Conventions'] == ['CF-1.6']
+    assert metadata.coordinate_range('lat') == (-89.5, 89.5)
+    assert metadata.coordinate_range('lon') == (0.0, 358.75)
+    assert metadata.coordinate_range('time') is None
+    with pytest.raises(ParameterError):
+        metadata.variable('pr')
+
+
+def test_cache(tmpdir):
+    with StubWPS(files=files('tas.nc')) as stub:
+        uri = stub.base_url + '/files/tas.nc'
+        cache = MetadataCache(path=str(tmpdir))
+        tas = Variable(uri=uri, var_name='tas')
+        assert tas.metadata(cache=cache).shape == (3650, 180, 288)
+        assert tas.metadata(cache=cache).dtype == 'Float32'
+        assert len(stub.requests) == 2
+        assert [path for method, path, headers, body in stub.requests] == ['/files/tas.nc.dds', '/files/tas.nc.das']
+        # another process reads the documents from disk
+        assert uri in MetadataCache(path=str(tmpdir))
+        assert MetadataCache(path=str(tmpdir)).variable(tas).itemsize == 4
+        assert len(stub.requests) == 2
+        # expired metadata is read again
+        expired = MetadataCache(ttl=-1, path=str(tmpdir))
+        expired.dataset(uri)
+        assert len(stub.requests) == 4
+        cache.clear()
+        assert tmpdir.listdir() == []
+
+
+def test_cache_invalid_file(tmpdir, monkeypatch):
+    with StubWPS(files=files('tas.nc')) as stub:
+        uri = stub.base_url + '/files/tas.nc'
+        cache = MetadataCache(path=str(tmpdir))
+        # files without the expected keys are misses
+        for data in [{'uri': uri}, [1, 2]]:
+            with open(cache._filename(str(tmpdir), uri), 'w') as f:
+                json.dump(data, f)
+            assert uri not in MetadataCache(path=str(tmpdir))
+        replaced = []
+        real_replace = os.replace
+        monkeypatch.setattr(os, 'replace', lambda src, dst: replaced.append(src) or real_replace(src, dst))
+        assert cache.dataset(uri).uri == uri
+        assert '.{}.'.format(os.getpid()) in os.path.basename(replaced[0])
+        assert MetadataCache(path=str(tmpdir)).dataset(uri).uri == uri
+        assert len(stub.requests) == 2
+
+
+def test_prefetch():
+    with StubWPS(files=files('tas.nc', 'pr.nc', 'ts.nc'), delay=0.05) as stub:
+        variables = Variables([Variable(uri='{}/files/{}.nc'.format(stub.base_url, name), var_name='tas')
+                               for name in ('tas', 'pr', 'ts', 'missing', 'tas')])
+        cache = MetadataCache()
+        metadata = cache.prefetch(variables, max_workers=4)
+        assert list(metadata) == [variables.variables[i].uri for i in range(3)]
+        # the DAS of a dataset without DDS is not requested
+        assert len(stub.requests) == 7
+        assert variables.variables[1].metadata(cache=cache).name == 'tas'
+        assert len(stub.requests) == 7
+
+
+def test_default_cache():
+    with StubWPS(files=files('tas.nc')) as stub:
+        variables = Variables([Variable(uri=stub.base_url + '/files/tas.nc', var_name='tas')])
+        try:
+            assert list(variables.prefetch()) == [variables.variables[0].uri]
+            assert variables.variables[0].metadata().size == 3650 * 180 * 288
+            assert len(stub.requests) == 2
+        finally:
+            default_cache().clear()
+
+
+@pytest.mark.online
+def test_opendap_metadata():
+    metadata = Variable(uri=TEST_SU_OPENDAP, var_name='su').metadata(cache=MetadataCache())
+    assert metadata.size > 0
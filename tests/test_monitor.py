@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from owslib.wps import WebProcessingService, ASYNC
+
+from owslib_esgfwps import Domain, Domains, Dimension, Variable, Variables
+from owslib_esgfwps.monitor import Backoff, ExecutionMonitor
+
+from .common import StubWPS
+
+
+def collect(monitor):
+    async def _collect():
+        return [result async for result in monitor]
+    return asyncio.new_event_loop().run_until_complete(_collect())
+
+
+def execute(wps, n):
+    v0 = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    return [wps.execute(
+        'pelican_subset',
+        inputs=[('domain', Domains([Domain(dict(time=Dimension(i, i + 1, crs='indices')))])),
+                ('variable', Variables([v0]))],
+        output=[('output', False, 'application/json')], mode=ASYNC) for i in range(n)]
+
+
+def test_backoff():
+    backoff = Backoff(initial=1, maximum=5, factor=2, jitter=0)
+    assert [backoff.next() for _ in range(4)] == [2, 4, 5, 5]
+    assert backoff.next(progressed=True) == 1
+
+
+def test_monitor():
+    with StubWPS(polls=2, failed_jobs=1) as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        executions = execute(wps, 4)
+        assert executions[0].status == 'ProcessAccepted'
+        monitor = ExecutionMonitor(executions, concurrency=2, initial=0.01, maximum=0.05)
+        results = collect(monitor)
+    assert len(results) == 4
+    assert monitor.polls == 12
+    failed = [result for result in results if result.outputs is None]
+    assert len(failed) == 1
+    assert not failed[0].execution.isSucceeded()
+    uris = sorted(result.outputs.outputs[0].uri for result in results if result.outputs)
+    assert uris[0].endswith('output-1.nc')
+
+
+def test_monitor_timeout():
+    with StubWPS(polls=100) as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        results = collect(ExecutionMonitor(execute(wps, 1), timeout=0.1, initial=0.02, maximum=0.02))
+    assert isinstance(results[0].error, TimeoutError)
+
+
+def test_monitor_invalid_outputs():
+    class ProcessOutput(object):
+        identifier = 'output'
+        data = ['not json']
+
+    class Execution(object):
+        statusLocation = 'http://test.org/status/0.xml'
+        processOutputs = [ProcessOutput()]
+
+        def isComplete(self):
+            return True
+
+        def isSucceeded(self):
+            return True
+
+    results = collect(ExecutionMonitor([Execution()]))
+    assert results[0].outputs is None
+    assert isinstance(results[0].error, Exception)
+
+
+def test_monitor_close_does_not_wait_for_polls():
+    with StubWPS(polls=100) as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        executions = execute(wps, 2)
+        stub.delay = 1
+
+        async def first():
+            async for result in ExecutionMonitor(executions, initial=0.01, maximum=0.01):
+                return result
+
+        loop = asyncio.new_event_loop()
+        started = time.perf_counter()
+        try:
+            loop.run_until_complete(asyncio.wait_for(first(), 0.2))
+        except asyncio.TimeoutError:
+            pass
+        assert time.perf_counter() - started < 0.8
+        loop.close()
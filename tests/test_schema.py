@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from owslib_esgfwps import Domains, Operations, Outputs, Variables, schema
+from owslib_esgfwps.schema import ValidationError
+
+DOMAINS = [
+    {'id': 'd0', 'mask': 'land', 'time': {'start': 0, 'end': 10, 'step': 2, 'crs': 'indices'},
+     'lat': {'start': -90, 'end': 90}},
+    {'id': 'd1', 'time': {'start': '2000-01-01', 'end': None, 'crs': 'values'}},
+]
+VARIABLES = [{'uri': 'http://data.test.org/tas.nc', 'id': 'tas|v0', 'domain': 'd0'}]
+OPERATIONS = [{'name': 'CDAT.subset', 'domain': 'd0', 'input': ['v0'], 'result': 'r0', 'axes': 'time'}]
+OUTPUTS = [{'uri': 'http://test.org/output.nc', 'id': 'o0', 'domain': 'd0', 'mime-type': 'application/x-netcdf'}]
+
+FROM_JSON = dict(domains=Domains.from_json, variables=Variables.from_json, operations=Operations.from_json,
+                 outputs=Outputs.from_json)
+
+# documents accepted by from_json, as lists of items
+TEST_DOCUMENTS = [
+    ('domains', DOMAINS),
+    ('variables', VARIABLES),
+    ('operations', OPERATIONS),
+    ('outputs', OUTPUTS),
+    ('outputs', [{'uri': 'http://test.org/output.nc', 'id': 'tas_avg_mon', 'domain': {'id': 'd0'},
+                  'mime-type': 'x-application/netcdf'}]),
+    ('outputs', [{'uri': 'http://test.org/output.nc', 'mimetype': 'application/x-netcdf'}]),
+    ('domains', [{'id': 'd0', 'latitude': {'start': 0.0, 'end': 45.0, 'step': 1.5, 'crs': 'values'},
+                  'longitude': {'start': 10, 'end': 20, 'crs': 'indices'},
+                  'time': {'start': 1981, 'end': 2016, 'crs': 'values'}}]),
+    ('domains', [{'id': 'd0', 'time': {'start': 0, 'end': 10, 'step': None, 'crs': 'indices'}}]),
+    ('domains', [{'id': 'd0', 'mask': {'uri': 'http://data.test.org/sftlf.nc', 'var_name': 'sftlf',
+                                       'operation': 'var_name>50'}, 'lat': {'start': -90, 'end': 90}}]),
+    ('variables', [{'uri': 'http://data.test.org/tas.nc', 'var_name': 'tas'}]),
+    ('variables', [{'uri': 'http://data.test.org/tas.nc', 'id': 'tas|v0', 'domain': {'id': 'd0'}}]),
+    ('operations', [{'name': 'CDS.timeBin', 'input': ['v0'], 'result': 'cycle', 'domain': 'd0', 'axes': 'time',
+                     'bins': 't|month|ave|year'}]),
+    ('operations', [{'input': ['v0'], 'axes': ['time']}]),
+]
+
+
+def without_generated_id(parameter, document):
+    data = dict(parameter.json)
+    for key in ('id', 'name', 'result'):
+        if not document.get(key):
+            data.pop(key, None)
+    return data
+
+
+@pytest.mark.parametrize('kind,data', TEST_DOCUMENTS)
+def test_load_test_documents(kind, data):
+    assert schema.validate(kind, data) == []
+    loaded, expected = list(schema.load(kind, data)), list(FROM_JSON[kind](data))
+    assert len(loaded) == len(expected) == len(data)
+    for parameter, other, document in zip(loaded, expected, data):
+        assert type(parameter) is type(other)
+        assert without_generated_id(parameter, document) == without_generated_id(other, document)
+
+
+def test_load_matches_from_json():
+    domains = schema.load('domains', DOMAINS)
+    assert isinstance(domains, Domains)
+    assert domains.json == Domains.from_json(DOMAINS).json
+    assert domains.domains[1].dimensions['time'].step == 1
+    assert schema.load('variables', VARIABLES).json == Variables.from_json(VARIABLES).json
+    assert schema.load('variables', VARIABLES).variables[0].var_name == 'tas'
+    operations = schema.load('operations', OPERATIONS)
+    assert operations.json == Operations.from_json(OPERATIONS).json
+    assert operations.operations[0].axes == 'time'
+    assert schema.load('outputs', OUTPUTS).json == Outputs.from_json(OUTPUTS).json
+    assert schema.load('domain', DOMAINS[0]).id == 'd0'
+    assert schema.load('variable', {'uri': 'http://data.test.org/tas.nc', 'var_name': 'tas'}).id.startswith('tas|')
+
+
+def test_loaded_objects_are_tracked():
+    domains = schema.load('domains', DOMAINS)
+    value = domains.value
+    domains.domains[0].dimensions['time'].crs = 'values'
+    assert domains.value != value
+
+
+def test_all_errors_with_paths():
+    data = [
+        {'id': 'd0', 'time': {'start': 0, 'end': 1, 'step': 0, 'crs': 'index', 'stride': 1}},
+        {'mask': 1, 'lat': []},
+        'd2',
+    ]
+    with pytest.raises(ValidationError) as e:
+        schema.load('domains', data)
+    assert e.value.errors == [
+        ('$[0].time.step', 'must be greater than 0'),
+        ('$[0].time.crs', 'must be one of values, indices'),
+        ('$[0].time.stride', 'is not allowed'),
+        ('$[1].id', 'is required'),
+        ('$[1].mask', 'expected string or object or null, got int'),
+        ('$[1].lat', 'expected object, got list'),
+        ('$[2]', 'expected object, got str'),
+    ]
+    assert '$[1].id: is required' in str(e.value)
+
+
+def test_variable_and_operation_errors():
+    assert schema.validate('variables', [{'uri': 'http://data.test.org/tas.nc', 'id': 'tas'}]) == [
+        ('$[0].id', "does not match 'name|id'")]
+    assert schema.validate('operation', {'name': 'CDAT.subset', 'input': ['v0', 1], 'bins': 1}) == [
+        ('$.input[1]', 'expected string, got int'),
+        ('$.bins', 'expected string or array or null, got int')]
+    assert schema.validate('outputs', {}) == [('$', 'expected array, got dict')]
+    assert schema.validate('variable', {'uri': 'a', 'id': 'tas|v0', 'step': True}) == [('$.step', 'is not allowed')]
+    assert schema.validate('variable', {'uri': 'a', 'domain': 1}) == [
+        ('$.domain', 'expected string or object or null, got int'), ('$', 'requires id or var_name')]
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError):
+        schema.validate('datasets', [])
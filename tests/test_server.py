@@ -0,0 +1,92 @@
+import json
+from collections import deque
+
+import pytest
+
+from owslib_esgfwps import Domains, Operations, Variables, decoder
+from owslib_esgfwps.schema import ValidationError
+from owslib_esgfwps.server import RequestDecoder
+
+DOMAINS = json.dumps([{'id': 'd0', 'time': {'start': 0, 'end': 10, 'crs': 'indices'}}])
+VARIABLES = json.dumps([{'uri': 'http://data.test.org/tas.nc', 'id': 'tas|v0', 'domain': 'd0'},
+                        {'uri': 'http://data.test.org/pr.nc', 'id': 'pr|v1'}])
+OPERATIONS = json.dumps([{'name': 'CDAT.average', 'domain': 'd0', 'input': ['v0'], 'result': 'avg', 'axes': 'time'},
+                         {'name': 'CDAT.subtract', 'input': ['avg', 'v1'], 'result': 'diff'}])
+
+
+class ComplexInput(object):
+    """Input like in PyWPS with the payload in `data`."""
+
+    def __init__(self, data):
+        self.data = data
+
+
+def request_inputs():
+    return dict(domain=[ComplexInput(DOMAINS)], variable=[ComplexInput(VARIABLES.encode('utf-8'))],
+                operation=[ComplexInput(OPERATIONS)])
+
+
+def test_decode():
+    inputs = RequestDecoder()(request_inputs())
+    assert isinstance(inputs.domains, Domains)
+    assert inputs.domains.json == Domains.from_json(json.loads(DOMAINS)).json
+    assert inputs.variables.json == Variables.from_json(json.loads(VARIABLES)).json
+    assert inputs.operations.json == Operations.from_json(json.loads(OPERATIONS)).json
+    average, subtract = inputs.operations
+    assert average._domain is inputs.domain('d0')
+    assert average._input == [inputs.variable('v0')]
+    assert subtract._input == ['avg', inputs.variable('v1')]
+    assert inputs.variable('v9') is None
+
+
+def test_decode_missing_inputs():
+    inputs = RequestDecoder()(dict(variable=VARIABLES))
+    assert len(inputs.variables) == 2
+    assert len(inputs.domains) == 0
+    assert len(inputs.operations) == 0
+
+
+def test_decode_several_documents():
+    decode = RequestDecoder()
+    inputs = decode(dict(domain=[DOMAINS, json.dumps({'id': 'd1', 'lat': {'start': 0, 'end': 1}})]))
+    assert [domain.id for domain in inputs.domains] == ['d0', 'd1']
+
+
+def test_decode_deque():
+    # PyWPS keeps the inputs of an identifier in a deque
+    inputs = RequestDecoder()(dict((name, deque(values)) for name, values in request_inputs().items()))
+    assert [domain.id for domain in inputs.domains] == ['d0']
+    assert len(inputs.variables) == 2
+    assert len(RequestDecoder().load('domains', iter([DOMAINS, DOMAINS]))) == 2
+
+
+def test_payload_cache():
+    decoder.reset_decode_info()
+    decode = RequestDecoder(maxsize=3)
+    first = decode(request_inputs())
+    second = decode(request_inputs())
+    assert decoder.decode_info().json == 3
+    # objects are not shared between requests
+    assert first.domains.domains[0] is not second.domains.domains[0]
+    # the least recently used document is evicted
+    decode(dict(domain=json.dumps([{'id': 'd2'}])))
+    decode(dict(variable=VARIABLES.encode('utf-8')))
+    assert decoder.decode_info().json == 4
+    decode(dict(domain=DOMAINS))
+    assert decoder.decode_info().json == 5
+
+
+def test_invalid_references():
+    operations = json.dumps([{'name': 'CDAT.average', 'domain': 'd9', 'input': ['v0', 'v8']}])
+    with pytest.raises(ValidationError) as e:
+        RequestDecoder()(dict(domain=DOMAINS, variable=VARIABLES, operation=operations))
+    assert e.value.errors == [('$.operation[0].domain', 'unknown domain d9'),
+                              ('$.operation[0].input[1]', 'unknown variable or result v8')]
+    inputs = RequestDecoder(validate=False)(dict(operation=operations))
+    assert inputs.operations.operations[0].domain == 'd9'
+
+
+def test_invalid_document():
+    with pytest.raises(ValidationError) as e:
+        RequestDecoder()(dict(variable=json.dumps([{'uri': 'http://data.test.org/tas.nc'}])))
+    assert e.value.errors == [('$[0]', 'requires id or var_name')]
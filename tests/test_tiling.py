@@ -0,0 +1,117 @@
+import itertools
+import math
+import random
+from collections import Counter
+
+import pytest
+
+from owslib_esgfwps import Domain, Dimension, ParameterError
+from owslib_esgfwps.algebra import intersection
+from owslib_esgfwps.tiling import points, split_dimension, plan_chunks, tile_domain
+
+
+def index_box(tile, domain, names):
+    """Return the tile as (first, last) numbers of the points of the original domain in the tile."""
+    box = []
+    for name in names:
+        dimension, original = tile.dimensions[name], domain.dimensions[name]
+        first = int(math.ceil((dimension.start - original.start) / float(original.step) - 1e-6))
+        last = int(math.floor((dimension.end - original.start) / float(original.step) + 1e-6))
+        box.append((first, last))
+    return box
+
+
+def random_domain(rnd):
+    dimensions = {}
+    for name in rnd.sample(['time', 'lat', 'lon', 'plev'], rnd.randint(1, 3)):
+        if rnd.random() < 0.5:
+            start = rnd.randint(0, 50)
+            dimensions[name] = Dimension(start, start + rnd.randint(0, 30), rnd.randint(1, 3), crs='indices')
+        else:
+            step = rnd.choice([0.25, 0.5, 1.0, 2.5])
+            start = rnd.uniform(-90, 0)
+            dimensions[name] = Dimension(start, start + rnd.uniform(0, 10), step, crs='values')
+    return Domain(dimensions, mask='land')
+
+
+def test_points():
+    assert points(Dimension(0, 9, crs='indices')) == 10
+    assert points(Dimension(0, 9, 2, crs='indices')) == 5
+    assert points(Dimension(-90, 90, 0.5)) == 361
+    assert points(Dimension(crs='indices')) is None
+
+
+def test_split_dimension():
+    dims = split_dimension(Dimension(0, 9, crs='indices'), 4)
+    assert [(d.start, d.end) for d in dims] == [(0, 3), (4, 7), (8, 9)]
+    # value ranges are cut halfway between two points and end just below the next range
+    dims = split_dimension(Dimension(0.0, 1.0, 0.1), 5)
+    assert [d.start for d in dims] == [0.0, 0.45, 0.95]
+    assert [d.end for d in dims] == pytest.approx([0.45, 0.95, 1.0])
+    assert dims[0].end < dims[1].start and dims[1].end < dims[2].start and dims[2].end == 1.0
+    assert dims[0].crs == 'values'
+    dims = split_dimension(Dimension(-90, 90, 0.5), 120)
+    assert [d.start for d in dims] == [-90, -30.25, 29.75, 89.75]
+    assert [d.end for d in dims] == pytest.approx([-30.25, 29.75, 89.75, 90])
+
+
+def test_split_dimension_disjoint():
+    for dimension, chunk in [(Dimension(-90, 90, 0.5), 120), (Dimension(1e6, 1e6 + 1, 1e-3), 100)]:
+        dims = split_dimension(dimension, chunk)
+        assert all(a.end < b.start and intersection(a, b) is None for a, b in zip(dims, dims[1:]))
+    # a coordinate on a cut is in one tile only
+    dims = split_dimension(Dimension(-90, 90, 0.5), 120)
+    assert [d.start <= -30.25 <= d.end for d in dims] == [False, True, False, False]
+
+
+def test_plan_chunks():
+    d0 = Domain(dict(time=Dimension(0, 99, crs='indices'), lat=Dimension(0, 9, crs='indices')))
+    chunks = plan_chunks(d0, max_bytes=40 * 4, itemsize=4)
+    assert chunks['time'] * chunks['lat'] <= 40
+
+
+def test_unknown_dimension():
+    with pytest.raises(ParameterError):
+        tile_domain(Domain(dict(time=Dimension(0, 9, crs='indices'))), chunks=dict(lat=2))
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_tiles_cover_domain(seed):
+    rnd = random.Random(seed)
+    domain = random_domain(rnd)
+    chunks = dict((name, rnd.randint(1, 20)) for name in domain.dimensions if rnd.random() < 0.8)
+    max_bytes = rnd.choice([None, 4 * rnd.randint(10, 2000)])
+    tiles = tile_domain(domain, chunks=chunks, max_bytes=max_bytes)
+    assert all(tile.mask == 'land' for tile in tiles)
+    assert len(set(tile.id for tile in tiles)) == len(tiles)
+    names = list(domain.dimensions)
+    # every point of the domain is in exactly one tile
+    covered = Counter()
+    for tile in tiles:
+        box = index_box(tile, domain, names)
+        covered.update(itertools.product(*[range(first, last + 1) for first, last in box]))
+    assert set(covered.values()) == {1}
+    assert set(covered) == set(itertools.product(*[range(points(domain.dimensions[name])) for name in names]))
+    for tile in tiles:
+        box = index_box(tile, domain, names)
+        for name, (first, last) in zip(names, box):
+            dimension = tile.dimensions[name]
+            assert dimension.crs == domain.dimensions[name].crs
+            assert dimension.step == domain.dimensions[name].step
+            if max_bytes is None and name in chunks:
+                assert last - first + 1 <= chunks[name]
+        if max_bytes is not None:
+            size = 1
+            for first, last in box:
+                size *= last - first + 1
+            assert size <= max_bytes // 4
+    # the tiles of a value dimension neither overlap nor leave more than a tiny gap
+    for name in names:
+        original = domain.dimensions[name]
+        if original.crs == 'values':
+            bounds = sorted(set((tile.dimensions[name].start, tile.dimensions[name].end) for tile in tiles))
+            assert bounds[0][0] == original.start and bounds[-1][1] == original.end
+            for (start, end), (next_start, next_end) in zip(bounds, bounds[1:]):
+                assert end < next_start <= end + original.step * 1e-6
+                assert intersection(Dimension(start, end, original.step), Dimension(next_start, next_end,
+                                                                                    original.step)) is None
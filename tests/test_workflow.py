@@ -0,0 +1,86 @@
+import pytest
+from owslib.wps import WebProcessingService
+
+from owslib_esgfwps import Domain, Dimension, Variable, Operation
+from owslib_esgfwps.batch import BatchSubmitter
+from owslib_esgfwps.workflow import Workflow, WorkflowError
+
+from .common import StubWPS
+
+
+def make_workflow():
+    d0 = Domain(dict(time=Dimension(0, 10, crs='indices')), id='d0')
+    d1 = Domain(dict(time=Dimension(10, 20, crs='indices')), id='d1')
+    tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    pr = Variable(uri='http://data.test.org/pr.nc', var_name='pr')
+    ops = [
+        Operation('CDAT.subtract', domain=d0, input=['avg', 'max'], result='diff'),
+        Operation('CDAT.average', domain=d0, input=[tas], result='avg'),
+        Operation('CDAT.max', domain=d0, input=[tas], result='max'),
+        Operation('CDAT.sum', domain=d1, input=[pr], result='sum'),
+    ]
+    return Workflow(ops), ops, (tas, pr), (d0, d1)
+
+
+def test_layers():
+    workflow, ops, variables, domains = make_workflow()
+    workflow.validate()
+    assert workflow.layers() == [ops[1:], ops[:1]]
+    assert workflow.order()[-1] is ops[0]
+    assert workflow.dependencies(ops[0]) == [ops[1], ops[2]]
+    assert workflow.variables == list(variables)
+
+
+def test_components():
+    workflow, ops, (tas, pr), (d0, d1) = make_workflow()
+    components = workflow.components()
+    assert len(components) == 2
+    assert components[0].order() == [ops[1], ops[2], ops[0]]
+    assert components[0].variables == [tas]
+    assert components[0].domains == [d0]
+    assert components[1].operations == [ops[3]]
+    assert components[1].domains == [d1]
+
+
+def test_operation_objects():
+    d0 = Domain(dict(time=Dimension(0, 10, crs='indices')))
+    tas = Variable(uri='http://data.test.org/tas.nc', var_name='tas')
+    avg = Operation('CDAT.average', domain=d0, input=[tas])
+    diff = Operation('CDAT.subtract', domain=d0, input=[avg, tas])
+    workflow = Workflow([diff, avg])
+    assert workflow.dangling() == []
+    assert workflow.dependencies(diff) == [avg]
+    assert workflow.layers() == [[avg], [diff]]
+    assert [component.order() for component in workflow.components()] == [[avg, diff]]
+    # an operation outside of the workflow is not a link
+    assert Workflow([diff]).dangling() == [(diff, avg.name)]
+
+
+def test_dangling():
+    op = Operation('CDAT.average', input=['v0'], result='avg')
+    assert Workflow([op]).dangling() == [(op, 'v0')]
+    with pytest.raises(WorkflowError):
+        Workflow([op]).validate()
+
+
+def test_cycle():
+    ops = [Operation('a', input=['b'], result='a'), Operation('b', input=['a'], result='b'),
+           Operation('c', input=[], result='c')]
+    with pytest.raises(WorkflowError, match='cyclic'):
+        Workflow(ops).order()
+
+
+def test_duplicate_result():
+    with pytest.raises(WorkflowError):
+        Workflow([Operation('a', input=[], result='x'), Operation('b', input=[], result='x')])
+
+
+def test_submit():
+    workflow = make_workflow()[0]
+    with StubWPS() as stub:
+        wps = WebProcessingService(url=stub.url, skip_caps=True)
+        jobs = workflow.submit(BatchSubmitter(wps), 'cdat_workflow')
+        executions = stub.executions()
+    assert len(jobs) == 2
+    assert all(job.succeeded for job in jobs)
+    assert sorted(body.count('CDAT.') for body in executions) == [1, 3]